@@ -18,6 +18,9 @@ class BaseAPI:
         self.session = Session()
         self.timeout = 20
 
+        # (url, params) -> conditional request headers for the last response, see get_if_modified
+        self.validators = {}
+
         # e.g. pajbot1/1.35
         self.session.headers["User-Agent"] = "pajbot/{}".format(constants.VERSION)
 
@@ -85,6 +88,25 @@ class BaseAPI:
     def get(self, endpoint, params=None, headers=None, **request_options):
         return self.request("GET", endpoint, params, headers, **request_options).json()
 
+    def get_if_modified(self, endpoint, params=None, headers=None, **request_options):
+        """Like get, but sends the ETag/Last-Modified of the previous response from the same URL,
+        and returns None if the server responds that it hasn't changed since (304 Not Modified)"""
+        key = (self.join_base_and_endpoint(self.base_url, endpoint), tuple(sorted((params or {}).items())))
+        headers = {**(headers or {}), **self.validators.get(key, {})}
+
+        response = self.request("GET", endpoint, params, headers, **request_options)
+        if response.status_code == 304:
+            return None
+
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self.validators[key] = validators
+
+        return response.json()
+
     def get_response(self, endpoint, params=None, headers=None, **request_options):
         return self.request("GET", endpoint, params, headers, **request_options)
 
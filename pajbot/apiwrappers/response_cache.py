@@ -106,3 +106,39 @@ class APIResponseCache:
         if expiry > 0:
             self.redis.setex(redis_key, expiry, serializer.serialize(fetch_result))
         return fetch_result
+
+    def cache_bulk_fetch_fn(self, redis_key_fn, keys, fetch_fn, serializer=JsonSerializer(), expiry=120):
+        """Like cache_fetch_fn, but for many keys at once. All keys are looked up with a single MGET,
+        and fetch_fn is then called once with the list of keys that were not cached.
+        fetch_fn must return a dict of key -> result, keys missing from that dict are cached as None.
+        Returns a dict of key -> result for all given keys"""
+        keys = list(dict.fromkeys(keys))
+        if len(keys) <= 0:
+            return {}
+
+        results = {}
+        missing_keys = []
+        for key, cache_result in zip(keys, self.redis.mget([redis_key_fn(key) for key in keys])):
+            if cache_result is None:
+                missing_keys.append(key)
+            else:
+                results[key] = serializer.deserialize(cache_result)
+
+        if len(missing_keys) <= 0:
+            return results
+
+        log.debug("Cache Miss: %s keys (%s...)", len(missing_keys), redis_key_fn(missing_keys[0]))
+        fetch_results = fetch_fn(missing_keys)
+
+        with self.redis.pipeline() as pipeline:
+            for key in missing_keys:
+                fetch_result = fetch_results.get(key, None)
+                results[key] = fetch_result
+
+                key_expiry = expiry(fetch_result) if callable(expiry) else expiry
+                if key_expiry > 0:
+                    pipeline.setex(redis_key_fn(key), key_expiry, serializer.serialize(fetch_result))
+
+            pipeline.execute()
+
+        return results
@@ -0,0 +1,10 @@
+from pajbot.apiwrappers.base import BaseAPI
+
+
+class TrackOBotAPI(BaseAPI):
+    def __init__(self):
+        super().__init__(base_url="https://trackobot.com/")
+
+    def get_history(self, username, api_key):
+        """Returns the user's game history document, or None if it hasn't changed since the last call"""
+        return self.get_if_modified(["profile", "history.json"], params={"username": username, "token": api_key})
@@ -0,0 +1,21 @@
+from pajbot.apiwrappers.base import BaseAPI
+
+
+class TriviaAPI(BaseAPI):
+    """Random trivia questions from jService, gazatu and RTD. Every call returns a new question,
+    so unlike other pollers these can't use conditional requests"""
+
+    def __init__(self):
+        super().__init__(base_url=None)
+
+    def get_jservice_question(self):
+        return self.get("http://jservice.io/api/random")[0]
+
+    def get_rtd_question(self):
+        return self.get("http://159.203.60.127/questions", params={"limit": 1})
+
+    def get_gazatu_question(self, categories):
+        return self.get(
+            "https://api.gazatu.xyz/trivia/questions",
+            params={"count": 1, "include": "[{}]".format(",".join(categories))},
+        )[0]
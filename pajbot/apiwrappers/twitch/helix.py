@@ -114,6 +114,59 @@ class TwitchHelixAPI(BaseTwitchAPI):
             expiry=lambda response: 30 if response is None else 300,
         )
 
+    # Maximum number of user IDs and logins that can be looked up with a single /users request
+    USERS_PER_REQUEST = 100
+
+    def fetch_users(self, user_ids=[], logins=[]):
+        """Fetches the data of the given users (at most USERS_PER_REQUEST user IDs and logins combined)
+        with a single request. Users that are not found are left out of the returned list."""
+        params = [("id", user_id) for user_id in user_ids] + [("login", login) for login in logins]
+        return self.get("/users", params)["data"]
+
+    def fetch_login_names(self, user_ids):
+        """Fetches the login names for the given user IDs as a dict of user ID -> login name.
+        User IDs that are not found are left out of the returned dict."""
+        login_names = {}
+        for i in range(0, len(user_ids), self.USERS_PER_REQUEST):
+            for user in self.fetch_users(user_ids=user_ids[i : i + self.USERS_PER_REQUEST]):
+                login_names[user["id"]] = user["login"]
+
+        return login_names
+
+    def get_login_names(self, user_ids):
+        """Gets the twitch login names for the given user IDs, utilizing the same cache as get_login_name.
+        Only cache misses are fetched from the twitch API, in chunks of USERS_PER_REQUEST.
+        Returns a dict of user ID -> login name, with None for users that were not found."""
+
+        return self.cache.cache_bulk_fetch_fn(
+            redis_key_fn=lambda user_id: "api:twitch:helix:login-name:{}".format(user_id),
+            keys=user_ids,
+            fetch_fn=self.fetch_login_names,
+            expiry=lambda response: 30 if response is None else 300,
+        )
+
+    def fetch_user_ids(self, logins):
+        """Fetches the user IDs for the given (lowercase) login names as a dict of login name -> user ID.
+        Login names that are not found are left out of the returned dict."""
+        user_ids = {}
+        for i in range(0, len(logins), self.USERS_PER_REQUEST):
+            for user in self.fetch_users(logins=logins[i : i + self.USERS_PER_REQUEST]):
+                user_ids[user["login"]] = user["id"]
+
+        return user_ids
+
+    def get_user_ids(self, logins):
+        """Gets the twitch user IDs for the given (lowercase) login names, utilizing the same cache as get_user_id.
+        Only cache misses are fetched from the twitch API, in chunks of USERS_PER_REQUEST.
+        Returns a dict of login name -> user ID, with None for users that were not found."""
+
+        return self.cache.cache_bulk_fetch_fn(
+            redis_key_fn=lambda login: "api:twitch:helix:user-id:{}".format(login),
+            keys=logins,
+            fetch_fn=self.fetch_user_ids,
+            expiry=lambda response: 30 if response is None else 300,
+        )
+
     def fetch_follow_since(self, from_id, to_id):
         response = self.get("/users/follows", {"from_id": from_id, "to_id": to_id})
 
@@ -182,6 +235,15 @@ class TwitchHelixAPI(BaseTwitchAPI):
         #   }
         # }
 
+        # hieroglyph display names are not just a capitalized variant of the login name,
+        # so their login names have to be looked up from the user IDs (all at once)
+        hieroglyph_user_ids = [
+            sub_data["user_id"]
+            for sub_data in response["data"]
+            if not self.CAPITALIZED_LOGIN_NAME_REGEX.match(sub_data["user_name"])
+        ]
+        login_names = self.get_login_names(hieroglyph_user_ids)
+
         subscribers = []
 
         for sub_data in response["data"]:
@@ -192,9 +254,8 @@ class TwitchHelixAPI(BaseTwitchAPI):
                 # we can directly compute the login name by lowercasing the display name
                 login_name = display_name.lower()
             else:
-                # hieroglyph display name, another API call is required to look up their login name from the user ID
                 user_id = sub_data["user_id"]
-                login_name = self.get_login_name(user_id)
+                login_name = login_names[user_id]
 
                 if login_name is None:
                     # user_id not found?!?!
@@ -204,7 +265,7 @@ class TwitchHelixAPI(BaseTwitchAPI):
                         "Just fetched %s (%s) to be a subscriber of %s but was not"
                         " able to locate them as a user by their ID "
                         "(user will not be counted as a subscriber)",
-                        login_name,
+                        display_name,
                         user_id,
                         broadcaster_id,
                     )
@@ -1,15 +1,112 @@
+import codecs
+import json
+import re
+
 from pajbot.apiwrappers.base import BaseAPI
 
 
+class ChattersStreamParser:
+    """
+    Incremental parser for the chatters document returned by TMI, which looks like
+    {"chatter_count": 3, "chatters": {"moderators": ["a"], "vips": [], "viewers": ["b", "c"], ...}}
+
+    Text is passed to feed() in chunks as it is downloaded, and each call returns the (category, login) tuples
+    completed by that chunk, so the whole document never has to be kept in memory.
+    """
+
+    TOKEN_RE = re.compile(r'\s*(?:("(?:[^"\\]|\\.)*")|([{}\[\]:,])|([^\s{}\[\]:,"]+))')
+
+    def __init__(self):
+        self.buffer = ""
+
+        # One [type, key] entry per open object/array. For objects, key is the key of the value being parsed
+        self.stack = []
+        self.expecting_key = False
+
+    def in_chatters_category(self):
+        return (
+            len(self.stack) == 3
+            and self.stack[0][1] == "chatters"
+            and self.stack[1][0] == "{"
+            and self.stack[2][0] == "["
+        )
+
+    def feed(self, text, final=False):
+        self.buffer += text
+        chatters = []
+
+        pos = 0
+        while True:
+            match = self.TOKEN_RE.match(self.buffer, pos)
+            if match is None:
+                break
+
+            string, punctuation, literal = match.groups()
+            if literal is not None and match.end() == len(self.buffer) and not final:
+                # e.g. a number that continues in the next chunk
+                break
+
+            pos = match.end()
+
+            if punctuation == "{":
+                self.stack.append(["{", None])
+                self.expecting_key = True
+            elif punctuation == "[":
+                self.stack.append(["[", None])
+                self.expecting_key = False
+            elif punctuation in ("}", "]"):
+                self.stack.pop()
+                self.expecting_key = False
+            elif punctuation == ",":
+                self.expecting_key = len(self.stack) > 0 and self.stack[-1][0] == "{"
+            elif punctuation == ":":
+                self.expecting_key = False
+            elif string is not None:
+                if self.expecting_key:
+                    self.stack[-1][1] = json.loads(string)
+                elif self.in_chatters_category():
+                    chatters.append((self.stack[1][1], json.loads(string)))
+
+        self.buffer = self.buffer[pos:]
+
+        if final and (self.buffer.strip() or self.stack):
+            raise ValueError("Incomplete or invalid chatters document")
+
+        return chatters
+
+
 class TwitchTMIAPI(BaseAPI):
     def __init__(self):
         super().__init__(base_url="https://tmi.twitch.tv/")
 
-    def get_chatter_logins_by_login(self, login):
-        response = self.get(["group", "user", login, "chatters"])
+    def iter_chatters(self, login, batch_size=1000):
+        """Yields (category, logins) tuples with up to batch_size logins of the same category (e.g. moderators,
+        vips, viewers) each, while the chatters document is still being downloaded."""
+        parser = ChattersStreamParser()
+        decoder = codecs.getincrementaldecoder("utf-8")()
 
+        batch_category = None
+        batch = []
+
+        with self.get_response(["group", "user", login, "chatters"], stream=True) as response:
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                for category, chatter in parser.feed(decoder.decode(chunk)):
+                    if batch and (category != batch_category or len(batch) >= batch_size):
+                        yield batch_category, batch
+                        batch = []
+
+                    batch_category = category
+                    batch.append(chatter)
+
+        # The document always ends with closing brackets, so no chatters can be completed by the final call
+        parser.feed(decoder.decode(b"", final=True), final=True)
+
+        if batch:
+            yield batch_category, batch
+
+    def get_chatter_logins_by_login(self, login):
         all_chatters = []
-        for chatter_category in response["chatters"].values():
-            all_chatters.extend(chatter_category)
+        for _, chatters in self.iter_chatters(login):
+            all_chatters.extend(chatters)
 
         return all_chatters
@@ -7,7 +7,6 @@ import urllib
 
 import irc.client
 import requests
-from numpy import random
 from pytz import timezone
 
 import pajbot.migration_revisions.db
@@ -25,13 +24,17 @@ from pajbot.apiwrappers.twitch.kraken_v5 import TwitchKrakenV5API
 from pajbot.apiwrappers.twitch.legacy import TwitchLegacyAPI
 from pajbot.apiwrappers.twitch.tmi import TwitchTMIAPI
 from pajbot.constants import VERSION
+from pajbot.managers.chathistory import ChatHistory
 from pajbot.managers.command import CommandManager
 from pajbot.managers.db import DBManager
 from pajbot.managers.deck import DeckManager
 from pajbot.managers.emote import EmoteManager, EpmManager, EcountManager
 from pajbot.managers.handler import HandlerManager
 from pajbot.managers.irc import IRCManager
+from pajbot.managers.knownusers import KnownUsers
 from pajbot.managers.kvi import KVIManager
+from pajbot.managers.leaderboard import LeaderboardManager
+from pajbot.managers.loadgovernor import LoadGovernor
 from pajbot.managers.redis import RedisManager
 from pajbot.managers.schedule import ScheduleManager
 from pajbot.managers.time import TimeManager
@@ -45,9 +48,12 @@ from pajbot.models.action import ActionParser
 from pajbot.models.banphrase import BanphraseManager
 from pajbot.models.module import ModuleManager
 from pajbot.models.pleblist import PleblistManager
+from pajbot.models.pointslog import PointsLog
+from pajbot.models.sock import SocketClientManager
 from pajbot.models.sock import SocketManager
 from pajbot.models.stream import StreamManager
 from pajbot.models.timer import TimerManager
+from pajbot.startup import StartupOrchestrator
 from pajbot.streamhelper import StreamHelper
 from pajbot.tmi import TMI
 from pajbot import utils
@@ -128,25 +134,6 @@ class Bot:
         self.twitch_legacy_api = TwitchLegacyAPI(self.api_client_credentials, RedisManager.get())
         self.twitch_tmi_api = TwitchTMIAPI()
 
-        self.bot_user_id = self.twitch_helix_api.get_user_id(self.nickname)
-        if self.bot_user_id is None:
-            raise ValueError("The bot login name you entered under [main] does not exist on twitch.")
-
-        self.streamer_user_id = self.twitch_helix_api.get_user_id(self.streamer)
-        if self.streamer_user_id is None:
-            raise ValueError("The streamer login name you entered under [main] does not exist on twitch.")
-
-        # SQL migrations
-        sql_conn = DBManager.engine.connect().connection
-        sql_migratable = DatabaseMigratable(sql_conn)
-        sql_migration = Migration(sql_migratable, pajbot.migration_revisions.db, self)
-        sql_migration.run()
-
-        # Redis migrations
-        redis_migratable = RedisMigratable(redis_options=redis_options, namespace=self.streamer)
-        redis_migration = Migration(redis_migratable, pajbot.migration_revisions.redis, self)
-        redis_migration.run()
-
         # Actions in this queue are run in a separate thread.
         # This means actions should NOT access any database-related stuff.
         self.action_queue = ActionQueue()
@@ -159,16 +146,51 @@ class Bot:
         HandlerManager.init_handlers()
 
         self.socket_manager = SocketManager(self.streamer, self.execute_now)
-        self.stream_manager = StreamManager(self)
+        SocketClientManager.init(self.streamer)
 
-        StreamHelper.init_bot(self, self.stream_manager)
+        # The banphrase and timer managers only register their handlers here, their data is loaded further down
+        self.banphrase_manager = BanphraseManager(self)
+        self.timer_manager = TimerManager(self)
+
+        # The scheduler is started before the emote manager is created, so its hourly refresh gets registered
         ScheduleManager.init()
 
-        self.users = UserManager()
-        self.decks = DeckManager()
-        self.banphrase_manager = BanphraseManager(self).load()
-        self.timer_manager = TimerManager(self).load()
-        self.kvi = KVIManager()
+        # The emote providers are loaded by startup steps below instead of one after another on the action queue
+        self.emote_manager = EmoteManager(
+            self.twitch_v5_api, self.twitch_legacy_api, self.action_queue, load_emotes=False
+        )
+
+        # Steps that only wait on twitch, postgres or redis run concurrently.
+        # Migrations must finish before anything reads from the tables they touch.
+        startup = StartupOrchestrator(max_workers=8)
+        startup.add_step("bot_user_id", lambda: self.twitch_helix_api.get_user_id(self.nickname))
+        startup.add_step("streamer_user_id", lambda: self.twitch_helix_api.get_user_id(self.streamer))
+        startup.add_step("sql_migrations", self._run_sql_migrations)
+        startup.add_step("redis_migrations", lambda: self._run_redis_migrations(redis_options))
+        startup.add_step("banphrases", self.banphrase_manager.load, depends_on=["sql_migrations"])
+        startup.add_step("timers", self.timer_manager.load, depends_on=["sql_migrations"])
+        startup.add_step("bttv_emotes", lambda: self._load_emotes(self.emote_manager.bttv_emote_manager))
+        startup.add_step("ffz_emotes", lambda: self._load_emotes(self.emote_manager.ffz_emote_manager))
+        startup.add_step("twitch_emotes", lambda: self._load_emotes(self.emote_manager.twitch_emote_manager))
+        results = startup.run()
+
+        self.bot_user_id = results["bot_user_id"]
+        if self.bot_user_id is None:
+            raise ValueError("The bot login name you entered under [main] does not exist on twitch.")
+
+        self.streamer_user_id = results["streamer_user_id"]
+        if self.streamer_user_id is None:
+            raise ValueError("The streamer login name you entered under [main] does not exist on twitch.")
+
+        with startup.measure("stream_manager"):
+            self.stream_manager = StreamManager(self)
+
+        StreamHelper.init_bot(self, self.stream_manager)
+
+        with startup.measure("users"):
+            self.users = UserManager()
+            self.decks = DeckManager()
+            self.kvi = KVIManager()
 
         # bot access token
         if "password" in self.config["main"]:
@@ -195,14 +217,24 @@ class Bot:
                 api=self.twitch_id_api, redis=RedisManager.get(), username=self.nickname, user_id=self.bot_user_id
             )
 
-        self.emote_manager = EmoteManager(self.twitch_v5_api, self.twitch_legacy_api, self.action_queue)
+        self.chat_history = ChatHistory(stream_length=config["main"].getint("chat_history_stream_length", 0))
+        try:
+            self.chat_history.load()
+        except:
+            log.exception("Failed to load the chat history")
+        ScheduleManager.execute_every(ChatHistory.FLUSH_INTERVAL, self.chat_history.flush)
+
         self.epm_manager = EpmManager()
         self.ecount_manager = EcountManager()
         self.twitter_manager = TwitterManager(self)
-        self.module_manager = ModuleManager(self.socket_manager, bot=self).load()
-        self.commands = CommandManager(
-            socket_manager=self.socket_manager, module_manager=self.module_manager, bot=self
-        ).load()
+
+        # Modules are constructed on the main thread, since they register handlers and touch the rest of the bot
+        with startup.measure("modules"):
+            self.module_manager = ModuleManager(self.socket_manager, bot=self).load()
+        with startup.measure("commands"):
+            self.commands = CommandManager(
+                socket_manager=self.socket_manager, module_manager=self.module_manager, bot=self
+            ).load()
         self.websocket_manager = WebSocketManager(self)
 
         HandlerManager.trigger("on_managers_loaded")
@@ -211,7 +243,17 @@ class Bot:
         self.commitable = {"commands": self.commands, "banphrases": self.banphrase_manager}
 
         self.execute_every(10 * 60, self.commit_all)
+        self.execute_every(10 * 60, self.commands.publish_catalog)
         self.execute_every(1, self.do_tick)
+        self.execute_every(1, LoadGovernor.update)
+
+        ScheduleManager.execute_now(LeaderboardManager.refresh)
+        ScheduleManager.execute_every(LeaderboardManager.REFRESH_INTERVAL, LeaderboardManager.refresh)
+
+        ScheduleManager.execute_now(KnownUsers.load)
+
+        PointsLog.enabled = True
+        ScheduleManager.execute_every(PointsLog.FLUSH_INTERVAL, PointsLog.flush)
 
         # promote the admin to level 2000
         admin = None
@@ -263,6 +305,27 @@ class Bot:
             "molly_age_in_years": self.c_molly_age_in_years,
         }
 
+        startup.log_timeline()
+
+    def _run_sql_migrations(self):
+        with DBManager.engine.connect() as connection:
+            sql_migratable = DatabaseMigratable(connection.connection)
+            sql_migration = Migration(sql_migratable, pajbot.migration_revisions.db, self)
+            sql_migration.run()
+
+    def _run_redis_migrations(self, redis_options):
+        redis_migratable = RedisMigratable(redis_options=redis_options, namespace=self.streamer)
+        redis_migration = Migration(redis_migratable, pajbot.migration_revisions.redis, self)
+        redis_migration.run()
+
+    @staticmethod
+    def _load_emotes(emote_manager):
+        # An emote provider being unavailable should not prevent the bot from starting
+        try:
+            emote_manager.load_all()
+        except:
+            log.exception("Failed to load %s emotes", emote_manager.friendly_name)
+
     @property
     def password(self):
         return "oauth:{}".format(self.bot_token_manager.token.access_token)
@@ -671,6 +734,8 @@ class Bot:
         emote_instances, emote_counts = self.emote_manager.parse_all_emotes(message, emote_tag)
 
         if not whisper:
+            self.chat_history.add(source.username, msg_id, message)
+
             # increment epm and ecount
             self.epm_manager.handle_emotes(emote_counts)
             self.ecount_manager.handle_emotes(emote_counts)
@@ -755,7 +820,7 @@ class Bot:
         username = event.source.user.lower()
 
         # We use .lower() in case twitch ever starts sending non-lowercased usernames
-        with self.users.get_user_context(username) as source:
+        with LoadGovernor.measure(), self.users.get_user_context(username) as source:
             res = HandlerManager.trigger("on_pubmsg", source=source, message=event.arguments[0])
             if res is False:
                 return False
@@ -778,6 +843,8 @@ class Bot:
         quit_delay = 0
 
         if quit_chub is not None and event.target == ("#{}".format(quit_chub)):
+            from numpy import random
+
             quit_delay_random = 300
             try:
                 if message is not None and int(message.split()[0]) >= 1:
@@ -791,6 +858,7 @@ class Bot:
 
     def quit_bot(self, **options):
         self.commit_all()
+        PointsLog.flush()
         HandlerManager.trigger("on_quit")
         phrase_data = {"nickname": self.nickname, "version": self.version_long}
 
@@ -1,3 +1,5 @@
+import re
+
 ALL_EMOJI = [
     "😀",
     "😃",
@@ -3836,3 +3838,383 @@ ALL_EMOJI = [
     "🏴󠁧󠁢󠁳󠁣󠁴󠁿",
     "🏴󠁧󠁢󠁷󠁬󠁳󠁿",
 ]
+
+# Matches the first character of any of the emoji above
+EMOJI_START = "[\\#\\*0-9©®‼⁉™ℹ↔-↙↩-↪⌚-⌛⌨⏏⏩-⏳⏸-⏺Ⓜ▪-▫▶◀◻-◾☀-☄☎☑☔-☕☘☝☠☢-☣☦☪☮-☯☸-☺♀♂♈-♓♟-♠♣♥-♦♨♻♾-♿⚒-⚗⚙⚛-⚜⚠-⚡⚪-⚫⚰-⚱⚽-⚾⛄-⛅⛈⛎-⛏⛑⛓-⛔⛩-⛪⛰-⛵⛷-⛺⛽✂✅✈-✍✏✒✔✖✝✡✨✳-✴❄❇❌❎❓-❕❗❣-❤➕-➗➡➰➿⤴-⤵⬅-⬇⬛-⬜⭐⭕〰〽㊗㊙🀄🃏🅰-🅱🅾-🅿🆎🆑-🆚🇦-🇿🈁-🈂🈚🈯🈲-🈺🉐-🉑🌀-🌡🌤-🎓🎖-🎗🎙-🎛🎞-🏰🏳-🏵🏷-📽📿-🔽🕉-🕎🕐-🕧🕯-🕰🕳-🕺🖇🖊-🖍🖐🖕-🖖🖤-🖥🖨🖱-🖲🖼🗂-🗄🗑-🗓🗜-🗞🗡🗣🗨🗯🗳🗺-🙏🚀-🛅🛋-🛒🛕🛠-🛥🛩🛫-🛬🛰🛳-🛺🟠-🟫🤍-🤺🤼-🥅🥇-🥱🥳-🥶🥺-🦢🦥-🦪🦮-🧊🧍-🧿🩰-🩳🩸-🩺🪀-🪂🪐-🪕]"
+
+# Matches any of the emoji above, longest first
+ALL_EMOJI_REGEX = re.compile(
+    "(?="
+    + EMOJI_START
+    + ")(?:"
+    + "|".join(
+        [
+            "\\#(?:️⃣|⃣)",
+            "\\*(?:️⃣|⃣)",
+            "0(?:️⃣|⃣)",
+            "1(?:️⃣|⃣)",
+            "2(?:️⃣|⃣)",
+            "3(?:️⃣|⃣)",
+            "4(?:️⃣|⃣)",
+            "5(?:️⃣|⃣)",
+            "6(?:️⃣|⃣)",
+            "7(?:️⃣|⃣)",
+            "8(?:️⃣|⃣)",
+            "9(?:️⃣|⃣)",
+            "©(?:️)?",
+            "®(?:️)?",
+            "‼(?:️)?",
+            "⁉(?:️)?",
+            "™(?:️)?",
+            "ℹ(?:️)?",
+            "↔(?:️)?",
+            "↕(?:️)?",
+            "↖(?:️)?",
+            "↗(?:️)?",
+            "↘(?:️)?",
+            "↙(?:️)?",
+            "↩(?:️)?",
+            "↪(?:️)?",
+            "⌨(?:️)?",
+            "⏏(?:️)?",
+            "⏭(?:️)?",
+            "⏮(?:️)?",
+            "⏯(?:️)?",
+            "⏱(?:️)?",
+            "⏲(?:️)?",
+            "⏸(?:️)?",
+            "⏹(?:️)?",
+            "⏺(?:️)?",
+            "Ⓜ(?:️)?",
+            "▪(?:️)?",
+            "▫(?:️)?",
+            "▶(?:️)?",
+            "◀(?:️)?",
+            "◻(?:️)?",
+            "◼(?:️)?",
+            "☀(?:️)?",
+            "☁(?:️)?",
+            "☂(?:️)?",
+            "☃(?:️)?",
+            "☄(?:️)?",
+            "☎(?:️)?",
+            "☑(?:️)?",
+            "☘(?:️)?",
+            "☝(?:[️🏻-🏿])?",
+            "☠(?:️)?",
+            "☢(?:️)?",
+            "☣(?:️)?",
+            "☦(?:️)?",
+            "☪(?:️)?",
+            "☮(?:️)?",
+            "☯(?:️)?",
+            "☸(?:️)?",
+            "☹(?:️)?",
+            "☺(?:️)?",
+            "♀(?:️)?",
+            "♂(?:️)?",
+            "♟(?:️)?",
+            "♠(?:️)?",
+            "♣(?:️)?",
+            "♥(?:️)?",
+            "♦(?:️)?",
+            "♨(?:️)?",
+            "♻(?:️)?",
+            "♾(?:️)?",
+            "⚒(?:️)?",
+            "⚔(?:️)?",
+            "⚕(?:️)?",
+            "⚖(?:️)?",
+            "⚗(?:️)?",
+            "⚙(?:️)?",
+            "⚛(?:️)?",
+            "⚜(?:️)?",
+            "⚠(?:️)?",
+            "⚰(?:️)?",
+            "⚱(?:️)?",
+            "⛈(?:️)?",
+            "⛏(?:️)?",
+            "⛑(?:️)?",
+            "⛓(?:️)?",
+            "⛩(?:️)?",
+            "⛰(?:️)?",
+            "⛱(?:️)?",
+            "⛴(?:️)?",
+            "⛷(?:️)?",
+            "⛸(?:️)?",
+            "⛹(?:‍(?:♀(?:️)?|♂(?:️)?)|️(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "✂(?:️)?",
+            "✈(?:️)?",
+            "✉(?:️)?",
+            "✊(?:[🏻-🏿])?",
+            "✋(?:[🏻-🏿])?",
+            "✌(?:[️🏻-🏿])?",
+            "✍(?:[️🏻-🏿])?",
+            "✏(?:️)?",
+            "✒(?:️)?",
+            "✔(?:️)?",
+            "✖(?:️)?",
+            "✝(?:️)?",
+            "✡(?:️)?",
+            "✳(?:️)?",
+            "✴(?:️)?",
+            "❄(?:️)?",
+            "❇(?:️)?",
+            "❣(?:️)?",
+            "❤(?:️)?",
+            "➡(?:️)?",
+            "⤴(?:️)?",
+            "⤵(?:️)?",
+            "⬅(?:️)?",
+            "⬆(?:️)?",
+            "⬇(?:️)?",
+            "〰(?:️)?",
+            "〽(?:️)?",
+            "㊗(?:️)?",
+            "㊙(?:️)?",
+            "🅰(?:️)?",
+            "🅱(?:️)?",
+            "🅾(?:️)?",
+            "🅿(?:️)?",
+            "🇦[🇨-🇬🇮🇱-🇲🇴🇶-🇺🇼-🇽🇿]",
+            "🇧[🇦-🇧🇩-🇯🇱-🇴🇶-🇹🇻-🇼🇾-🇿]",
+            "🇨[🇦🇨-🇩🇫-🇮🇰-🇵🇷🇺-🇿]",
+            "🇩[🇪🇬🇯-🇰🇲🇴🇿]",
+            "🇪[🇦🇨🇪🇬-🇭🇷-🇺]",
+            "🇫[🇮-🇰🇲🇴🇷]",
+            "🇬[🇦-🇧🇩-🇮🇱-🇳🇵-🇺🇼🇾]",
+            "🇭[🇰🇲-🇳🇷🇹-🇺]",
+            "🇮[🇨-🇪🇱-🇴🇶-🇹]",
+            "🇯[🇪🇲🇴-🇵]",
+            "🇰[🇪🇬-🇮🇲-🇳🇵🇷🇼🇾-🇿]",
+            "🇱[🇦-🇨🇮🇰🇷-🇻🇾]",
+            "🇲[🇦🇨-🇭🇰-🇿]",
+            "🇳[🇦🇨🇪-🇬🇮🇱🇴-🇵🇷🇺🇿]",
+            "🇴🇲",
+            "🇵[🇦🇪-🇭🇰-🇳🇷-🇹🇼🇾]",
+            "🇶🇦",
+            "🇷[🇪🇴🇸🇺🇼]",
+            "🇸[🇦-🇪🇬-🇴🇷-🇹🇻🇽-🇿]",
+            "🇹[🇦🇨-🇩🇫-🇭🇯-🇴🇷🇹🇻-🇼🇿]",
+            "🇺[🇦🇬🇲-🇳🇸🇾-🇿]",
+            "🇻[🇦🇨🇪🇬🇮🇳🇺]",
+            "🇼[🇫🇸]",
+            "🇽🇰",
+            "🇾[🇪🇹]",
+            "🇿[🇦🇲🇼]",
+            "🈂(?:️)?",
+            "🈷(?:️)?",
+            "🌡(?:️)?",
+            "🌤(?:️)?",
+            "🌥(?:️)?",
+            "🌦(?:️)?",
+            "🌧(?:️)?",
+            "🌨(?:️)?",
+            "🌩(?:️)?",
+            "🌪(?:️)?",
+            "🌫(?:️)?",
+            "🌬(?:️)?",
+            "🌶(?:️)?",
+            "🍽(?:️)?",
+            "🎅(?:[🏻-🏿])?",
+            "🎖(?:️)?",
+            "🎗(?:️)?",
+            "🎙(?:️)?",
+            "🎚(?:️)?",
+            "🎛(?:️)?",
+            "🎞(?:️)?",
+            "🎟(?:️)?",
+            "🏂(?:[🏻-🏿])?",
+            "🏃(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🏄(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🏇(?:[🏻-🏿])?",
+            "🏊(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🏋(?:‍(?:♀(?:️)?|♂(?:️)?)|️(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🏌(?:‍(?:♀(?:️)?|♂(?:️)?)|️(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🏍(?:️)?",
+            "🏎(?:️)?",
+            "🏔(?:️)?",
+            "🏕(?:️)?",
+            "🏖(?:️)?",
+            "🏗(?:️)?",
+            "🏘(?:️)?",
+            "🏙(?:️)?",
+            "🏚(?:️)?",
+            "🏛(?:️)?",
+            "🏜(?:️)?",
+            "🏝(?:️)?",
+            "🏞(?:️)?",
+            "🏟(?:️)?",
+            "🏳(?:‍🌈|️(?:‍🌈)?)?",
+            "🏴(?:‍☠(?:️)?|󠁧󠁢(?:󠁥󠁮󠁧󠁿|󠁳󠁣󠁴󠁿|󠁷󠁬󠁳󠁿))?",
+            "🏵(?:️)?",
+            "🏷(?:️)?",
+            "🐕(?:‍🦺)?",
+            "🐿(?:️)?",
+            "👁(?:‍🗨(?:️)?|️(?:‍🗨(?:️)?)?)?",
+            "👂(?:[🏻-🏿])?",
+            "👃(?:[🏻-🏿])?",
+            "👆(?:[🏻-🏿])?",
+            "👇(?:[🏻-🏿])?",
+            "👈(?:[🏻-🏿])?",
+            "👉(?:[🏻-🏿])?",
+            "👊(?:[🏻-🏿])?",
+            "👋(?:[🏻-🏿])?",
+            "👌(?:[🏻-🏿])?",
+            "👍(?:[🏻-🏿])?",
+            "👎(?:[🏻-🏿])?",
+            "👏(?:[🏻-🏿])?",
+            "👐(?:[🏻-🏿])?",
+            "👦(?:[🏻-🏿])?",
+            "👧(?:[🏻-🏿])?",
+            "👨(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|❤(?:‍(?:💋‍👨|👨)|️‍(?:💋‍👨|👨))|👦(?:‍👦)?|👧(?:‍[👦-👧])?|👨‍(?:👦(?:‍👦)?|👧(?:‍[👦-👧])?)|👩‍(?:👦(?:‍👦)?|👧(?:‍[👦-👧])?)|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽])|🏻(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏼(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍👨🏻|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏽(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍👨[🏻-🏼]|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏾(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍👨[🏻-🏽]|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏿(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍👨[🏻-🏾]|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?)?",
+            "👩(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|❤(?:‍(?:💋‍[👨-👩]|[👨-👩])|️‍(?:💋‍[👨-👩]|[👨-👩]))|👦(?:‍👦)?|👧(?:‍[👦-👧])?|👩‍(?:👦(?:‍👦)?|👧(?:‍[👦-👧])?)|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽])|🏻(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍👨[🏼-🏿]|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏼(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍(?:👨[🏻🏽-🏿]|👩🏻)|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏽(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍(?:👨[🏻-🏼🏾-🏿]|👩[🏻-🏼])|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏾(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍(?:👨[🏻-🏽🏿]|👩[🏻-🏽])|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?|🏿(?:‍(?:⚕(?:️)?|⚖(?:️)?|✈(?:️)?|🤝‍(?:👨[🏻-🏾]|👩[🏻-🏾])|[🌾🍳🎓🎤🎨🏫🏭💻-💼🔧🔬🚀🚒🦯-🦳🦼-🦽]))?)?",
+            "👫(?:[🏻-🏿])?",
+            "👬(?:[🏻-🏿])?",
+            "👭(?:[🏻-🏿])?",
+            "👮(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "👯(?:‍(?:♀(?:️)?|♂(?:️)?))?",
+            "👰(?:[🏻-🏿])?",
+            "👱(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "👲(?:[🏻-🏿])?",
+            "👳(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "👴(?:[🏻-🏿])?",
+            "👵(?:[🏻-🏿])?",
+            "👶(?:[🏻-🏿])?",
+            "👷(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "👸(?:[🏻-🏿])?",
+            "👼(?:[🏻-🏿])?",
+            "💁(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "💂(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "💃(?:[🏻-🏿])?",
+            "💅(?:[🏻-🏿])?",
+            "💆(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "💇(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "💪(?:[🏻-🏿])?",
+            "📽(?:️)?",
+            "🕉(?:️)?",
+            "🕊(?:️)?",
+            "🕯(?:️)?",
+            "🕰(?:️)?",
+            "🕳(?:️)?",
+            "🕴(?:[️🏻-🏿])?",
+            "🕵(?:‍(?:♀(?:️)?|♂(?:️)?)|️(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🕶(?:️)?",
+            "🕷(?:️)?",
+            "🕸(?:️)?",
+            "🕹(?:️)?",
+            "🕺(?:[🏻-🏿])?",
+            "🖇(?:️)?",
+            "🖊(?:️)?",
+            "🖋(?:️)?",
+            "🖌(?:️)?",
+            "🖍(?:️)?",
+            "🖐(?:[️🏻-🏿])?",
+            "🖕(?:[🏻-🏿])?",
+            "🖖(?:[🏻-🏿])?",
+            "🖥(?:️)?",
+            "🖨(?:️)?",
+            "🖱(?:️)?",
+            "🖲(?:️)?",
+            "🖼(?:️)?",
+            "🗂(?:️)?",
+            "🗃(?:️)?",
+            "🗄(?:️)?",
+            "🗑(?:️)?",
+            "🗒(?:️)?",
+            "🗓(?:️)?",
+            "🗜(?:️)?",
+            "🗝(?:️)?",
+            "🗞(?:️)?",
+            "🗡(?:️)?",
+            "🗣(?:️)?",
+            "🗨(?:️)?",
+            "🗯(?:️)?",
+            "🗳(?:️)?",
+            "🗺(?:️)?",
+            "🙅(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙆(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙇(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙋(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙌(?:[🏻-🏿])?",
+            "🙍(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙎(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🙏(?:[🏻-🏿])?",
+            "🚣(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🚴(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🚵(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🚶(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🛀(?:[🏻-🏿])?",
+            "🛋(?:️)?",
+            "🛌(?:[🏻-🏿])?",
+            "🛍(?:️)?",
+            "🛎(?:️)?",
+            "🛏(?:️)?",
+            "🛠(?:️)?",
+            "🛡(?:️)?",
+            "🛢(?:️)?",
+            "🛣(?:️)?",
+            "🛤(?:️)?",
+            "🛥(?:️)?",
+            "🛩(?:️)?",
+            "🛰(?:️)?",
+            "🛳(?:️)?",
+            "🤏(?:[🏻-🏿])?",
+            "🤘(?:[🏻-🏿])?",
+            "🤙(?:[🏻-🏿])?",
+            "🤚(?:[🏻-🏿])?",
+            "🤛(?:[🏻-🏿])?",
+            "🤜(?:[🏻-🏿])?",
+            "🤞(?:[🏻-🏿])?",
+            "🤟(?:[🏻-🏿])?",
+            "🤦(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🤰(?:[🏻-🏿])?",
+            "🤱(?:[🏻-🏿])?",
+            "🤲(?:[🏻-🏿])?",
+            "🤳(?:[🏻-🏿])?",
+            "🤴(?:[🏻-🏿])?",
+            "🤵(?:[🏻-🏿])?",
+            "🤶(?:[🏻-🏿])?",
+            "🤷(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🤸(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🤹(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🤼(?:‍(?:♀(?:️)?|♂(?:️)?))?",
+            "🤽(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🤾(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🦵(?:[🏻-🏿])?",
+            "🦶(?:[🏻-🏿])?",
+            "🦸(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🦹(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🦻(?:[🏻-🏿])?",
+            "🧍(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧎(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧏(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧑(?:‍🤝‍🧑|🏻(?:‍🤝‍🧑🏻)?|🏼(?:‍🤝‍🧑[🏻-🏼])?|🏽(?:‍🤝‍🧑[🏻-🏽])?|🏾(?:‍🤝‍🧑[🏻-🏾])?|🏿(?:‍🤝‍🧑[🏻-🏿])?)?",
+            "🧒(?:[🏻-🏿])?",
+            "🧓(?:[🏻-🏿])?",
+            "🧔(?:[🏻-🏿])?",
+            "🧕(?:[🏻-🏿])?",
+            "🧖(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧗(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧘(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧙(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧚(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧛(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧜(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧝(?:‍(?:♀(?:️)?|♂(?:️)?)|🏻(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏼(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏽(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏾(?:‍(?:♀(?:️)?|♂(?:️)?))?|🏿(?:‍(?:♀(?:️)?|♂(?:️)?))?)?",
+            "🧞(?:‍(?:♀(?:️)?|♂(?:️)?))?",
+            "🧟(?:‍(?:♀(?:️)?|♂(?:️)?))?",
+            "[⌚-⌛⏩-⏬⏰⏳◽-◾☔-☕♈-♓♿⚓⚡⚪-⚫⚽-⚾⛄-⛅⛎⛔⛪⛲-⛳⛵⛺⛽✅✨❌❎❓-❕❗➕-➗➰➿⬛-⬜⭐⭕🀄🃏🆎🆑-🆚🈁🈚🈯🈲-🈶🈸-🈺🉐-🉑🌀-🌠🌭-🌵🌷-🍼🍾-🎄🎆-🎓🎠-🏁🏅-🏆🏈-🏉🏏-🏓🏠-🏰🏸-🐔🐖-🐾👀👄-👅👑-👥👪👹-👻👽-💀💄💈-💩💫-📼📿-🔽🕋-🕎🕐-🕧🖤🗻-🙄🙈-🙊🚀-🚢🚤-🚳🚷-🚿🛁-🛅🛐-🛒🛕🛫-🛬🛴-🛺🟠-🟫🤍-🤎🤐-🤗🤝🤠-🤥🤧-🤯🤺🤿-🥅🥇-🥱🥳-🥶🥺-🦢🦥-🦪🦮-🦴🦷🦺🦼-🧊🧐🧠-🧿🩰-🩳🩸-🩺🪀-🪂🪐-🪕]",
+        ]
+    )
+    + ")"
+)
+
+
+def find_emoji(message):
+    """Returns a list of (start, end, emoji) tuples for all emoji in the message"""
+    return [(match.start(), match.end(), match.group()) for match in ALL_EMOJI_REGEX.finditer(message)]
+
+
+def contains_emoji(message):
+    return ALL_EMOJI_REGEX.search(message) is not None
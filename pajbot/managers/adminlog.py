@@ -20,6 +20,7 @@ class AdminLogManager:
     KEY = None
     TEMPLATES = {
         "Banphrase added": LogEntryTemplate('Added banphrase #{} "{}"'),
+        "Banphrase auto-disabled": LogEntryTemplate('Disabled banphrase #{} "{}" because it took too long to evaluate'),
         "Banphrase edited": LogEntryTemplate('Edited banphrase #{} from "{}"'),
         "Banphrase removed": LogEntryTemplate('Removed banphrase #{} "{}"'),
         "Banphrase toggled": LogEntryTemplate('{} banphrase #{} "{}"'),
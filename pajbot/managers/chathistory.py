@@ -0,0 +1,148 @@
+import collections
+import logging
+import threading
+
+from pajbot import utils
+from pajbot.managers.redis import RedisManager
+from pajbot.streamhelper import StreamHelper
+
+log = logging.getLogger(__name__)
+
+ChatHistoryEntry = collections.namedtuple("ChatHistoryEntry", ["timestamp", "username", "msg_id", "message"])
+
+
+class ChatHistory:
+    """
+    Bounded, in-memory history of the most recent chat messages, e.g. for nuking a phrase without
+    having to download the chat logs.
+
+    If stream_length is non-zero, the history is also mirrored into a capped redis stream, so it survives restarts.
+    New messages are written to the stream in bulk every FLUSH_INTERVAL seconds, so storing a message never waits
+    on redis.
+    """
+
+    FLUSH_INTERVAL = 1
+
+    def __init__(
+        self, max_messages=10000, stream_length=0, max_messages_per_user=50, max_users=5000, max_user_age=10 * 60
+    ):
+        self.entries = collections.deque(maxlen=max_messages)
+        self.stream_length = stream_length
+
+        # The most recent messages of each user who chatted in the last max_user_age seconds.
+        # Users are kept in order of their last message, so idle users are evicted from the front
+        self.user_entries = collections.OrderedDict()
+        self.user_entries_lock = threading.Lock()
+        self.max_messages_per_user = max_messages_per_user
+        self.max_users = max_users
+        self.max_user_age = max_user_age
+
+        self.pending_lock = threading.Lock()
+        self.pending = []
+
+    @staticmethod
+    def stream_key():
+        return "{streamer}:chat_history".format(streamer=StreamHelper.get_streamer())
+
+    def add(self, username, msg_id, message, timestamp=None):
+        if timestamp is None:
+            timestamp = utils.now().timestamp()
+
+        entry = ChatHistoryEntry(timestamp, username, msg_id, message)
+        self._append(entry)
+
+        if self.stream_length > 0:
+            with self.pending_lock:
+                self.pending.append(entry)
+
+        return entry
+
+    def _append(self, entry):
+        self.entries.append(entry)
+
+        with self.user_entries_lock:
+            user_entries = self.user_entries.get(entry.username, None)
+            if user_entries is None:
+                user_entries = self.user_entries[entry.username] = collections.deque(maxlen=self.max_messages_per_user)
+            else:
+                self.user_entries.move_to_end(entry.username)
+            user_entries.append(entry)
+
+            cutoff = entry.timestamp - self.max_user_age
+            while (
+                len(self.user_entries) > self.max_users or next(iter(self.user_entries.values()))[-1].timestamp < cutoff
+            ):
+                self.user_entries.popitem(last=False)
+
+    def last(self, count=None, seconds=None):
+        """Returns the last `count` messages and/or the messages of the last `seconds` seconds, oldest first"""
+        return self._last(list(self.entries), count, seconds)
+
+    def user_last(self, username, count=None, seconds=None):
+        """Like last, but only returns the messages of the given user. Only the messages of users who chatted in the
+        last max_user_age seconds are kept, at most max_messages_per_user per user"""
+        with self.user_entries_lock:
+            entries = list(self.user_entries.get(username, ()))
+
+        return self._last(entries, count, seconds)
+
+    @staticmethod
+    def _last(entries, count, seconds):
+        cutoff = None if seconds is None else utils.now().timestamp() - seconds
+
+        result = []
+        for entry in reversed(entries):
+            if count is not None and len(result) >= count:
+                break
+            if cutoff is not None and entry.timestamp < cutoff:
+                break
+            result.append(entry)
+
+        result.reverse()
+        return result
+
+    def flush(self):
+        with self.pending_lock:
+            entries, self.pending = self.pending, []
+
+        if not entries:
+            return
+
+        try:
+            with RedisManager.pipeline_context() as pipeline:
+                for entry in entries:
+                    pipeline.xadd(
+                        self.stream_key(),
+                        {
+                            "timestamp": entry.timestamp,
+                            "username": entry.username,
+                            "msg_id": entry.msg_id or "",
+                            "message": entry.message,
+                        },
+                        maxlen=self.stream_length,
+                    )
+        except:
+            log.exception("Failed to write {} messages to the chat history stream".format(len(entries)))
+
+    def load(self):
+        """Fills the in-memory history with the newest messages from the redis stream"""
+        if self.stream_length <= 0:
+            return
+
+        entries = self.read_stream(self.entries.maxlen)
+        for entry in entries:
+            self._append(entry)
+
+        log.info("Loaded {} messages from the chat history stream".format(len(entries)))
+
+    @staticmethod
+    def read_stream(count):
+        """Returns the newest `count` messages from the redis stream, oldest first.
+        Used by processes that don't receive chat messages themselves, e.g. the web interface"""
+        stream = RedisManager.get().xrevrange(ChatHistory.stream_key(), count=count)
+        return [
+            ChatHistoryEntry(
+                float(fields["timestamp"]), fields["username"], fields["msg_id"] or None, fields["message"]
+            )
+            for _, fields in reversed(stream)
+        ]
@@ -1,19 +1,90 @@
 import argparse
+import json
 import logging
 from collections import UserDict
 
 from sqlalchemy.orm import joinedload
 
 from pajbot.managers.db import DBManager
+from pajbot.managers.redis import RedisManager
 from pajbot.models.command import Command
 from pajbot.models.command import CommandData
 from pajbot.models.command import CommandExample
 from pajbot.models.command import parse_command_for_web
+from pajbot.streamhelper import StreamHelper
 from pajbot.utils import find
 
 log = logging.getLogger(__name__)
 
 
+class CommandCatalog:
+    """
+    The list of commands as shown on the website, pre-rendered and published to redis by the bot
+    whenever its commands are rebuilt, so the web process never has to construct its own CommandManager.
+
+    The catalog is stored as {"version": n, "commands": [...]} in {streamer}:commands:catalog,
+    and {streamer}:commands:catalog:version is bumped on every publish.
+    """
+
+    @staticmethod
+    def key():
+        return "{streamer}:commands:catalog".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def version_key():
+        return "{streamer}:commands:catalog:version".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def build(command_manager):
+        """Returns the jsonified list of commands of the given command manager.
+
+        parse_command_for_web fills in command.command for module commands, which the bot relies on being None
+        (see dispatch.py), so the original values are restored once the commands have been jsonified.
+        In the bot, this must therefore run on the same thread that runs commands."""
+
+        def walk(commands):
+            for command in commands:
+                yield command
+                if command.action is not None and command.action.type == "multi":
+                    yield from walk(command.action.commands.values())
+
+        original_values = [(command, command.command) for command in walk(command_manager.data.values())]
+
+        with DBManager.create_session_scope_nc() as db_session:
+            examples = {}
+            for example in db_session.query(CommandExample):
+                examples.setdefault(example.command_id, []).append(example.jsonify())
+
+        try:
+            commands = command_manager.parse_for_web()
+            commands.sort(key=lambda x: (x.id or -1, x.main_alias))
+
+            catalog = []
+            for command in commands:
+                data = command.jsonify()
+                if command.id in examples:
+                    data["examples"] = examples[command.id]
+                catalog.append(data)
+        finally:
+            for command, value in original_values:
+                command.command = value
+
+        return catalog
+
+    @staticmethod
+    def publish(commands, expire=None):
+        """Stores the given list of jsonified commands as the new version of the catalog.
+        Returns the new version"""
+        redis = RedisManager.get()
+        version = redis.incr(CommandCatalog.version_key())
+        redis.set(
+            CommandCatalog.key(),
+            json.dumps({"version": version, "commands": commands}, separators=(",", ":")),
+            ex=expire,
+        )
+        return version
+
+
 class CommandManager(UserDict):
     """ This class is responsible for compiling commands from multiple sources
     into one easily accessible source.
@@ -24,9 +95,14 @@ class CommandManager(UserDict):
 
     """
 
+    # Seconds to wait after a rebuild before the command catalog is published,
+    # so a burst of changes only results in one publish
+    CATALOG_PUBLISH_DELAY = 2
+
     def __init__(self, socket_manager=None, module_manager=None, bot=None):
         UserDict.__init__(self)
         self.db_session = DBManager.create_session()
+        self.catalog_publish_scheduled = False
 
         self.internal_commands = {}
         self.db_commands = {}
@@ -421,6 +497,24 @@ class CommandManager(UserDict):
             for enabled_module in self.module_manager.modules:
                 merge_commands(enabled_module.commands, self.data)
 
+        self.schedule_catalog_publish()
+
+    def schedule_catalog_publish(self):
+        if self.bot is None or self.catalog_publish_scheduled:
+            return
+
+        self.catalog_publish_scheduled = True
+        self.bot.execute_delayed(self.CATALOG_PUBLISH_DELAY, self.publish_catalog)
+
+    def publish_catalog(self):
+        self.catalog_publish_scheduled = False
+
+        try:
+            version = CommandCatalog.publish(CommandCatalog.build(self))
+            log.debug("Published command catalog version %s", version)
+        except:
+            log.exception("Failed to publish the command catalog")
+
     def load(self, **options):
         self.load_internal_commands()
         self.load_db_commands(**options)
@@ -127,7 +127,7 @@ class BTTVEmoteManager(GenericChannelEmoteManager):
 
 
 class EmoteManager:
-    def __init__(self, twitch_v5_api, twitch_legacy_api, action_queue):
+    def __init__(self, twitch_v5_api, twitch_legacy_api, action_queue, load_emotes=True):
         self.action_queue = action_queue
         self.twitch_emote_manager = TwitchEmoteManager(twitch_v5_api, twitch_legacy_api)
         self.ffz_emote_manager = FFZEmoteManager()
@@ -144,7 +144,8 @@ class EmoteManager:
         except:
             log.exception("Something went wrong trying to initialize automatic emote refresh")
 
-        self.load_all_emotes()
+        if load_emotes:
+            self.load_all_emotes()
 
     def update_all_emotes(self):
         self.action_queue.add(self.bttv_emote_manager.update_all)
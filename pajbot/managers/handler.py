@@ -1,6 +1,8 @@
 import logging
 import operator
 
+from pajbot.managers.loadgovernor import HandlerCriticality
+from pajbot.managers.loadgovernor import LoadGovernor
 from pajbot.utils import find
 
 log = logging.getLogger("pajbot")
@@ -85,9 +87,11 @@ class HandlerManager:
         HandlerManager.handlers[event] = []
 
     @staticmethod
-    def add_handler(event, method, priority=0):
+    def add_handler(event, method, priority=0, criticality=HandlerCriticality.CRITICAL):
+        """ criticality decides whether the handler may be skipped while the bot is under load,
+        see HandlerCriticality """
         try:
-            HandlerManager.handlers[event].append((method, priority))
+            HandlerManager.handlers[event].append((method, priority, criticality))
             HandlerManager.handlers[event].sort(key=operator.itemgetter(1), reverse=True)
         except KeyError:
             # No handlers for this event found
@@ -114,7 +118,10 @@ class HandlerManager:
             log.error("No handler set for event {}".format(event_name))
             return False
 
-        for handler, _ in HandlerManager.handlers[event_name]:
+        for handler, _, criticality in HandlerManager.handlers[event_name]:
+            if not LoadGovernor.should_run(criticality):
+                continue
+
             res = None
             try:
                 res = handler(*args, **kwargs)
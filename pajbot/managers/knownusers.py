@@ -0,0 +1,75 @@
+import logging
+
+from pajbot.managers.redis import RedisManager
+from pajbot.managers.schedule import ScheduleManager
+from pajbot.streamhelper import StreamHelper
+from pajbot.utils import BloomFilter
+
+log = logging.getLogger(__name__)
+
+
+class KnownUsers:
+    """
+    In-process filter of the usernames we have seen in chat (i.e. that have a last_seen value in redis),
+    so checking whether a word is a known username usually doesn't need a round trip to redis.
+
+    The filter is loaded from redis in the background when the bot starts, and usernames are added to it when
+    their last_seen value is set. Since the filter can have false positives, filter_known confirms its hits with
+    a single HMGET.
+    """
+
+    # The filter is sized for twice the number of users at load time, but for at least this many users
+    MIN_CAPACITY = 100000
+
+    # Number of hash fields fetched at once while loading the filter
+    LOAD_BATCH_SIZE = 10000
+
+    filter = None
+
+    # The filter that is currently being loaded, if any
+    loading_filter = None
+
+    @staticmethod
+    def key():
+        return "{streamer}:users:last_seen".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def load():
+        redis = RedisManager.get()
+        key = KnownUsers.key()
+
+        new_filter = BloomFilter(max(KnownUsers.MIN_CAPACITY, redis.hlen(key) * 2))
+        KnownUsers.loading_filter = new_filter
+        try:
+            for username, _ in redis.hscan_iter(key, count=KnownUsers.LOAD_BATCH_SIZE):
+                new_filter.add(username)
+        except:
+            log.exception("Failed to load the known users filter")
+            return
+        finally:
+            KnownUsers.loading_filter = None
+
+        KnownUsers.filter = new_filter
+        log.info("Loaded {} known users".format(new_filter.count))
+
+    @staticmethod
+    def add(username):
+        for known_filter in (KnownUsers.filter, KnownUsers.loading_filter):
+            if known_filter is not None and known_filter.add(username) and known_filter.count == known_filter.capacity:
+                # The false positive rate grows beyond what the filter was sized for, build a bigger one
+                ScheduleManager.execute_now(KnownUsers.load)
+
+    @staticmethod
+    def filter_known(usernames):
+        """Returns the set of the given usernames that we have seen in chat"""
+        known_filter = KnownUsers.filter
+        if known_filter is not None:
+            usernames = [username for username in usernames if username in known_filter]
+        else:
+            usernames = list(usernames)
+
+        if not usernames:
+            return set()
+
+        last_seen = RedisManager.get().hmget(KnownUsers.key(), usernames)
+        return {username for username, value in zip(usernames, last_seen) if value is not None}
@@ -0,0 +1,164 @@
+import json
+import logging
+
+from pajbot.managers.db import DBManager
+from pajbot.managers.redis import RedisManager
+from pajbot.models.duel import UserDuelStats
+from pajbot.models.user import User
+from pajbot.streamhelper import StreamHelper
+
+log = logging.getLogger(__name__)
+
+
+def _user_data(user):
+    return {
+        "username": user.username,
+        "username_raw": user.username_raw or user.username,
+        "level": user.level,
+        "subscriber": user.subscriber,
+    }
+
+
+def _user_column(column):
+    def query(db_session, size):
+        return [
+            {"user": _user_data(user), "value": getattr(user, column.key)}
+            for user in db_session.query(User).order_by(column.desc())[:size]
+        ]
+
+    return query
+
+
+def _duel_stats(order_by, value, *filters):
+    def query(db_session, size):
+        return [
+            {
+                "user": _user_data(user),
+                "value": getattr(stats, value),
+                "duels_won": stats.duels_won,
+                "duels_lost": stats.duels_lost,
+                "winrate": stats.winrate if stats.duels_total > 0 else 0,
+                "profit": stats.profit,
+            }
+            for stats, user in db_session.query(UserDuelStats, User)
+            .join(User, UserDuelStats.user_id == User.id)
+            .filter(*filters)
+            .order_by(order_by)[:size]
+        ]
+
+    return query
+
+
+def _num_lines(db_session, size):
+    redis = RedisManager.get()
+    streamer = StreamHelper.get_streamer()
+
+    top = redis.zrevrangebyscore(
+        "{streamer}:users:num_lines".format(streamer=streamer),
+        "+inf",
+        "-inf",
+        start=0,
+        num=size,
+        withscores=True,
+        score_cast_func=int,
+    )
+    if not top:
+        return []
+
+    usernames = [username for username, _ in top]
+    usernames_raw = redis.hmget("{streamer}:users:username_raw".format(streamer=streamer), usernames)
+    users = {user.username: user for user in db_session.query(User).filter(User.username.in_(usernames))}
+
+    entries = []
+    for (username, num_lines), username_raw in zip(top, usernames_raw):
+        user = users.get(username)
+        entries.append(
+            {
+                "user": {
+                    "username": username,
+                    "username_raw": username_raw or username,
+                    "level": user.level if user else 100,
+                    "subscriber": user.subscriber if user else False,
+                },
+                "value": num_lines,
+            }
+        )
+
+    return entries
+
+
+class LeaderboardManager:
+    """
+    Keeps snapshots of the top users for a set of metrics in redis, so the !top commands and the stats page
+    don't have to sort the user tables on every use.
+
+    The bot refreshes all snapshots every REFRESH_INTERVAL seconds. If a snapshot is missing
+    (e.g. because the bot is not running), it is computed on demand and cached like a refreshed one.
+    """
+
+    REFRESH_INTERVAL = 5 * 60
+
+    # Number of entries kept for each metric
+    SIZE = 10
+
+    METRICS = {
+        "points": _user_column(User.points),
+        "minutes_in_chat_online": _user_column(User.minutes_in_chat_online),
+        "minutes_in_chat_offline": _user_column(User.minutes_in_chat_offline),
+        "num_lines": _num_lines,
+        "duels_won": _duel_stats(UserDuelStats.duels_won.desc(), "duels_won"),
+        "duels_lost": _duel_stats(UserDuelStats.duels_lost.desc(), "duels_lost"),
+        "duel_profit": _duel_stats(UserDuelStats.profit.desc(), "profit"),
+        "duel_loss": _duel_stats(UserDuelStats.profit.asc(), "profit"),
+        "duel_winrate": _duel_stats(UserDuelStats.winrate.desc(), "winrate", UserDuelStats.duels_won >= 5),
+        "duel_loserate": _duel_stats(UserDuelStats.winrate.asc(), "winrate", UserDuelStats.duels_lost >= 5),
+    }
+
+    @staticmethod
+    def key(metric):
+        return "{streamer}:leaderboards:{metric}".format(streamer=StreamHelper.get_streamer(), metric=metric)
+
+    @staticmethod
+    def refresh(metrics=None):
+        """Recomputes the given metrics (or all of them) and stores them in redis. Returns a dict of metric -> entries"""
+        if metrics is None:
+            metrics = list(LeaderboardManager.METRICS)
+
+        leaderboards = {}
+        with DBManager.create_session_scope() as db_session:
+            for metric in metrics:
+                leaderboards[metric] = LeaderboardManager.METRICS[metric](db_session, LeaderboardManager.SIZE)
+
+        with RedisManager.pipeline_context() as pipeline:
+            for metric, entries in leaderboards.items():
+                pipeline.setex(
+                    LeaderboardManager.key(metric),
+                    LeaderboardManager.REFRESH_INTERVAL * 2,
+                    json.dumps(entries, separators=(",", ":")),
+                )
+
+        return leaderboards
+
+    @staticmethod
+    def get_many(metrics, size=SIZE):
+        """Returns a dict of metric -> list of the top `size` entries.
+        Each entry is a dict with the user, the value of the metric, and for duel metrics, the user's duel stats."""
+        snapshots = RedisManager.get().mget([LeaderboardManager.key(metric) for metric in metrics])
+
+        leaderboards = {}
+        missing = []
+        for metric, snapshot in zip(metrics, snapshots):
+            if snapshot is None:
+                missing.append(metric)
+            else:
+                leaderboards[metric] = json.loads(snapshot)
+
+        if missing:
+            log.debug("Computing missing leaderboards %s", missing)
+            leaderboards.update(LeaderboardManager.refresh(missing))
+
+        return {metric: entries[:size] for metric, entries in leaderboards.items()}
+
+    @staticmethod
+    def get(metric, size=SIZE):
+        return LeaderboardManager.get_many([metric], size)[metric]
@@ -0,0 +1,130 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from pajbot.managers.redis import RedisManager
+from pajbot.streamhelper import StreamHelper
+
+log = logging.getLogger(__name__)
+
+
+class HandlerCriticality:
+    """
+    How important it is that a handler runs for every event.
+
+    CRITICAL handlers (e.g. moderation filters, and games that track answers or progress per user) always run.
+    NORMAL handlers (e.g. analytics) are sampled when the bot is under load.
+    COSMETIC handlers (e.g. overlays) are dropped as soon as the bot is under load.
+    """
+
+    CRITICAL = 0
+    NORMAL = 1
+    COSMETIC = 2
+
+
+class LoadTier:
+    NORMAL = 0
+    ELEVATED = 1
+    OVERLOADED = 2
+
+    NAMES = {NORMAL: "normal", ELEVATED: "elevated", OVERLOADED: "overloaded"}
+
+
+# Fraction of wall time spent processing chat messages at which a tier is entered
+TIER_THRESHOLDS = {LoadTier.ELEVATED: 0.5, LoadTier.OVERLOADED: 0.8}
+
+# A tier is only left once the load has dropped this far below the threshold that entered it
+RELEASE_FACTOR = 0.6
+
+# Fraction of NORMAL handler invocations that still run in each tier
+SAMPLE_RATES = {LoadTier.NORMAL: 1.0, LoadTier.ELEVATED: 0.25, LoadTier.OVERLOADED: 0.05}
+
+
+def compute_load_tier(current_tier, utilization):
+    """Returns the tier the governor should be in, given the current tier and the
+    fraction of time (0.0-1.0) that was spent processing messages during the last window.
+    Tiers are entered immediately, but only left one step at a time with some hysteresis."""
+    target_tier = LoadTier.NORMAL
+    for tier, threshold in TIER_THRESHOLDS.items():
+        if utilization >= threshold:
+            target_tier = max(target_tier, tier)
+
+    if target_tier >= current_tier:
+        return target_tier
+
+    if utilization < TIER_THRESHOLDS[current_tier] * RELEASE_FACTOR:
+        return current_tier - 1
+
+    return current_tier
+
+
+class LoadGovernor:
+    """
+    Measures how much of the IRC thread's time is spent handling chat messages,
+    and decides which handlers may run based on the resulting load tier.
+    The current state is exposed in the {streamer}:load_governor redis hash.
+    """
+
+    tier = LoadTier.NORMAL
+    utilization = 0.0
+    num_switches = 0
+
+    busy_time = 0.0
+    window_start = time.monotonic()
+
+    @staticmethod
+    @contextmanager
+    def measure():
+        """Accounts the time spent inside this context as busy time"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            LoadGovernor.busy_time += time.monotonic() - start
+
+    @staticmethod
+    def should_run(criticality):
+        if criticality == HandlerCriticality.CRITICAL or LoadGovernor.tier == LoadTier.NORMAL:
+            return True
+
+        if criticality == HandlerCriticality.COSMETIC:
+            return False
+
+        return random.random() < SAMPLE_RATES[LoadGovernor.tier]
+
+    @staticmethod
+    def update():
+        """Closes the current measurement window and switches tier if needed.
+        Must be called periodically from the same thread that calls measure()"""
+        now = time.monotonic()
+        elapsed = now - LoadGovernor.window_start
+        if elapsed <= 0:
+            return
+
+        LoadGovernor.utilization = min(1.0, LoadGovernor.busy_time / elapsed)
+        LoadGovernor.busy_time = 0.0
+        LoadGovernor.window_start = now
+
+        new_tier = compute_load_tier(LoadGovernor.tier, LoadGovernor.utilization)
+        if new_tier != LoadGovernor.tier:
+            log.info(
+                "Load governor switching from %s to %s tier (utilization %.0f%%)",
+                LoadTier.NAMES[LoadGovernor.tier],
+                LoadTier.NAMES[new_tier],
+                LoadGovernor.utilization * 100,
+            )
+            LoadGovernor.tier = new_tier
+            LoadGovernor.num_switches += 1
+
+        try:
+            RedisManager.get().hmset(
+                "{streamer}:load_governor".format(streamer=StreamHelper.get_streamer()),
+                {
+                    "tier": LoadTier.NAMES[LoadGovernor.tier],
+                    "utilization": round(LoadGovernor.utilization, 3),
+                    "switches": LoadGovernor.num_switches,
+                },
+            )
+        except:
+            log.exception("Unable to publish load governor state")
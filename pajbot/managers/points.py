@@ -0,0 +1,117 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.attributes import set_committed_value
+
+from pajbot.managers.db import DBManager
+from pajbot.managers.schedule import ScheduleManager
+from pajbot.models.pointslog import PointsLog
+from pajbot.models.user import Config
+from pajbot.models.user import PointsRank
+from pajbot.models.user import User
+from pajbot.models.user import sync_points_to_streamelements
+
+log = logging.getLogger(__name__)
+
+
+class PointsLedger:
+    """
+    Applies points changes to many users at once, e.g. for mass payouts.
+    Instead of loading and saving every user, the changes are applied by one UPDATE statement per chunk of users.
+    """
+
+    # Number of users updated by a single statement
+    CHUNK_SIZE = 1000
+
+    @staticmethod
+    def bulk_apply(deltas, create_missing=True, reason=None, module=None):
+        """
+        deltas is a dict of username -> amount of points to add to that user (negative to remove points).
+        Users that don't exist in the database yet are created, unless create_missing is False.
+        reason and module are recorded in the points log, see PointsLog.record_many.
+
+        Returns a dict of username -> the user's new amount of points.
+        """
+        deltas = {username: delta for username, delta in deltas.items() if delta != 0}
+        if not deltas:
+            return {}
+
+        # negative points are incompatible with the SE sync system
+        floor_at_zero = Config.se_sync_enabled()
+
+        balances = {}
+        with DBManager.create_session_scope() as db_session:
+            items = list(deltas.items())
+            for i in range(0, len(items), PointsLedger.CHUNK_SIZE):
+                chunk = items[i : i + PointsLedger.CHUNK_SIZE]
+                balances.update(PointsLedger._apply_chunk(db_session, chunk, floor_at_zero))
+
+            missing = [(username, delta) for username, delta in items if username not in balances]
+            if create_missing and missing:
+                # Another session may create some of these users at the same time, which must not roll back
+                # the whole payout, so conflicting rows are skipped and the points are added to them like any other
+                for i in range(0, len(missing), PointsLedger.CHUNK_SIZE):
+                    chunk = missing[i : i + PointsLedger.CHUNK_SIZE]
+                    PointsLedger._create_chunk(db_session, [username for username, _ in chunk])
+                    balances.update(PointsLedger._apply_chunk(db_session, chunk, floor_at_zero))
+
+        PointsLog.record_many({username: deltas[username] for username in balances}, reason=reason, module=module)
+
+        try:
+            PointsRank.set_many(balances)
+        except:
+            log.exception("Failed to mirror points to redis, run scripts/points-rank.py verify --fix")
+
+        if floor_at_zero:
+            ScheduleManager.execute_now(sync_points_to_streamelements, args=[balances])
+
+        return balances
+
+    @staticmethod
+    def _apply_chunk(db_session, chunk, floor_at_zero):
+        values = []
+        params = {}
+        for i, (username, delta) in enumerate(chunk):
+            values.append("(:username_{0}, :delta_{0})".format(i))
+            params["username_{}".format(i)] = username
+            params["delta_{}".format(i)] = delta
+
+        new_points = '"user".points + v.delta'
+        if floor_at_zero:
+            new_points = "GREATEST(0, {})".format(new_points)
+
+        statement = text(
+            'UPDATE "user" SET points = {new_points} '
+            "FROM (VALUES {values}) AS v(username, delta) "
+            'WHERE "user".username = v.username '
+            'RETURNING "user".username, "user".points'.format(new_points=new_points, values=", ".join(values))
+        )
+
+        return {username: points for username, points in db_session.execute(statement, params)}
+
+    @staticmethod
+    def _create_chunk(db_session, usernames):
+        statement = insert(User.__table__).values(
+            [
+                {
+                    "username": username,
+                    "username_raw": username,
+                    "level": 100,
+                    "points": 0,
+                    "subscriber": False,
+                    "minutes_in_chat_online": 0,
+                    "minutes_in_chat_offline": 0,
+                }
+                for username in usernames
+            ]
+        )
+        db_session.execute(statement.on_conflict_do_nothing(index_elements=[User.__table__.c.username]))
+
+    @staticmethod
+    def refresh_users(users, balances):
+        """Updates the points of already loaded user objects (e.g. UserCombined) with the balances
+        returned by bulk_apply, without marking them as modified"""
+        for user in users:
+            if user.model_loaded and user.username in balances:
+                set_committed_value(user.user_model, "points", balances[user.username])
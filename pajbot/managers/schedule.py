@@ -1,6 +1,7 @@
 import datetime
 import logging
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from pajbot import utils
@@ -24,6 +25,13 @@ class ScheduledJob:
         if self.job:
             self.job.remove(*args, **kwargs)
 
+    def cancel(self):
+        """Like remove, but also works for one-off jobs that have already run"""
+        try:
+            self.remove()
+        except JobLookupError:
+            pass
+
 
 class ScheduleManager:
     base_scheduler = None
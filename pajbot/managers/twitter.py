@@ -2,8 +2,6 @@ import datetime
 import logging
 import threading
 
-import tweepy
-
 from pajbot import utils
 from pajbot.managers.db import DBManager
 from pajbot.models.twitter import TwitterUser
@@ -32,6 +30,8 @@ class TwitterManager:
         self.use_twitter_stream = "streaming" in twitter_config and twitter_config["streaming"] == "1"
 
         try:
+            import tweepy
+
             self.twitter_auth = tweepy.OAuthHandler(twitter_config["consumer_key"], twitter_config["consumer_secret"])
             self.twitter_auth.set_access_token(twitter_config["access_token"], twitter_config["access_token_secret"])
 
@@ -101,6 +101,7 @@ class TwitterManager:
 
     def initialize_listener(self):
         if self.listener is None:
+            import tweepy
 
             class MyStreamListener(tweepy.StreamListener):
                 def __init__(self, bot):
@@ -126,6 +127,8 @@ class TwitterManager:
 
     def initialize_twitter_stream(self):
         if self.twitter_stream is None:
+            import tweepy
+
             self.twitter_stream = tweepy.Stream(self.twitter_auth, self.listener, retry_420=3 * 60)
 
     def _run_twitter_stream(self):
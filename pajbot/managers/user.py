@@ -1,6 +1,8 @@
 import logging
 from contextlib import contextmanager
 
+from sqlalchemy.dialects.postgresql import insert
+
 from pajbot.managers.db import DBManager
 from pajbot.models.user import User
 from pajbot.models.user import UserCombined
@@ -14,6 +16,9 @@ class UserManager:
     data = {}
     _instance = None
 
+    # Number of users changed by a single statement in sync_subs
+    SYNC_SUBS_CHUNK_SIZE = 1000
+
     def __init__(self):
         UserSQLCache.init()
         UserManager._instance = self
@@ -120,37 +125,56 @@ class UserManager:
         return user
 
     @time_method
-    def reset_subs(self):
-        """ Returns how many subs were reset """
-        with DBManager.create_session_scope() as db_session:
-            return (
-                db_session.query(User)
-                .filter_by(subscriber=True)
-                .update({User.subscriber: False}, synchronize_session=False)
-            )
-
-    @time_method
-    def update_subs(self, subs):
+    def sync_subs(self, subs):
         """
-        subs is a list of usernames
-        """
-
-        with DBManager.create_session_scope() as db_session:
-            subs = set(subs)
-            for user in db_session.query(User).filter(User.username.in_(subs)):
-                try:
-                    subs.remove(user.username)
-                except:
-                    pass
+        subs is a list of usernames of all current subscribers
 
-                user.subscriber = True
+        Only users whose subscriber status changed are written to the database.
+        Returns a tuple of the sets of usernames that were added and removed as subscribers
+        """
 
-            for username in subs:
-                # New user!
-                user = User(username=username)
-                user.subscriber = True
+        subs = set(subs)
+        chunk_size = self.SYNC_SUBS_CHUNK_SIZE
 
-                db_session.add(user)
+        with DBManager.create_session_scope() as db_session:
+            current_subs = {
+                username for (username,) in db_session.query(User.username).filter(User.subscriber.is_(True))
+            }
+            added = subs - current_subs
+            removed = current_subs - subs
+
+            removed_list = list(removed)
+            for i in range(0, len(removed_list), chunk_size):
+                db_session.query(User).filter(User.username.in_(removed_list[i : i + chunk_size])).update(
+                    {User.subscriber: False}, synchronize_session=False
+                )
+
+            # Marks existing users as subscribers, and creates the ones we haven't seen yet
+            added_list = list(added)
+            for i in range(0, len(added_list), chunk_size):
+                statement = insert(User.__table__).values(
+                    [
+                        {
+                            "username": username,
+                            "username_raw": username,
+                            "level": 100,
+                            "points": 0,
+                            "subscriber": True,
+                            "minutes_in_chat_online": 0,
+                            "minutes_in_chat_offline": 0,
+                        }
+                        for username in added_list[i : i + chunk_size]
+                    ]
+                )
+                db_session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[User.__table__.c.username], set_={"subscriber": True}
+                    )
+                )
+
+        UserSQLCache.invalidate(added | removed)
+
+        return added, removed
 
     @staticmethod
     def bulk_load_user_models(usernames, db_session):
@@ -1,3 +1,4 @@
+import collections
 import json
 import logging
 import threading
@@ -8,22 +9,68 @@ from pajbot.managers.handler import HandlerManager
 log = logging.getLogger("pajbot")
 
 
+class QueuedSendMixin:
+    """
+    Queues the messages sent to a websocket client while its transport has paused us because its send buffer is full,
+    and sends them once it resumes us. Clients that don't keep up are disconnected.
+    """
+
+    def init_queue(self):
+        self.paused = False
+        self.queue = collections.deque()
+
+    def pauseProducing(self):
+        self.paused = True
+
+    def resumeProducing(self):
+        self.paused = False
+        while self.queue and not self.paused:
+            self.sendMessage(self.queue.popleft(), False)
+
+    def stopProducing(self):
+        self.queue.clear()
+
+    def send(self, payload):
+        """Sends the payload, or queues it if the client isn't keeping up. Must be called on the reactor thread"""
+        if not self.paused:
+            self.sendMessage(payload, False)
+            return
+
+        if len(self.queue) >= WebSocketServer.MAX_QUEUED_MESSAGES:
+            log.warning("Disconnecting WebSocket client that isn't keeping up: {}".format(self.peer))
+            WebSocketServer.remove_client(self)
+            self.queue.clear()
+            self.dropConnection(abort=True)
+            return
+
+        self.queue.append(payload)
+
+
 class WebSocketServer:
     clients = []
 
+    # Number of messages queued for a client that isn't keeping up before it is disconnected
+    MAX_QUEUED_MESSAGES = 200
+
     def __init__(self, manager, port, secure=False, key_path=None, crt_path=None, unix_socket_path=None):
         self.manager = manager
         from twisted.internet import reactor, ssl
 
         from autobahn.twisted.websocket import WebSocketServerFactory, WebSocketServerProtocol
 
-        class MyServerProtocol(WebSocketServerProtocol):
+        self.reactor = reactor
+
+        class MyServerProtocol(QueuedSendMixin, WebSocketServerProtocol):
             def onConnect(self, request):
                 log.info("Client connecting: {0}".format(request.origin if request.origin else "self"))
                 pass
 
             def onOpen(self):
                 log.info("WebSocket connection open")
+
+                self.init_queue()
+                self.transport.registerProducer(self, True)
+
                 WebSocketServer.clients.append(self)
 
             def onMessage(self, payload, isBinary):
@@ -44,15 +91,11 @@ class WebSocketServer:
                                 player_team=parsedPayload["data"]["player_team"],
                             )
                         else:
-                            for client in WebSocketServer.clients:
-                                client.sendMessage(payload, False)
+                            WebSocketServer.broadcast(payload)
 
             def onClose(self, wasClean, code, reason):
                 log.info("WebSocket connection closed: {0}".format(reason))
-                try:
-                    WebSocketServer.clients.remove(self)
-                except:
-                    pass
+                WebSocketServer.remove_client(self)
 
         factory = WebSocketServerFactory()
         factory.setProtocolOptions(autoPingInterval=15, autoPingTimeout=5)
@@ -84,13 +127,43 @@ class WebSocketServer:
         reactor_thread.daemon = True
         reactor_thread.start()
 
+    @staticmethod
+    def broadcast(payload):
+        """Must be called on the reactor thread"""
+        for client in list(WebSocketServer.clients):
+            client.send(payload)
+
+    @staticmethod
+    def remove_client(client):
+        try:
+            WebSocketServer.clients.remove(client)
+        except ValueError:
+            pass
+
 
 class WebSocketManager:
+    """
+    Events are emitted from any thread, but only sent to clients on the twisted reactor thread.
+    Each event is encoded once, and all events emitted before the reactor gets to them are sent in one batch.
+
+    Events in COALESCED_EVENTS only carry the latest state of something (e.g. the current emote combo),
+    so only the latest of each is sent, at most once every COALESCE_INTERVAL seconds.
+    """
+
+    COALESCED_EVENTS = {"emote_combo", "emotecounter_update"}
+    COALESCE_INTERVAL = 0.1
+
     def __init__(self, bot):
         self.clients = []
         self.server = None
         self.bot = bot
 
+        self.lock = threading.Lock()
+        self.pending = []
+        self.flush_scheduled = False
+        self.coalesced = {}
+        self.coalesced_flush_scheduled = False
+
         if "websocket" not in bot.config:
             log.debug(
                 "WebSocket support not set up, check out https://github.com/pajbot/pajbot/wiki/Config-File#websocket"
@@ -129,10 +202,45 @@ class WebSocketManager:
             log.exception("Uncaught exception in WebSocketManager")
 
     def emit(self, event, data={}):
-        if self.server:
-            payload = json.dumps({"event": event, "data": data}).encode("utf8")
-            for client in self.server.clients:
-                client.sendMessage(payload, False)
+        if not self.server:
+            return
+
+        payload = json.dumps({"event": event, "data": data}).encode("utf8")
+        reactor = self.server.reactor
+
+        with self.lock:
+            if event in self.COALESCED_EVENTS:
+                self.coalesced[event] = payload
+                if self.coalesced_flush_scheduled:
+                    return
+                self.coalesced_flush_scheduled = True
+            else:
+                self.pending.append(payload)
+                if self.flush_scheduled:
+                    return
+                self.flush_scheduled = True
+
+        if event in self.COALESCED_EVENTS:
+            reactor.callFromThread(reactor.callLater, self.COALESCE_INTERVAL, self.flush_coalesced)
+        else:
+            reactor.callFromThread(self.flush)
+
+    def flush(self):
+        with self.lock:
+            payloads, self.pending = self.pending, []
+            self.flush_scheduled = False
+
+        for payload in payloads:
+            self.server.broadcast(payload)
+
+    def flush_coalesced(self):
+        with self.lock:
+            payloads = list(self.coalesced.values())
+            self.coalesced = {}
+            self.coalesced_flush_scheduled = False
+
+        for payload in payloads:
+            self.server.broadcast(payload)
 
     @staticmethod
     def on_log_message(message, isError=False, printed=False):
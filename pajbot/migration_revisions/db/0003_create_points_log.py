@@ -0,0 +1,29 @@
+def up(cursor, bot):
+    # append-only log of every change to a user's points, written in bulk by pajbot.models.pointslog.PointsLog
+    cursor.execute(
+        """
+    CREATE TABLE points_transaction (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INT NOT NULL REFERENCES "user"(id) ON DELETE CASCADE,
+        delta BIGINT NOT NULL,
+        reason TEXT NOT NULL,
+        module TEXT NULL,
+        created_at TIMESTAMPTZ NOT NULL
+    )
+    """
+    )
+    cursor.execute("CREATE INDEX ON points_transaction(user_id, created_at)")
+
+    # one row per user per day, so the user profile page doesn't have to scan the log
+    cursor.execute(
+        """
+    CREATE TABLE points_daily_summary (
+        user_id INT NOT NULL REFERENCES "user"(id) ON DELETE CASCADE,
+        day DATE NOT NULL,
+        points_gained BIGINT NOT NULL DEFAULT 0,
+        points_lost BIGINT NOT NULL DEFAULT 0,
+        num_transactions INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day)
+    )
+    """
+    )
@@ -0,0 +1,4 @@
+def up(cursor, bot):
+    # the long timeout module keeps its schedule in memory and only queries single rows by username (the primary key)
+    # and the list of all long timeouts ordered by when they end, which this index covers
+    cursor.execute("CREATE INDEX ON longtimeout(timeout_end, username)")
@@ -1,7 +1,9 @@
 import argparse
+import concurrent.futures
 import logging
-import re
+import multiprocessing
 
+import regex
 import sqlalchemy
 from sqlalchemy import BOOLEAN, INT, TEXT
 from sqlalchemy import Column
@@ -9,9 +11,12 @@ from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
 from unidecode import unidecode
 
+from pajbot.managers.adminlog import AdminLogManager
 from pajbot.managers.db import Base
 from pajbot.managers.db import DBManager
+from pajbot.models.sock import SocketClientManager
 from pajbot.utils import find
+from pajbot.utils import has_nested_quantifiers
 
 log = logging.getLogger("pajbot")
 
@@ -37,6 +42,11 @@ class Banphrase(Base):
     DEFAULT_TIMEOUT_LENGTH = 300
     DEFAULT_NOTIFY = True
 
+    # Maximum number of seconds a regex banphrase may spend on a single message.
+    # Banphrases that exceed it MAX_REGEX_TIMEOUTS times are disabled by the BanphraseManager
+    REGEX_TIMEOUT = 0.05
+    MAX_REGEX_TIMEOUTS = 3
+
     def __init__(self, **options):
         self.id = None
         self.name = "No name"
@@ -86,15 +96,29 @@ class Banphrase(Base):
         self.predicate = getattr(self, "predicate_{}".format(self.operator), None)
 
         self.compiled_regex = None
+        self.num_regex_timeouts = 0
         if self.operator == "regex":
             try:
                 if self.case_sensitive:
-                    self.compiled_regex = re.compile(self.phrase)
+                    self.compiled_regex = regex.compile(self.phrase)
                 else:
-                    self.compiled_regex = re.compile(self.phrase, flags=re.IGNORECASE)
+                    self.compiled_regex = regex.compile(self.phrase, flags=regex.IGNORECASE)
             except Exception:
                 log.exception("Unable to compile regex: {}".format(self.phrase))
 
+    @staticmethod
+    def lint_regex(phrase):
+        """Returns why the given phrase can't be used for a regex banphrase, or None if it can"""
+        try:
+            regex.compile(phrase)
+        except regex.error as e:
+            return "Invalid regex: {}".format(e)
+
+        if has_nested_quantifiers(phrase):
+            return "Nested quantifiers like (a+)+ can take forever to evaluate"
+
+        return None
+
     def predicate_contains(self, message):
         return self.get_phrase() in self.format_message(message)
 
@@ -111,7 +135,30 @@ class Banphrase(Base):
         if not self.compiled_regex:
             return False
 
-        return self.compiled_regex.search(self.format_message(message))
+        try:
+            return self.search_regex(message)
+        except TimeoutError:
+            self.num_regex_timeouts += 1
+            log.warning(
+                "Regex banphrase %s timed out (%d/%d): %s",
+                self.id,
+                self.num_regex_timeouts,
+                self.MAX_REGEX_TIMEOUTS,
+                message,
+            )
+            return False
+
+    def search_regex(self, message):
+        """Raises TimeoutError if the regex takes longer than REGEX_TIMEOUT"""
+        return self.compiled_regex.search(self.format_message(message), timeout=self.REGEX_TIMEOUT)
+
+    def match_or_timeout(self, message):
+        """Like match for a message by no particular user, but raises TimeoutError instead of counting regex timeouts,
+        so it doesn't modify the banphrase"""
+        if self.operator == "regex":
+            return self.compiled_regex is not None and self.search_regex(message) is not None
+
+        return self.match(message, None)
 
     def match(self, message, user):
         """
@@ -169,6 +216,25 @@ def on_banphrase_refresh(target, _context, _attrs):
     target.refresh_operator()
 
 
+def _init_dry_run_worker():
+    """Runs once in every BanphraseManager.dry_run worker process.
+    The workers are spawned rather than forked, so the mappers BanphraseData's relationships refer to must be imported"""
+    import pajbot.models.user  # noqa: F401
+
+
+def _dry_run_chunk(options, messages):
+    """Returns the indices of the given messages that match a banphrase with the given options.
+    Module-level so it can run in a BanphraseManager.dry_run worker process"""
+    banphrase = Banphrase(**options)
+    matches = []
+    for i, message in enumerate(messages):
+        if banphrase.match(message, None):
+            matches.append(i)
+        if banphrase.num_regex_timeouts >= Banphrase.MAX_REGEX_TIMEOUTS:
+            raise ValueError("Regex is too slow, it timed out on {} messages".format(banphrase.num_regex_timeouts))
+    return matches
+
+
 class BanphraseData(Base):
     __tablename__ = "banphrase_data"
 
@@ -210,6 +276,15 @@ class BanphraseData(Base):
 
 
 class BanphraseManager:
+    # Dry runs on at least this many messages are split across DRY_RUN_WORKERS processes.
+    # Regexes can be arbitrarily expensive, so they are split up much earlier
+    DRY_RUN_PARALLEL_THRESHOLD = 50000
+    DRY_RUN_REGEX_PARALLEL_THRESHOLD = 5000
+    DRY_RUN_WORKERS = 4
+
+    # Created on the first parallel dry run
+    dry_run_pool = None
+
     def __init__(self, bot):
         self.bot = bot
         self.banphrases = []
@@ -294,6 +369,9 @@ class BanphraseManager:
         self.banphrases.append(banphrase)
         self.enabled_banphrases.append(banphrase)
 
+        if self.bot:
+            SocketClientManager.send("banphrase.update", {"id": banphrase.id})
+
         return banphrase, True
 
     def remove_banphrase(self, banphrase):
@@ -306,6 +384,9 @@ class BanphraseManager:
         self.db_session.delete(banphrase.data)
         self.commit()
 
+        if self.bot:
+            SocketClientManager.send("banphrase.remove", {"id": banphrase.id})
+
     def punish(self, user, banphrase):
         """
         This method is responsible for calculating
@@ -342,6 +423,7 @@ class BanphraseManager:
 
     def check_message(self, message, user):
         matched_banphrase = None
+        slow_banphrases = []
         for banphrase in self.enabled_banphrases:
             if banphrase.match(message, user):
                 if not matched_banphrase:
@@ -351,9 +433,54 @@ class BanphraseManager:
                 if banphrase.greater_than(matched_banphrase):
                     matched_banphrase = banphrase
                     continue
+            elif banphrase.num_regex_timeouts >= Banphrase.MAX_REGEX_TIMEOUTS:
+                slow_banphrases.append(banphrase)
+
+        for banphrase in slow_banphrases:
+            self.disable_slow_banphrase(banphrase)
 
         return matched_banphrase or False
 
+    def check_message_readonly(self, message):
+        """Like check_message for a message by no particular user, but without counting regex timeouts or disabling
+        slow banphrases, so concurrent requests in the web process can share one BanphraseManager.
+        Returns a tuple of (the matched banphrase or False, whether any regex banphrase timed out)"""
+        matched_banphrase = None
+        timed_out = False
+        for banphrase in list(self.enabled_banphrases):
+            try:
+                if not banphrase.match_or_timeout(message):
+                    continue
+            except TimeoutError:
+                timed_out = True
+                continue
+
+            if not matched_banphrase or banphrase.greater_than(matched_banphrase):
+                matched_banphrase = banphrase
+
+        return matched_banphrase or False, timed_out
+
+    def disable_slow_banphrase(self, banphrase):
+        log.warning("Disabling regex banphrase %s, it timed out too many times: %s", banphrase.id, banphrase.phrase)
+
+        if banphrase in self.enabled_banphrases:
+            self.enabled_banphrases.remove(banphrase)
+        banphrase.enabled = False
+
+        # Only the bot persists this. Messages tested through the web API must not be able to disable banphrases
+        if banphrase.id is None or not self.bot:
+            return
+
+        with DBManager.create_session_scope() as db_session:
+            db_session.query(Banphrase).filter_by(id=banphrase.id).update({"enabled": False})
+
+        # e.g. the web process caches the enabled banphrases too
+        SocketClientManager.send("banphrase.update", {"id": banphrase.id})
+
+        bot_user = self.bot.users.find(self.bot.nickname)
+        if bot_user is not None:
+            AdminLogManager.post("Banphrase auto-disabled", bot_user, banphrase.id, banphrase.phrase)
+
     def find_match(self, message, banphrase_id=None):
         match = None
         if banphrase_id is not None:
@@ -362,6 +489,72 @@ class BanphraseManager:
             match = find(lambda banphrase: banphrase.exact_match(message), self.banphrases)
         return match
 
+    @staticmethod
+    def dry_run(phrase, entries, max_samples=5, parallel=True, **options):
+        """
+        Evaluates a banphrase that doesn't exist yet against the given chat history entries
+        (see pajbot.managers.chathistory), without punishing anyone.
+
+        If parallel is True, large histories, and regex banphrases on smaller ones, are split across a pool of
+        worker processes. The bot passes False to keep its dry runs in its own process.
+        Raises ValueError if the banphrase is invalid, or if it is a regex that keeps timing out.
+        """
+        options = {**options, "phrase": phrase}
+        banphrase = Banphrase(**options)
+        if banphrase.predicate is None:
+            raise ValueError("Invalid operator {}".format(banphrase.operator))
+        if banphrase.operator == "regex":
+            error = Banphrase.lint_regex(phrase)
+            if error is not None:
+                raise ValueError(error)
+
+        # sub immunity would require looking up every user, so every message is checked as if sent by a non-sub
+        options.pop("sub_immunity", None)
+
+        messages = [entry.message for entry in entries]
+        threshold = (
+            BanphraseManager.DRY_RUN_REGEX_PARALLEL_THRESHOLD
+            if banphrase.operator == "regex"
+            else BanphraseManager.DRY_RUN_PARALLEL_THRESHOLD
+        )
+        if parallel and len(messages) >= threshold:
+            matches = BanphraseManager._dry_run_parallel(options, messages)
+        else:
+            matches = _dry_run_chunk(options, messages)
+
+        matched_entries = [entries[i] for i in matches]
+        return {
+            "num_messages": len(entries),
+            "num_matches": len(matched_entries),
+            "num_users": len({entry.username for entry in matched_entries}),
+            "samples": [
+                {"username": entry.username, "message": entry.message, "timestamp": entry.timestamp}
+                for entry in matched_entries[max(len(matched_entries) - max_samples, 0) :]
+            ],
+        }
+
+    @staticmethod
+    def _dry_run_parallel(options, messages):
+        if BanphraseManager.dry_run_pool is None:
+            # The web workers that run dry runs are threaded, and forking a threaded process isn't safe
+            BanphraseManager.dry_run_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=BanphraseManager.DRY_RUN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_dry_run_worker,
+            )
+
+        chunk_size = -(-len(messages) // BanphraseManager.DRY_RUN_WORKERS)
+        offsets = range(0, len(messages), chunk_size)
+        chunks = [messages[offset : offset + chunk_size] for offset in offsets]
+
+        matches = []
+        for offset, chunk_matches in zip(
+            offsets, BanphraseManager.dry_run_pool.map(_dry_run_chunk, [options] * len(chunks), chunks)
+        ):
+            matches.extend(offset + i for i in chunk_matches)
+
+        return matches
+
     @staticmethod
     def parse_banphrase_arguments(message):
         parser = argparse.ArgumentParser()
@@ -384,6 +577,7 @@ class BanphraseManager:
         parser.add_argument("--no-removeaccents", dest="remove_accents", action="store_false")
         parser.add_argument("--operator", dest="operator", type=str)
         parser.add_argument("--name", nargs="+", dest="name")
+        parser.add_argument("--dryrun", dest="dry_run", action="store_true")
         parser.set_defaults(
             length=None,
             notify=None,
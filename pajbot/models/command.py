@@ -17,6 +17,7 @@ from pajbot.managers.db import Base
 from pajbot.managers.schedule import ScheduleManager
 from pajbot.models.action import ActionParser
 from pajbot.models.action import RawFuncAction
+from pajbot.models.pointslog import PointsLog
 
 log = logging.getLogger(__name__)
 
@@ -427,7 +428,9 @@ class Command(Base):
 
     def run_action(self, bot, source, message, event, args):
         cur_time = pajbot.utils.now().timestamp()
-        with source.spend_currency_context(self.cost, self.tokens_cost):
+        with PointsLog.context(self._points_log_reason(args), self._points_log_module()), source.spend_currency_context(
+            self.cost, self.tokens_cost
+        ):
             ret = self.action.run(bot, source, message, event, args)
             if ret is False:
                 raise FailedCommand("return currency")
@@ -441,6 +444,18 @@ class Command(Base):
             self.last_run = cur_time
             self.last_run_by_user[source.username] = cur_time
 
+    def _points_log_reason(self, args):
+        # Commands registered by modules have no aliases of their own, so fall back to what the user typed
+        alias = (self.command or "").split("|")[0] or args.get("trigger")
+        if not alias:
+            return "command"
+        return "command:!" + alias
+
+    def _points_log_module(self):
+        # Commands registered by modules run a bound method of the module
+        callback = getattr(self.action, "cb", None)
+        return getattr(getattr(callback, "__self__", None), "ID", None)
+
     def autogenerate_examples(self):
         if not self.examples and self.id is not None and self.action and self.action.type == "message":
             examples = []
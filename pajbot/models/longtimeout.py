@@ -1,4 +1,3 @@
-import datetime
 import logging
 
 from sqlalchemy import TEXT
@@ -11,12 +10,12 @@ log = logging.getLogger("pajbot")
 
 
 class LongTimeout(Base):
-    __tablename__ = "long_timeout"
+    __tablename__ = "longtimeout"
 
     username = Column(TEXT, primary_key=True, nullable=False, unique=True)
     timeout_start = Column(UtcDateTime(), nullable=False)
     timeout_recent_end = Column(UtcDateTime())
-    timeout_end = Column(UtcDateTime(), nullable=False)
+    timeout_end = Column(UtcDateTime(), nullable=False, index=True)
     timeout_author = Column(TEXT, nullable=False)
 
     def __init__(
@@ -25,7 +24,7 @@ class LongTimeout(Base):
         timeout_start,
         timeout_end,
         timeout_author,
-        timeout_recent_end=(datetime.datetime.now() + datetime.timedelta(days=14)).strftime("%Y-%m-%d %H:%M:%S"),
+        timeout_recent_end=None,
     ):
         self.username = username
         self.timeout_start = timeout_start
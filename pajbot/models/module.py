@@ -7,6 +7,8 @@ from sqlalchemy import Column
 
 from pajbot.managers.db import Base
 from pajbot.managers.db import DBManager
+from pajbot.managers.redis import RedisManager
+from pajbot.streamhelper import StreamHelper
 from pajbot.utils import find
 
 log = logging.getLogger("pajbot")
@@ -24,6 +26,17 @@ class Module(Base):
         self.enabled = options.get("enabled", False)
         self.settings = None
 
+    def parsed_settings(self):
+        """ Returns the settings of this module as a dictionary, or None if they are unset or invalid """
+        if self.settings is None:
+            return None
+
+        try:
+            return json.loads(self.settings)
+        except ValueError:
+            log.warning("Invalid JSON in the settings of module {}".format(self.id))
+            return None
+
 
 class ModuleManager:
     def __init__(self, socket_manager, bot=None):
@@ -33,6 +46,9 @@ class ModuleManager:
         # List of all available modules, both enabled and disabled
         self.all_modules = []
 
+        # Module ID -> (detached) database row, as of the last load
+        self.db_modules = {}
+
         self.bot = bot
 
         if socket_manager:
@@ -94,22 +110,35 @@ class ModuleManager:
 
         self.all_modules = [module(self.bot) for module in available_modules]
 
-        with DBManager.create_session_scope() as db_session:
+        # kept so callers that need the rows too (e.g. the web interface) don't have to query them again
+        self.db_modules = db_modules = self.load_db_modules()
+
+        if do_reload is True:
+            self.reload(db_modules)
+
+        return self
+
+    def load_db_modules(self):
+        """ Fetches the database rows of all modules in one query, creating the rows that are missing.
+        Returns a dictionary mapping module ID to its (detached) row """
+
+        with DBManager.create_session_scope(expire_on_commit=False) as db_session:
+            db_modules = {db_module.id: db_module for db_module in db_session.query(Module)}
+
             # Make sure there's a row in the DB for each module that's available
-            db_modules = db_session.query(Module).all()
             for module in self.all_modules:
-                mod = find(lambda db_module, registered_module=module: db_module.id == registered_module.ID, db_modules)
-                if mod is None:
+                if module.ID not in db_modules:
                     log.info("Creating row in DB for module {}".format(module.ID))
                     mod = Module(module.ID, enabled=module.ENABLED_DEFAULT)
                     db_session.add(mod)
+                    db_modules[module.ID] = mod
 
-        if do_reload is True:
-            self.reload()
+            db_session.flush()
+            db_session.expunge_all()
 
-        return self
+        return db_modules
 
-    def reload(self):
+    def reload(self, db_modules=None):
         # TODO: Make disable/enable better, so we don't need to disable modules
         # that we're just going to enable again further down below.
         for module in self.modules:
@@ -117,19 +146,17 @@ class ModuleManager:
 
         self.modules = []
 
-        with DBManager.create_session_scope() as db_session:
-            for enabled_module in db_session.query(Module).filter_by(enabled=True):
-                module = self.get_module(enabled_module.id)
-                if module is not None:
-                    options = {}
-                    if enabled_module.settings is not None:
-                        try:
-                            options["settings"] = json.loads(enabled_module.settings)
-                        except ValueError:
-                            log.warning("Invalid JSON")
+        if db_modules is None:
+            db_modules = self.load_db_modules()
 
-                    self.modules.append(module.load(**options))
-                    module.enable(self.bot)
+        for enabled_module in db_modules.values():
+            if not enabled_module.enabled:
+                continue
+
+            module = self.get_module(enabled_module.id)
+            if module is not None:
+                self.modules.append(module.load(settings=enabled_module.parsed_settings()))
+                module.enable(self.bot)
 
         to_be_removed = []
         self.modules.sort(key=lambda m: 1 if m.PARENT_MODULE is not None else 0)
@@ -156,6 +183,20 @@ class ModuleManager:
         for module in self.modules:
             module.on_loaded()
 
+    @staticmethod
+    def version_key():
+        return "{streamer}:modules:version".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def bump_version():
+        """ Call whenever a module is toggled or its settings are changed.
+        This invalidates the module registry cached by the web process """
+        RedisManager.get().incr(ModuleManager.version_key())
+
+    @staticmethod
+    def get_version():
+        return RedisManager.get().get(ModuleManager.version_key())
+
     def __getitem__(self, module):
         for enabled_module in self.modules:
             if enabled_module.ID == module:
@@ -0,0 +1,207 @@
+import collections
+import contextlib
+import datetime
+import logging
+import threading
+
+from sqlalchemy import BIGINT, Column, DATE, INT, TEXT
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy_utc import UtcDateTime
+
+from pajbot import utils
+from pajbot.managers.db import Base
+from pajbot.managers.db import DBManager
+
+log = logging.getLogger(__name__)
+
+
+class PointsTransaction(Base):
+    __tablename__ = "points_transaction"
+
+    id = Column(BIGINT, primary_key=True)
+    user_id = Column(INT, index=True, nullable=False)
+    delta = Column(BIGINT, nullable=False)
+    reason = Column(TEXT, nullable=False)
+    module = Column(TEXT, nullable=True)
+    created_at = Column(UtcDateTime(), nullable=False)
+
+
+class PointsDailySummary(Base):
+    __tablename__ = "points_daily_summary"
+
+    user_id = Column(INT, primary_key=True, autoincrement=False)
+    day = Column(DATE, primary_key=True)
+    points_gained = Column(BIGINT, nullable=False, default=0)
+    points_lost = Column(BIGINT, nullable=False, default=0)
+    num_transactions = Column(INT, nullable=False, default=0)
+
+
+class PointsLog:
+    """
+    Append-only log of every change to a user's points.
+
+    Changes are only buffered in memory when they happen, and are written to the database in bulk every
+    FLUSH_INTERVAL seconds by the bot, together with a per-user-per-day summary used by the user profile page.
+
+    The reason of a change is taken from the innermost PointsLog.context() active in the current thread,
+    e.g. commands log their changes as "command:!<alias>".
+    """
+
+    FLUSH_INTERVAL = 5
+
+    # Number of rows written by a single INSERT statement
+    CHUNK_SIZE = 1000
+
+    # Changes for users that don't exist in the database yet are kept for up to this many seconds
+    MAX_PENDING_AGE = 60
+
+    # Only the bot flushes the log, so it's disabled everywhere else (e.g. in the web process)
+    enabled = False
+
+    _lock = threading.Lock()
+    _buffer = []
+    _context = threading.local()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def context(reason, module=None):
+        stack = PointsLog._context.__dict__.setdefault("stack", [])
+        stack.append((reason, module))
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    @staticmethod
+    def current_context():
+        stack = getattr(PointsLog._context, "stack", None)
+        if not stack:
+            return "other", None
+
+        return stack[-1]
+
+    @staticmethod
+    def record(username, delta, reason=None, module=None):
+        PointsLog.record_many({username: delta}, reason=reason, module=module)
+
+    @staticmethod
+    def record_many(deltas, reason=None, module=None):
+        """deltas is a dict of username -> change in points"""
+        if not PointsLog.enabled:
+            return
+
+        if reason is None:
+            reason, context_module = PointsLog.current_context()
+            module = module or context_module
+
+        now = utils.now()
+        entries = [(username, delta, reason, module, now) for username, delta in deltas.items() if delta != 0]
+        if not entries:
+            return
+
+        with PointsLog._lock:
+            PointsLog._buffer.extend(entries)
+
+    @staticmethod
+    def flush():
+        with PointsLog._lock:
+            entries, PointsLog._buffer = PointsLog._buffer, []
+
+        if not entries:
+            return
+
+        try:
+            pending = PointsLog._write(entries)
+        except:
+            log.exception("Failed to write {} points log entries".format(len(entries)))
+            return
+
+        if pending:
+            with PointsLog._lock:
+                PointsLog._buffer[:0] = pending
+
+    @staticmethod
+    def _write(entries):
+        """Writes the given entries, and returns the ones whose users don't exist in the database yet"""
+        from pajbot.models.user import User
+
+        with DBManager.create_session_scope() as db_session:
+            usernames = {username for username, *_ in entries}
+            user_ids = dict(db_session.query(User.username, User.id).filter(User.username.in_(usernames)))
+
+            rows = []
+            pending = []
+            oldest_pending = utils.now() - datetime.timedelta(seconds=PointsLog.MAX_PENDING_AGE)
+            for entry in entries:
+                username, delta, reason, module, created_at = entry
+                user_id = user_ids.get(username, None)
+                if user_id is not None:
+                    rows.append(
+                        {
+                            "user_id": user_id,
+                            "delta": delta,
+                            "reason": reason,
+                            "module": module,
+                            "created_at": created_at,
+                        }
+                    )
+                elif created_at > oldest_pending:
+                    pending.append(entry)
+                else:
+                    log.warning("Dropping points log entry for unknown user {} ({})".format(username, delta))
+
+            for i in range(0, len(rows), PointsLog.CHUNK_SIZE):
+                db_session.execute(PointsTransaction.__table__.insert().values(rows[i : i + PointsLog.CHUNK_SIZE]))
+
+            summaries = PointsLog.summarize(rows)
+            for i in range(0, len(summaries), PointsLog.CHUNK_SIZE):
+                db_session.execute(PointsLog._upsert_summaries(summaries[i : i + PointsLog.CHUNK_SIZE]))
+
+        return pending
+
+    @staticmethod
+    def summarize(rows):
+        """Rolls up transaction rows into one row per user per (UTC) day"""
+        summaries = collections.OrderedDict()
+        for row in rows:
+            key = (row["user_id"], row["created_at"].date())
+            summary = summaries.get(key, None)
+            if summary is None:
+                summary = summaries[key] = {
+                    "user_id": key[0],
+                    "day": key[1],
+                    "points_gained": 0,
+                    "points_lost": 0,
+                    "num_transactions": 0,
+                }
+
+            if row["delta"] > 0:
+                summary["points_gained"] += row["delta"]
+            else:
+                summary["points_lost"] -= row["delta"]
+            summary["num_transactions"] += 1
+
+        return list(summaries.values())
+
+    @staticmethod
+    def _upsert_summaries(summaries):
+        table = PointsDailySummary.__table__
+        statement = insert(table).values(summaries)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day],
+            set_={
+                "points_gained": table.c.points_gained + statement.excluded.points_gained,
+                "points_lost": table.c.points_lost + statement.excluded.points_lost,
+                "num_transactions": table.c.num_transactions + statement.excluded.num_transactions,
+            },
+        )
+
+    @staticmethod
+    def get_daily_summary(db_session, user_id, days=30):
+        since = utils.now().date() - datetime.timedelta(days=days)
+        return (
+            db_session.query(PointsDailySummary)
+            .filter(PointsDailySummary.user_id == user_id, PointsDailySummary.day > since)
+            .order_by(PointsDailySummary.day.desc())
+            .all()
+        )
@@ -6,14 +6,20 @@ from contextlib import contextmanager
 import requests
 from sqlalchemy import BOOLEAN, INT, TEXT
 from sqlalchemy import Column
+from sqlalchemy import event
 from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import column_property
 
 from pajbot.exc import FailedCommand
 from pajbot.managers.db import Base
 from pajbot.managers.db import DBManager
+from pajbot.managers.knownusers import KnownUsers
 from pajbot.managers.redis import RedisManager
 from pajbot.managers.schedule import ScheduleManager
 from pajbot.managers.time import TimeManager
+from pajbot.models.pointslog import PointsLog
 from pajbot.streamhelper import StreamHelper
 
 log = logging.getLogger(__name__)
@@ -23,12 +29,39 @@ class Config:
     se_sync_token = None
     se_channel = None
 
+    @staticmethod
+    def se_sync_enabled():
+        return Config.se_channel is not None and Config.se_sync_token is not None
+
+
+def sync_points_to_streamelements(points_by_username):
+    """Sets the points of the given users in StreamElements. Users with 0 (or less) points are removed"""
+    users = [{"username": username, "current": points} for username, points in points_by_username.items() if points > 0]
+
+    try:
+        if users:
+            requests.put(
+                "https://api.streamelements.com/kappa/v2/points/{0}".format(Config.se_channel),
+                headers={"Authorization": "Bearer " + Config.se_sync_token},
+                json={"users": users, "mode": "set"},
+            )
+
+        for username, points in points_by_username.items():
+            if points <= 0:
+                requests.delete(
+                    "https://api.streamelements.com/kappa/v2/points/{0}/{1}".format(Config.se_channel, username),
+                    headers={"Authorization": "Bearer " + Config.se_sync_token},
+                )
+    except:
+        log.exception("BabyRage")
+
 
 class User(Base):
     __tablename__ = "user"
 
     id = Column(INT, primary_key=True)
-    username = Column(TEXT, nullable=False, index=True, unique=True)
+    # active_history so the old username of a renamed user is known when its points are mirrored (see PointsRank)
+    username = column_property(Column(TEXT, nullable=False, index=True, unique=True), active_history=True)
     username_raw = Column(TEXT)
     level = Column(INT, nullable=False, default=100)
     points = Column(INT, nullable=False, default=0, index=True)
@@ -52,6 +85,189 @@ class User(Base):
         self.timed_out = False
 
 
+class PointsRank:
+    """
+    Mirrors the points of every user with a non-zero amount of points into the {streamer}:users:points sorted set,
+    so the points rank of a user can be looked up in O(log n) instead of counting rows in the user table.
+
+    ORM writes to User.points are mirrored automatically once their transaction is committed (see the session
+    listeners below). Writes that bypass the ORM must call PointsRank.set_many themselves.
+    The set can be rebuilt and verified against the database with scripts/points-rank.py
+    """
+
+    @staticmethod
+    def key():
+        return "{streamer}:users:points".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def ready_key():
+        return "{streamer}:users:points:ready".format(streamer=StreamHelper.get_streamer())
+
+    @staticmethod
+    def queue_set(pipeline, username, points):
+        """Queues up an update of the given user's points. points=None removes the user from the set"""
+        if points:
+            pipeline.zadd(PointsRank.key(), {username: points})
+        else:
+            pipeline.zrem(PointsRank.key(), username)
+
+    @staticmethod
+    def set_many(points_by_username):
+        """points_by_username is a dict of username -> points (or None if the user was deleted)"""
+        if not points_by_username:
+            return
+
+        with RedisManager.pipeline_context() as pipeline:
+            for username, points in points_by_username.items():
+                PointsRank.queue_set(pipeline, username, points)
+
+    @staticmethod
+    def get_rank(points, redis=None):
+        """Returns the rank a user with the given amount of points has,
+        or None if the mirror can't answer (i.e. it has not been built yet)"""
+        if points < 0:
+            # Users with 0 points are not stored in the set, so we can't count the users ranked above a negative score
+            return None
+
+        if redis is None:
+            redis = RedisManager.get()
+
+        pipeline = redis.pipeline()
+        PointsRank.queue_get_rank(pipeline, points)
+        return PointsRank.parse_rank(*pipeline.execute())
+
+    @staticmethod
+    def queue_get_rank(pipeline, points):
+        """Queues up the two calls whose results PointsRank.parse_rank turns into a rank"""
+        pipeline.exists(PointsRank.ready_key())
+        pipeline.zcount(PointsRank.key(), "({}".format(points), "+inf")
+
+    @staticmethod
+    def parse_rank(ready, num_above):
+        if not ready:
+            return None
+
+        return num_above + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_points_rank_updates(db_session, _flush_context):
+    updates = db_session.info.setdefault("points_rank_updates", {})
+
+    # Deletions go first, so a username that is freed up and taken over by another row in the same flush
+    # ends up with the points of the new row
+    for user in db_session.deleted:
+        if isinstance(user, User):
+            updates[user.username] = None
+
+    for user in db_session.new:
+        if isinstance(user, User) and user.points:
+            updates[user.username] = user.points
+
+    for user in db_session.dirty:
+        if not isinstance(user, User):
+            continue
+
+        state = inspect(user)
+        username_history = state.attrs.username.history
+        if not state.attrs.points.history.has_changes() and not username_history.has_changes():
+            continue
+
+        for old_username in username_history.deleted:
+            updates[old_username] = None
+        updates[user.username] = user.points
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_points_rank_updates(db_session):
+    updates = db_session.info.pop("points_rank_updates", None)
+
+    try:
+        PointsRank.set_many(updates)
+    except:
+        log.exception("Failed to mirror points to redis, run scripts/points-rank.py verify --fix")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_points_rank_updates(db_session):
+    db_session.info.pop("points_rank_updates", None)
+
+
+class UserLevelCache:
+    """
+    Short-lived cache of the id, display name and level of users, used by the web interface to authorize
+    admin requests without querying the database on every request.
+
+    Entries are removed as soon as a change to the user's level is committed, by any process (see the session
+    listeners below), so a demoted user loses access immediately rather than when their entry expires.
+    """
+
+    CACHE_TIME = 5 * 60
+
+    @staticmethod
+    def key(username):
+        return "{streamer}:cache:user_level:{username}".format(streamer=StreamHelper.get_streamer(), username=username)
+
+    @staticmethod
+    def get(username):
+        """Returns a dict with the user's id, username_raw and level, or None if the user is not cached"""
+        data = RedisManager.get().hgetall(UserLevelCache.key(username))
+        if not data:
+            return None
+
+        return {"id": int(data["id"]), "username_raw": data["username_raw"], "level": int(data["level"])}
+
+    @staticmethod
+    def set(user):
+        key = UserLevelCache.key(user.username)
+        with RedisManager.pipeline_context() as pipeline:
+            pipeline.hmset(
+                key, {"id": user.id, "username_raw": user.username_raw or user.username, "level": user.level}
+            )
+            pipeline.expire(key, UserLevelCache.CACHE_TIME)
+
+    @staticmethod
+    def invalidate(usernames):
+        if not usernames:
+            return
+
+        RedisManager.get().delete(*[UserLevelCache.key(username) for username in usernames])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_level_changes(db_session, _flush_context):
+    changed_usernames = db_session.info.setdefault("user_level_changes", set())
+
+    for user in db_session.deleted:
+        if isinstance(user, User):
+            changed_usernames.add(user.username)
+
+    for user in db_session.dirty:
+        if not isinstance(user, User):
+            continue
+
+        state = inspect(user)
+        username_history = state.attrs.username.history
+        if state.attrs.level.history.has_changes() or username_history.has_changes():
+            changed_usernames.update(username_history.deleted)
+            changed_usernames.add(user.username)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_level_changes(db_session):
+    changed_usernames = db_session.info.pop("user_level_changes", None)
+
+    try:
+        UserLevelCache.invalidate(changed_usernames)
+    except:
+        log.exception("Failed to invalidate cached user levels")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_level_changes(db_session):
+    db_session.info.pop("user_level_changes", None)
+
+
 class NoCacheHit(Exception):
     pass
 
@@ -71,6 +287,11 @@ class UserSQLCache:
     def save(user):
         UserSQLCache.cache[user.username] = {"id": user.id, "level": user.level, "subscriber": user.subscriber}
 
+    @staticmethod
+    def invalidate(usernames):
+        for username in usernames:
+            UserSQLCache.cache.pop(username, None)
+
     @staticmethod
     def get(username, value):
         if username not in UserSQLCache.cache:
@@ -215,29 +436,22 @@ class UserSQL:
     @points.setter
     def points(self, value):
         self.sql_load()
-        if Config.se_channel is not None and Config.se_sync_token is not None and value != self.user_model.points:
+        if Config.se_sync_enabled() and value != self.user_model.points:
             value = max(0, value)  # negative points are incompatible with the SE sync system
-            try:
-                log.debug("Updating points for {0} to {1}".format(self.username, value))
-                if value > 0:
-                    requests.put(
-                        "https://api.streamelements.com/kappa/v2/points/{0}".format(Config.se_channel),
-                        headers={"Authorization": "Bearer " + Config.se_sync_token},
-                        json={"users": [{"username": self.username, "current": value}], "mode": "set"},
-                    )
-                else:
-                    requests.delete(
-                        "https://api.streamelements.com/kappa/v2/points/{0}/{1}".format(
-                            Config.se_channel, self.username
-                        ),
-                        headers={"Authorization": "Bearer " + Config.se_sync_token},
-                    )
-            except:
-                log.exception("BabyRage")
+            log.debug("Updating points for {0} to {1}".format(self.username, value))
+            sync_points_to_streamelements({self.username: value})
+        PointsLog.record(self.username, value - self.user_model.points)
         self.user_model.points = value
 
     @property
     def points_rank(self):
+        try:
+            rank = PointsRank.get_rank(self.points)
+            if rank is not None:
+                return rank
+        except:
+            log.exception("Failed to get points rank from redis, falling back to the database")
+
         if self.shared_db_session:
             query_data = self.shared_db_session.query(func.count(User.id)).filter(User.points > self.points).one()
         else:
@@ -402,6 +616,7 @@ class UserRedis:
 
         # Set redis value
         self.redis.hset("{streamer}:users:last_seen".format(streamer=StreamHelper.get_streamer()), self.username, value)
+        KnownUsers.add(self.username)
 
     def set_last_seen(self, value):
         # Set cached value
@@ -410,12 +625,14 @@ class UserRedis:
 
         # Set redis value
         self.redis.hset("{streamer}:users:last_seen".format(streamer=StreamHelper.get_streamer()), self.username, value)
+        KnownUsers.add(self.username)
 
     def _set_last_seen(self, value):
         # Set cached value
         self.values["last_seen"] = value
 
         self.redis.hset("{streamer}:users:last_seen".format(streamer=StreamHelper.get_streamer()), self.username, value)
+        KnownUsers.add(self.username)
 
     @property
     def _last_active(self):
@@ -487,6 +704,89 @@ class UserRedis:
             self.redis.hdel("{streamer}:users:banned".format(streamer=StreamHelper.get_streamer()), self.username)
 
 
+class UserSnapshot:
+    """
+    Read-only view of a user, as returned by UserCombined.jsonify.
+
+    Everything is loaded with one SQL query and one redis pipeline, and unlike UserCombined,
+    loading a snapshot never creates the user in the database.
+    """
+
+    SQL_COLUMNS = [
+        User.id,
+        User.points,
+        User.level,
+        User.subscriber,
+        User.minutes_in_chat_online,
+        User.minutes_in_chat_offline,
+    ]
+
+    @staticmethod
+    def load(username, redis=None):
+        """Returns the user's data as a dictionary, or None if the user has never been seen in chat"""
+        if redis is None:
+            redis = RedisManager.get()
+
+        num_lines_key = "{streamer}:users:num_lines".format(streamer=StreamHelper.get_streamer())
+
+        with DBManager.create_session_scope_nc() as db_session:
+            row = db_session.query(*UserSnapshot.SQL_COLUMNS).filter(User.username == username).one_or_none()
+            if row is None:
+                # The user has been seen in chat, but their row hasn't been created yet
+                sql_data = {
+                    "id": None,
+                    "points": 0,
+                    "level": 100,
+                    "subscriber": False,
+                    "minutes_in_chat_online": 0,
+                    "minutes_in_chat_offline": 0,
+                }
+            else:
+                sql_data = row._asdict()
+
+            user_redis = UserRedis(username, redis=redis)
+            pipeline = redis.pipeline()
+            user_redis.queue_up_redis_calls(pipeline)
+            pipeline.zrevrank(num_lines_key, username)
+            pipeline.zcard(num_lines_key)
+            PointsRank.queue_get_rank(pipeline, sql_data["points"])
+            data = pipeline.execute()
+
+            num_user_keys = len(UserRedis.FULL_KEYS)
+            user_redis.load_redis_data(data[:num_user_keys])
+            num_lines_rank, num_lines_total, points_rank_ready, num_points_above = data[num_user_keys:]
+
+            if user_redis._last_seen is None:
+                return None
+
+            points_rank = None
+            if sql_data["points"] >= 0:
+                points_rank = PointsRank.parse_rank(points_rank_ready, num_points_above)
+            if points_rank is None:
+                query_data = db_session.query(func.count(User.id)).filter(User.points > sql_data["points"]).one()
+                points_rank = int(query_data[0]) + 1
+
+        last_active = user_redis._last_active
+
+        return {
+            "id": sql_data["id"],
+            "username": username,
+            "username_raw": user_redis.username_raw,
+            "points": sql_data["points"],
+            "nl_rank": num_lines_total if num_lines_rank is None else num_lines_rank + 1,
+            "points_rank": points_rank,
+            "level": sql_data["level"],
+            "last_seen": TimeManager.localize(user_redis._last_seen),
+            "last_active": None if last_active is None else TimeManager.localize(last_active),
+            "subscriber": sql_data["subscriber"],
+            "num_lines": user_redis.num_lines,
+            "minutes_in_chat_online": sql_data["minutes_in_chat_online"],
+            "minutes_in_chat_offline": sql_data["minutes_in_chat_offline"],
+            "banned": user_redis.banned,
+            "ignored": user_redis.ignored,
+        }
+
+
 class UserCombined(UserRedis, UserSQL):
     """
     A combination of the MySQL Object and the Redis object
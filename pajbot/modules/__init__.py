@@ -1,149 +1,211 @@
-from pajbot.modules.ascii import AsciiProtectionModule
-from pajbot.modules.banphrase import BanphraseModule
+import importlib
+import logging
+import time
+
 from pajbot.modules.base import BaseModule
 from pajbot.modules.base import ModuleSetting
 from pajbot.modules.base import ModuleType
-from pajbot.modules.basic import BasicCommandsModule
-from pajbot.modules.basic.ab import AbCommandModule
-from pajbot.modules.basic.admincommands import AdminCommandsModule
-from pajbot.modules.basic.checkmod import CheckModModule
-from pajbot.modules.basic.dbmanage import DBManageModule
-from pajbot.modules.basic.debug import DebugModule
-from pajbot.modules.basic.emotes import EmotesModule
-from pajbot.modules.basic.ignore import IgnoreModule
-from pajbot.modules.basic.nuke import NukeModule
-from pajbot.modules.basic.namechange import NamechangeModule
-from pajbot.modules.basic.permaban import PermabanModule
-from pajbot.modules.basic.pointsreset import PointsResetModule
-from pajbot.modules.basic.stream_update import StreamUpdateModule
-from pajbot.modules.bingo import BingoModule
-from pajbot.modules.casechecker import CaseCheckerModule
-from pajbot.modules.circle import CircleModule
-from pajbot.modules.deck import DeckModule
-from pajbot.modules.bet import BetModule
-from pajbot.modules.dubtrack import DubtrackModule
-from pajbot.modules.duel import DuelModule
-from pajbot.modules.dummy import DummyModule
-from pajbot.modules.eightball import EightBallModule
-from pajbot.modules.emote_timeout import EmoteTimeoutModule
-from pajbot.modules.emotecombo import EmoteComboModule
-from pajbot.modules.emotecounter import EmoteCounterModule
-from pajbot.modules.emotesonscreen import EmotesOnScreenModule
-from pajbot.modules.followage import FollowAgeModule
-from pajbot.modules.givepoints import GivePointsModule
-from pajbot.modules.labspoints import DonationPointsModule
-from pajbot.modules.lastfm import LastfmModule
-from pajbot.modules.leaguerank import LeagueRankModule
-from pajbot.modules.linefarming import LineFarmingModule
-from pajbot.modules.linkchecker import BlacklistedLink
-from pajbot.modules.linkchecker import LinkCheckerModule
-from pajbot.modules.linkchecker import WhitelistedLink
-from pajbot.modules.linktracker import LinkTrackerLink
-from pajbot.modules.linktracker import LinkTrackerModule
-from pajbot.modules.longtimeout import LongTimeoutModule
-from pajbot.modules.massping import MassPingProtectionModule
-from pajbot.modules.math import MathModule
-from pajbot.modules.maxmsglength import MaxMsgLengthModule
-from pajbot.modules.paidsubmode import PaidSubmodeModule
-from pajbot.modules.paidtimeout import PaidTimeoutDiscountModule
-from pajbot.modules.paidtimeout import PaidTimeoutModule
-from pajbot.modules.paiduntimeout import PaidUntimeoutModule
-from pajbot.modules.playsound import PlaysoundModule
-from pajbot.modules.pleblist import PleblistModule
-from pajbot.modules.pointlottery import PointLotteryModule
-from pajbot.modules.predict import PredictModule
-from pajbot.modules.pyramid import PyramidModule
-from pajbot.modules.quest import QuestModule
-from pajbot.modules.quests.gettimedout import GetTimedOutQuestModule
-from pajbot.modules.quests.typeemote import TypeEmoteQuestModule
-from pajbot.modules.quests.typememessage import TypeMeMessageQuestModule
-from pajbot.modules.quests.winduelpoints import WinDuelPointsQuestModule
-from pajbot.modules.quests.winduels import WinDuelsQuestModule
-from pajbot.modules.quests.winraffle import WinRaffleQuestModule
-from pajbot.modules.quote import QuoteModule
-from pajbot.modules.raffle import RaffleModule
-from pajbot.modules.rename import RenameModule
-from pajbot.modules.repspam import RepspamModule
-from pajbot.modules.roulette import RouletteModule
-from pajbot.modules.showemote import ShowEmoteModule
-from pajbot.modules.slotmachine import SlotMachineModule
-from pajbot.modules.subalert import SubAlertModule
-from pajbot.modules.subscriber_fetch import SubscriberFetchModule
-from pajbot.modules.top import TopModule
-from pajbot.modules.trivia import TriviaModule
-from pajbot.modules.vanish import VanishModule
-from pajbot.modules.viewerpoints import MassPointsModule
-from pajbot.modules.warning import WarningModule
-from pajbot.modules.wolfram import WolframModule
-
-available_modules = [
-    AbCommandModule,
-    AdminCommandsModule,
-    AsciiProtectionModule,
-    BanphraseModule,
-    BasicCommandsModule,
-    BetModule,
-    BingoModule,
-    CheckModModule,
-    CircleModule,
-    DBManageModule,
-    DebugModule,
-    DeckModule,
-    DonationPointsModule,
-    DubtrackModule,
-    DuelModule,
-    DummyModule,
-    EightBallModule,
-    EmoteComboModule,
-    EmoteCounterModule,
-    EmotesModule,
-    EmotesOnScreenModule,
-    EmoteTimeoutModule,
-    FollowAgeModule,
-    GetTimedOutQuestModule,
-    GivePointsModule,
-    IgnoreModule,
-    NamechangeModule,
-    LastfmModule,
-    LeagueRankModule,
-    LineFarmingModule,
-    LinkCheckerModule,
-    LinkTrackerModule,
-    LongTimeoutModule,
-    MassPingProtectionModule,
-    MassPointsModule,
-    MathModule,
-    MaxMsgLengthModule,
-    NukeModule,
-    CaseCheckerModule,
-    PaidSubmodeModule,
-    PaidTimeoutModule,
-    PaidUntimeoutModule,
-    PermabanModule,
-    PlaysoundModule,
-    PleblistModule,
-    PointLotteryModule,
-    PointsResetModule,
-    PredictModule,
-    PyramidModule,
-    QuestModule,
-    QuoteModule,
-    RaffleModule,
-    RenameModule,
-    RepspamModule,
-    RouletteModule,
-    ShowEmoteModule,
-    StreamUpdateModule,
-    SubAlertModule,
-    SubscriberFetchModule,
-    TopModule,
-    TriviaModule,
-    TypeEmoteQuestModule,
-    TypeMeMessageQuestModule,
-    VanishModule,
-    WarningModule,
-    WinDuelPointsQuestModule,
-    WinDuelsQuestModule,
-    WinRaffleQuestModule,
-    WolframModule,
+
+log = logging.getLogger(__name__)
+
+# Maps the name of each class that can be imported from this package to the module it's implemented in.
+# Implementations are only imported once they are first accessed (see __getattr__ below), so e.g. importing
+# BaseModule does not pull in every module along with all of their dependencies.
+CLASS_PATHS = {
+    "AbCommandModule": "pajbot.modules.basic.ab",
+    "AdminCommandsModule": "pajbot.modules.basic.admincommands",
+    "AsciiProtectionModule": "pajbot.modules.ascii",
+    "BanphraseModule": "pajbot.modules.banphrase",
+    "BasicCommandsModule": "pajbot.modules.basic",
+    "BetModule": "pajbot.modules.bet",
+    "BingoModule": "pajbot.modules.bingo",
+    "BlacklistedLink": "pajbot.modules.linkchecker",
+    "CaseCheckerModule": "pajbot.modules.casechecker",
+    "CheckModModule": "pajbot.modules.basic.checkmod",
+    "CircleModule": "pajbot.modules.circle",
+    "DBManageModule": "pajbot.modules.basic.dbmanage",
+    "DebugModule": "pajbot.modules.basic.debug",
+    "DeckModule": "pajbot.modules.deck",
+    "DonationPointsModule": "pajbot.modules.labspoints",
+    "DubtrackModule": "pajbot.modules.dubtrack",
+    "DuelModule": "pajbot.modules.duel",
+    "DummyModule": "pajbot.modules.dummy",
+    "EightBallModule": "pajbot.modules.eightball",
+    "EmoteComboModule": "pajbot.modules.emotecombo",
+    "EmoteCounterModule": "pajbot.modules.emotecounter",
+    "EmoteTimeoutModule": "pajbot.modules.emote_timeout",
+    "EmotesModule": "pajbot.modules.basic.emotes",
+    "EmotesOnScreenModule": "pajbot.modules.emotesonscreen",
+    "FollowAgeModule": "pajbot.modules.followage",
+    "GetTimedOutQuestModule": "pajbot.modules.quests.gettimedout",
+    "GivePointsModule": "pajbot.modules.givepoints",
+    "IgnoreModule": "pajbot.modules.basic.ignore",
+    "LastfmModule": "pajbot.modules.lastfm",
+    "LeagueRankModule": "pajbot.modules.leaguerank",
+    "LineFarmingModule": "pajbot.modules.linefarming",
+    "LinkCheckerModule": "pajbot.modules.linkchecker",
+    "LinkTrackerLink": "pajbot.modules.linktracker",
+    "LinkTrackerModule": "pajbot.modules.linktracker",
+    "LongTimeoutModule": "pajbot.modules.longtimeout",
+    "MassPingProtectionModule": "pajbot.modules.massping",
+    "MassPointsModule": "pajbot.modules.viewerpoints",
+    "MathModule": "pajbot.modules.math",
+    "MaxMsgLengthModule": "pajbot.modules.maxmsglength",
+    "NamechangeModule": "pajbot.modules.basic.namechange",
+    "NukeModule": "pajbot.modules.basic.nuke",
+    "PaidSubmodeModule": "pajbot.modules.paidsubmode",
+    "PaidTimeoutDiscountModule": "pajbot.modules.paidtimeout",
+    "PaidTimeoutModule": "pajbot.modules.paidtimeout",
+    "PaidUntimeoutModule": "pajbot.modules.paiduntimeout",
+    "PermabanModule": "pajbot.modules.basic.permaban",
+    "PlaysoundModule": "pajbot.modules.playsound",
+    "PleblistModule": "pajbot.modules.pleblist",
+    "PointLotteryModule": "pajbot.modules.pointlottery",
+    "PointsResetModule": "pajbot.modules.basic.pointsreset",
+    "PredictModule": "pajbot.modules.predict",
+    "PyramidModule": "pajbot.modules.pyramid",
+    "QuestModule": "pajbot.modules.quest",
+    "QuoteModule": "pajbot.modules.quote",
+    "RaffleModule": "pajbot.modules.raffle",
+    "RenameModule": "pajbot.modules.rename",
+    "RepspamModule": "pajbot.modules.repspam",
+    "RouletteModule": "pajbot.modules.roulette",
+    "ShowEmoteModule": "pajbot.modules.showemote",
+    "SlotMachineModule": "pajbot.modules.slotmachine",
+    "StreamUpdateModule": "pajbot.modules.basic.stream_update",
+    "SubAlertModule": "pajbot.modules.subalert",
+    "SubscriberFetchModule": "pajbot.modules.subscriber_fetch",
+    "TopModule": "pajbot.modules.top",
+    "TriviaModule": "pajbot.modules.trivia",
+    "TypeEmoteQuestModule": "pajbot.modules.quests.typeemote",
+    "TypeMeMessageQuestModule": "pajbot.modules.quests.typememessage",
+    "VanishModule": "pajbot.modules.vanish",
+    "WarningModule": "pajbot.modules.warning",
+    "WhitelistedLink": "pajbot.modules.linkchecker",
+    "WinDuelPointsQuestModule": "pajbot.modules.quests.winduelpoints",
+    "WinDuelsQuestModule": "pajbot.modules.quests.winduels",
+    "WinRaffleQuestModule": "pajbot.modules.quests.winraffle",
+    "WolframModule": "pajbot.modules.wolfram",
+}
+
+# Names of the classes that make up `available_modules`
+AVAILABLE_MODULE_NAMES = [
+    "AbCommandModule",
+    "AdminCommandsModule",
+    "AsciiProtectionModule",
+    "BanphraseModule",
+    "BasicCommandsModule",
+    "BetModule",
+    "BingoModule",
+    "CheckModModule",
+    "CircleModule",
+    "DBManageModule",
+    "DebugModule",
+    "DeckModule",
+    "DonationPointsModule",
+    "DubtrackModule",
+    "DuelModule",
+    "DummyModule",
+    "EightBallModule",
+    "EmoteComboModule",
+    "EmoteCounterModule",
+    "EmotesModule",
+    "EmotesOnScreenModule",
+    "EmoteTimeoutModule",
+    "FollowAgeModule",
+    "GetTimedOutQuestModule",
+    "GivePointsModule",
+    "IgnoreModule",
+    "NamechangeModule",
+    "LastfmModule",
+    "LeagueRankModule",
+    "LineFarmingModule",
+    "LinkCheckerModule",
+    "LinkTrackerModule",
+    "LongTimeoutModule",
+    "MassPingProtectionModule",
+    "MassPointsModule",
+    "MathModule",
+    "MaxMsgLengthModule",
+    "NukeModule",
+    "CaseCheckerModule",
+    "PaidSubmodeModule",
+    "PaidTimeoutModule",
+    "PaidUntimeoutModule",
+    "PermabanModule",
+    "PlaysoundModule",
+    "PleblistModule",
+    "PointLotteryModule",
+    "PointsResetModule",
+    "PredictModule",
+    "PyramidModule",
+    "QuestModule",
+    "QuoteModule",
+    "RaffleModule",
+    "RenameModule",
+    "RepspamModule",
+    "RouletteModule",
+    "ShowEmoteModule",
+    "StreamUpdateModule",
+    "SubAlertModule",
+    "SubscriberFetchModule",
+    "TopModule",
+    "TriviaModule",
+    "TypeEmoteQuestModule",
+    "TypeMeMessageQuestModule",
+    "VanishModule",
+    "WarningModule",
+    "WinDuelPointsQuestModule",
+    "WinDuelsQuestModule",
+    "WinRaffleQuestModule",
+    "WolframModule",
 ]
+
+# Maps the python module path to how long it took to import it (in seconds)
+import_times = {}
+
+
+def import_class(name):
+    module_path = CLASS_PATHS[name]
+
+    time1 = time.perf_counter()
+    python_module = importlib.import_module(module_path)
+    import_times.setdefault(module_path, time.perf_counter() - time1)
+
+    return getattr(python_module, name)
+
+
+def import_time_report(limit=10):
+    """Returns a one-line summary of the time spent importing modules, slowest first"""
+    total = sum(import_times.values())
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return "Imported {} modules in {:.0f} ms, slowest: {}".format(
+        len(import_times),
+        total * 1000.0,
+        ", ".join("{} ({:.0f} ms)".format(module_path, duration * 1000.0) for module_path, duration in slowest),
+    )
+
+
+def load_available_modules():
+    modules = []
+    for name in AVAILABLE_MODULE_NAMES:
+        try:
+            modules.append(import_class(name))
+        except:
+            log.exception("Unable to import module %s, it will not be available", name)
+
+    log.info(import_time_report())
+    return modules
+
+
+def __getattr__(name):
+    if name == "available_modules":
+        value = load_available_modules()
+    elif name in CLASS_PATHS:
+        value = import_class(name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    # Cache the value so this function isn't called again for the same name
+    globals()[name] = value
+    return value
@@ -3,9 +3,13 @@ import logging
 from pajbot.managers.adminlog import AdminLogManager
 from pajbot.managers.db import DBManager
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.schedule import ScheduleManager
+from pajbot.models.banphrase import Banphrase
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
+from pajbot.models.sock import SocketClientManager
 from pajbot.modules.base import BaseModule
+from pajbot.modules.base import ModuleSetting
 
 log = logging.getLogger(__name__)
 
@@ -17,7 +21,21 @@ class BanphraseModule(BaseModule):
     DESCRIPTION = "Looks at each message for banned phrases, and takes actions accordingly"
     ENABLED_DEFAULT = True
     CATEGORY = "Filter"
-    SETTINGS = []
+    SETTINGS = [
+        ModuleSetting(
+            key="delete_recent_on_add",
+            label="Delete messages of the last 5 minutes that match newly added banphrases",
+            type="boolean",
+            required=True,
+            default=False,
+        )
+    ]
+
+    # How far back messages are checked against newly added banphrases
+    RECENT_MESSAGES_SECONDS = 5 * 60
+
+    # Number of recent chat messages `!add banphrase PHRASE --dryrun` is evaluated against
+    DRY_RUN_MESSAGES = 10000
 
     def is_message_bad(self, source, msg_raw, _event):
         res = self.bot.banphrase_manager.check_message(msg_raw, source)
@@ -44,8 +62,23 @@ class BanphraseModule(BaseModule):
             # return False so no more code is run for this message
             return False
 
-    @staticmethod
-    def add_banphrase(**options):
+    def delete_recent_matches(self, banphrase):
+        """Deletes the recent messages that match the given banphrase, and returns how many were deleted"""
+        # sub immunity would require looking up every user
+        if banphrase.sub_immunity:
+            return 0
+
+        entries = [
+            entry
+            for entry in self.bot.chat_history.last(seconds=self.RECENT_MESSAGES_SECONDS)
+            if entry.msg_id is not None and banphrase.match(entry.message, None)
+        ]
+        for i, entry in enumerate(entries):
+            self.bot.execute_delayed(0.25 * i, self.bot.delete_message, (entry.msg_id,))
+
+        return len(entries)
+
+    def add_banphrase(self, **options):
         """Method for creating and editing banphrases.
         Usage: !add banphrase BANPHRASE [options]
         Multiple options available:
@@ -65,6 +98,16 @@ class BanphraseModule(BaseModule):
                 bot.whisper(source.username, "Invalid banphrase")
                 return False
 
+            if options["operator"] == "regex":
+                error = Banphrase.lint_regex(phrase)
+                if error is not None:
+                    bot.whisper(source.username, error)
+                    return False
+
+            if options.pop("dry_run", False):
+                self.dry_run_banphrase(source, phrase, options)
+                return False
+
             options["added_by"] = source.id
             options["edited_by"] = source.id
 
@@ -72,6 +115,10 @@ class BanphraseModule(BaseModule):
 
             if new_banphrase is True:
                 bot.whisper(source.username, "Added your banphrase (ID: {banphrase.id})".format(banphrase=banphrase))
+                if self.settings["delete_recent_on_add"]:
+                    num_deleted = self.delete_recent_matches(banphrase)
+                    if num_deleted > 0:
+                        bot.whisper(source.username, "Deleting {} recent messages matching it".format(num_deleted))
                 AdminLogManager.post("Banphrase added", source, banphrase.id, banphrase.phrase)
                 return True
 
@@ -79,6 +126,7 @@ class BanphraseModule(BaseModule):
             banphrase.data.set(edited_by=options["edited_by"])
             DBManager.session_add_expunge(banphrase)
             bot.banphrase_manager.commit()
+            SocketClientManager.send("banphrase.update", {"id": banphrase.id})
             bot.whisper(
                 source.username,
                 "Updated your banphrase (ID: {banphrase.id}) with ({what})".format(
@@ -87,6 +135,27 @@ class BanphraseModule(BaseModule):
             )
             AdminLogManager.post("Banphrase edited", source, banphrase.id, banphrase.phrase)
 
+    def dry_run_banphrase(self, source, phrase, options):
+        """Whispers how many of the recent chat messages the given banphrase would have matched.
+        The messages are matched in the background, in this process, so a slow regex doesn't hold up chat"""
+        entries = self.bot.chat_history.last(count=self.DRY_RUN_MESSAGES)
+        ScheduleManager.execute_now(self.bg_dry_run_banphrase, args=[source.username, phrase, entries, options])
+
+    def bg_dry_run_banphrase(self, username, phrase, entries, options):
+        try:
+            result = self.bot.banphrase_manager.dry_run(phrase, entries, max_samples=3, parallel=False, **options)
+        except ValueError as e:
+            self.bot.whisper(username, "Invalid banphrase: {}".format(e))
+            return
+
+        response = "Dry run: your banphrase would have matched {num_matches} of the last {num_messages} messages, from {num_users} users".format(
+            **result
+        )
+        if result["samples"]:
+            response += ", e.g. " + " | ".join("{username}: {message}".format(**sample) for sample in result["samples"])
+
+        self.bot.whisper(username, response[:500])
+
     @staticmethod
     def remove_banphrase(**options):
         message = options["message"]
@@ -161,6 +230,13 @@ class BanphraseModule(BaseModule):
                             "bot>user:Updated the given banphrase (ID: 83) with (sub_immunity)",
                             description="Changes a command so that the banphrase can only be triggered by people who are not subscribed to the channel.",
                         ).parse(),
+                        CommandExample(
+                            None,
+                            "Test a banphrase against recent chat messages",
+                            chat="user:!add banphrase testman123 --dryrun\n"
+                            "bot>user:Dry run: your banphrase would have matched 2 of the last 10000 messages, from 1 users, e.g. troll: testman123 | troll: TESTMAN123",
+                            description="Shows how many of the last 10000 chat messages would have matched the banphrase, without adding it",
+                        ).parse(),
                     ],
                 )
             },
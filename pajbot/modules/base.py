@@ -128,9 +128,14 @@ class BaseModule:
 
     def load(self, **options):
         """ This method will load everything from the module into
-        their proper dictionaries, which we can then use later. """
+        their proper dictionaries, which we can then use later.
+        If the raw settings dictionary is passed as the `settings` option,
+        it is used instead of querying the database for them. """
 
-        self.settings = self.module_settings()
+        if "settings" in options:
+            self.settings = self.module_settings(options["settings"] or {})
+        else:
+            self.settings = self.module_settings()
 
         self.commands = {}
         self.load_commands(**options)
@@ -151,8 +156,11 @@ class BaseModule:
         return settings
 
     @classmethod
-    def module_settings(cls):
-        settings = cls.db_settings()
+    def module_settings(cls, settings=None):
+        if settings is None:
+            settings = cls.db_settings()
+        else:
+            settings = dict(settings)
 
         # Load any unset settings
         for setting in cls.SETTINGS:
@@ -5,6 +5,7 @@ from pajbot.managers.db import DBManager
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
 from pajbot.models.module import Module
+from pajbot.models.module import ModuleManager
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleType
 from pajbot.modules.basic import BasicCommandsModule
@@ -239,6 +240,8 @@ class AdminCommandsModule(BaseModule):
                 db_module = db_session.query(Module).filter_by(id=module_id).one()
                 db_module.enabled = False
 
+            ModuleManager.bump_version()
+
             AdminLogManager.post("Module toggled", source, "Disabled", module_id)
 
             bot.say("Disabled module {}".format(module_id))
@@ -268,6 +271,8 @@ class AdminCommandsModule(BaseModule):
                 db_module = db_session.query(Module).filter_by(id=module_id).one()
                 db_module.enabled = True
 
+            ModuleManager.bump_version()
+
             AdminLogManager.post("Module toggled", source, "Enabled", module_id)
 
             bot.say("Enabled module {}".format(module_id))
@@ -1,9 +1,5 @@
-import datetime
 import logging
 import re
-import sys
-
-import requests
 
 import pajbot.models
 from pajbot.managers.adminlog import AdminLogManager
@@ -36,74 +32,90 @@ class NukeModule(BaseModule):
         self.actually_nuke(message, bot, source)
 
     def actually_nuke(self, message, bot, source):
-        if message and len(message) > 0:
-            message_split = []
+        if not message or len(message) <= 0:
+            bot.whisper(source.username, "You did not include enough arguments. Contact DatGuy1 for help.")
+            return
+
+        message_split = []
+
+        try:
+            if message.startswith("'"):
+                filteredMessage = re.search(r"\'(.+?(?<!\\))\'(.*)", message)
+                message_split.append(filteredMessage.group(1))
+                message_split.extend(filteredMessage.group(2).strip().split(" "))
+            else:
+                message_split = message.split(" ")
+        except AttributeError as e:
+            bot.whisper(source.username, "Error with syntax: {}.".format(e))
+            return
+
+        if len(message_split) < 2:
+            bot.whisper(source.username, "You did not include enough arguments. Contact DatGuy1 for help.")
+            return
+
+        phrase = message_split[0]
+        if not message_split[1].isdigit():
+            bot.whisper(source.username, "Duration must be numbers in seconds only.")
+            return
+        duration = int(message_split[1])
+
+        # the scope is either a number of messages (e.g. 200), or a number of seconds (e.g. 60s)
+        messages = 200
+        seconds = None
+        if len(message_split) == 3:
+            scope = message_split[2]
+            if scope.isdigit():
+                messages = int(scope)
+            elif scope.endswith("s") and scope[:-1].isdigit():
+                messages = None
+                seconds = int(scope[:-1])
+            else:
+                bot.whisper(
+                    source.username, "Scope must be a number of messages (e.g. 200) or seconds (e.g. 60s) only."
+                )
+                return
 
+        if phrase.startswith("r/"):
             try:
-                if message.startswith("'"):
-                    filteredMessage = re.search(r"\'(.+?(?<!\\))\'(.*)", message)
-                    message_split.append(filteredMessage.group(1))
-                    message_split.extend(filteredMessage.group(2).strip().split(" "))
-                else:
-                    message_split = message.split(" ")
-            except IndexError as e:
-                bot.whisper(source.username, "Error with syntax: {}.".format(e))
-
-            if len(message_split) >= 1:
-                phrase = message_split[0]
-                if not message_split[1].isdigit():
-                    bot.whisper(source.username, "Duration must be numbers in seconds only.")
-                    return
-                duration = int(message_split[1])
-
-                if len(message_split) == 3:
-                    if message_split[2].isdigit():
-                        messages = int(message_split[2])
-                else:
-                    messages = 200
-
-            today = datetime.date.today()
-            url = "https://overrustlelogs.net/Admiralbulldog" " chatlog/{:%B %Y}/{:%Y-%m-%d}.txt".format(today, today)
-            log.debug(url)
-
-            r = requests.get(url)
-            if r.status_code != 200:
-                log.warning("Error with getting log")
-                bot.whisper(source.username, "Error with getting channel log. Contact DatGuy1 for help.")
-                return
+                matcher = re.compile(phrase[2:]).search
+            except re.error:
+                bot.whisper(source.username, "Invalid regex")
+                return False
+        else:
 
-            non_bmp_map = dict.fromkeys(range(0x10000, sys.maxunicode + 1), 0xFFFD)
-            splitText = r.text.translate(non_bmp_map).splitlines()[-messages:][:-1]
+            def matcher(text):
+                return phrase in text
 
-            badUsers = []
+        # the message containing the nuke command is part of the history as well
+        badUsers = {
+            entry.username
+            for entry in bot.chat_history.last(count=messages, seconds=seconds)
+            if entry.username != source.username and matcher(entry.message)
+        }
 
-            for fullMessage in splitText:
-                messageContent = re.findall(r"[^: ]*: (.*)", fullMessage)[0]
-                if phrase.startswith("r/"):
-                    try:
-                        if re.search(phrase[2:], messageContent):
-                            badUsers.append(re.findall(r"[^\]]*] ([^:]*)", fullMessage)[0])
-                    except:
-                        bot.whisper(source.username, "Invalid regex")
-                        return False
-                else:
-                    if phrase in messageContent:
-                        badUsers.append(re.findall(r"[^\]]*] ([^:]*)", fullMessage)[0])
+        reason = '{} nuked {} users for the phrase "{}" for {}'.format(
+            source.username, len(badUsers), phrase, self.format_time(duration)
+        )
+        for i, timeoutUser in enumerate(badUsers, start=1):
+            bot.execute_delayed(0.25 * i, bot._timeout, (timeoutUser, duration, reason))
 
-            badUsers = list(set(badUsers))
+        AdminLogManager.add_entry("Users nuked", source, reason.replace(source.username, "").strip().capitalize())
 
-            reason = '{} nuked {} users for the phrase "{}" for {}'.format(
-                source.username, len(badUsers), phrase, self.format_time(duration)
-            )
-            i = 1
-            for timeoutUser in badUsers:
-                bot.execute_delayed(0.25 * i, bot._timeout, (timeoutUser, duration, reason))
-                i += 1
+    def delete_messages_command(self, bot, source, message, **rest):
+        """Deletes the last messages (all of the last 10 minutes by default) of a user"""
+        message_split = message.split(" ") if message else []
+        if len(message_split) < 1 or (len(message_split) >= 2 and not message_split[1].isdigit()):
+            bot.whisper(source.username, "Usage: !deletemessages USERNAME [COUNT]")
+            return False
 
-            AdminLogManager.add_entry("Users nuked", source, reason.replace(source.username, "").strip().capitalize())
+        username = message_split[0].lower().replace("@", "")
+        count = int(message_split[1]) if len(message_split) >= 2 else None
 
-        else:
-            bot.whisper(source.username, "You did not include enough arguments. Contact DatGuy1 for help.")
+        entries = [entry for entry in bot.chat_history.user_last(username, count=count) if entry.msg_id is not None]
+        for i, entry in enumerate(entries):
+            bot.execute_delayed(0.25 * i, bot.delete_message, (entry.msg_id,))
+
+        bot.whisper(source.username, "Deleting {} messages from {}".format(len(entries), username))
 
     def format_time(self, totalSeconds):
         res = ""
@@ -153,7 +165,6 @@ class NukeModule(BaseModule):
             payload1 = {"id": row.id, "new_state": row.enabled}
             payload2 = {"id": row2.id, "new_state": row2.enabled}
 
-            SocketClientManager.init("/tmp/.bullbot.sock")
             SocketClientManager.send("banphrase.update", payload1)
             SocketClientManager.send("banphrase.update", payload2)
 
@@ -179,6 +190,13 @@ class NukeModule(BaseModule):
                     'bot:DatGuy1 nuked 5 users for the phrase "I like boats" in the last 100 messages for 3 minutes',
                     description="Nuke the last 100 messages that have 'I like boats' in them for 3 minutes",
                 ).parse(),
+                pajbot.models.command.CommandExample(
+                    None,
+                    "Nuke the messages of the last 60 seconds that have 'TriHard' in them for 1 minute",
+                    chat="user:!nuke TriHard 60 60s\n"
+                    'bot:DatGuy1 nuked 3 users for the phrase "TriHard" in the last 60 seconds for 1 minutes',
+                    description="Nuke the messages of the last 60 seconds that have 'TriHard' in them for 1 minute",
+                ).parse(),
                 pajbot.models.command.CommandExample(
                     None,
                     "Nuke the last 100 messages that match the '\bnam' regex for 1 hour",
@@ -188,6 +206,21 @@ class NukeModule(BaseModule):
                 ).parse(),
             ],
         )
+        self.commands["deletemessages"] = pajbot.models.command.Command.raw_command(
+            self.delete_messages_command,
+            level=500,
+            delay_all=0,
+            delay_user=0,
+            description="Delete the last messages of a user",
+            examples=[
+                pajbot.models.command.CommandExample(
+                    None,
+                    "Delete the last 3 messages of a user",
+                    chat="user:!deletemessages TriHard7 3\n" "bot>user:Deleting 3 messages from trihard7",
+                    description="Deletes the last 3 messages of TriHard7, if they were sent in the last 10 minutes",
+                ).parse()
+            ],
+        )
         self.commands["tcpurge"] = pajbot.models.command.Command.raw_command(
             self.monkeypurge,
             level=500,
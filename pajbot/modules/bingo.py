@@ -4,6 +4,7 @@ import random
 import re
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
 from pajbot.modules import BaseModule
@@ -447,7 +448,7 @@ class BingoModule(BaseModule):
         )
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.CRITICAL)
 
     def disable(self, bot):
         HandlerManager.remove_handler("on_message", self.on_message)
@@ -1,7 +1,5 @@
 import logging
 
-from numpy import random
-
 import pajbot.exc
 from pajbot import utils
 from pajbot.managers.db import DBManager
@@ -236,6 +234,7 @@ class DuelModule(BaseModule):
         How to add: !add funccommand accept accept_duel --cd 0 --usercd 0
         How to use: !accept
         """
+        from numpy import random
 
         bot = options["bot"]
         source = options["source"]
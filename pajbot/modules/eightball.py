@@ -1,7 +1,5 @@
 import logging
 
-from numpy import random
-
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
 from pajbot.modules import BaseModule
@@ -108,6 +106,8 @@ class EightBallModule(BaseModule):
         ]
 
     def eightball_command(self, **options):
+        from numpy import random
+
         source = options["source"]
         bot = options["bot"]
         message = options["message"]
@@ -1,6 +1,7 @@
 import logging
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.modules import BaseModule
 from pajbot.modules.base import ModuleSetting
 
@@ -69,7 +70,7 @@ class EmoteComboModule(BaseModule):
         return True
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.COSMETIC)
 
     def disable(self, bot):
         HandlerManager.remove_handler("on_message", self.on_message)
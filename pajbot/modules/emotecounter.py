@@ -3,6 +3,7 @@ import logging
 from unidecode import unidecode
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
 from pajbot.modules import BaseModule
@@ -59,7 +60,7 @@ class EmoteCounterModule(BaseModule):
                 first_emote.code, second_emote.code
             )
         )
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.NORMAL)
         bot.execute_delayed(duration, self.cleanup_counter, ({}))
 
     def cleanup_counter(self, **options):
@@ -2,6 +2,7 @@ import logging
 import random
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
 
@@ -99,7 +100,7 @@ class EmotesOnScreenModule(BaseModule):
         )
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.COSMETIC)
 
     def disable(self, bot):
         HandlerManager.remove_handler("on_message", self.on_message)
@@ -1,13 +1,14 @@
 import datetime
 import logging
-
-import requests
+import math
 
 from pajbot import utils
+from pajbot.apiwrappers.trackobot import TrackOBotAPI
 from pajbot.managers.db import DBManager
 from pajbot.managers.handler import HandlerManager
 from pajbot.managers.redis import RedisManager
 from pajbot.managers.schedule import ScheduleManager
+from pajbot.managers.schedule import ScheduledJob
 from pajbot.models.command import Command
 from pajbot.models.hsbet import HSBetBet
 from pajbot.models.hsbet import HSBetGame
@@ -89,15 +90,57 @@ class HSBetModule(BaseModule):
         except (TypeError, ValueError):
             pass
 
-        self.job = ScheduleManager.execute_every(15, self.poll_trackobot)
-        self.job.pause()
-        self.reminder_job = ScheduleManager.execute_every(1, self.reminder_bet)
-        self.reminder_job.pause()
+        self.api = TrackOBotAPI()
+        self.poll_job = None
+
+        # Only the next reminder is scheduled. Replacing it bumps the generation,
+        # so a reminder that was already running when it was replaced is skipped
+        self.reminder_job = ScheduledJob(None)
+        self.reminder_generation = 0
+
+    @staticmethod
+    def next_reminder(seconds_left):
+        """Returns the next number of seconds before the betting closes at which chat is reminded of the bets,
+        i.e. every 10 seconds, 5 seconds before and when it closes, or None if the betting is closed"""
+        if seconds_left > 10:
+            return int(math.ceil(seconds_left / 10) - 1) * 10
+        if seconds_left > 5:
+            return 5
+        if seconds_left > 0:
+            return 0
+        return None
+
+    def schedule_reminder(self, after=None):
+        """Schedules the next reminder, strictly after the reminder at `after` seconds before the betting closes"""
+        self.reminder_job.cancel()
+        self.reminder_generation += 1
+
+        if self.last_game_start is None:
+            return
+
+        seconds_left = (self.last_game_start - utils.now()).total_seconds()
+        if after is not None:
+            seconds_left = min(seconds_left, after)
+        reminder = self.next_reminder(seconds_left)
+        if reminder is None:
+            return
+
+        self.reminder_job = ScheduleManager.execute_delayed(
+            max(0, (self.last_game_start - utils.now()).total_seconds() - reminder),
+            self.reminder_bet,
+            args=[self.reminder_generation, reminder],
+        )
 
-    def reminder_bet(self):
-        if self.is_betting_open():
-            seconds_until_bet_closes = int((self.last_game_start - utils.now()).total_seconds()) - 1
-            if (seconds_until_bet_closes % 10) == 0 and seconds_until_bet_closes > 0:
+    def cancel_reminder(self):
+        self.reminder_job.cancel()
+        self.reminder_generation += 1
+
+    def reminder_bet(self, generation, seconds_until_bet_closes):
+        if generation != self.reminder_generation:
+            return
+
+        try:
+            if seconds_until_bet_closes > 5:
                 win_points, lose_points = self.get_stats()
                 self.bot.me(
                     "The hearthstone betting closes in {} seconds. Current win/lose points: {}/{}".format(
@@ -118,13 +161,21 @@ class HSBetModule(BaseModule):
                         win_points, lose_points
                     )
                 )
+        finally:
+            if generation == self.reminder_generation:
+                self.schedule_reminder(after=seconds_until_bet_closes)
 
     def poll_trackobot(self):
-        url = "https://trackobot.com/profile/history.json?username={username}&token={api_key}".format(
-            username=self.settings["trackobot_username"], api_key=self.settings["trackobot_api_key"]
-        )
-        r = requests.get(url)
-        game_data = r.json()
+        try:
+            game_data = self.api.get_history(self.settings["trackobot_username"], self.settings["trackobot_api_key"])
+        except:
+            log.exception("Failed to fetch the Track-o-bot history")
+            return False
+
+        if game_data is None:
+            # unchanged since the last poll
+            return False
+
         if "history" not in game_data:
             log.error("Invalid json?")
             return False
@@ -231,6 +282,7 @@ class HSBetModule(BaseModule):
             self.last_game_start = utils.now() + datetime.timedelta(seconds=self.settings["time_until_bet_closes"])
             payload = {"time_left": self.settings["time_until_bet_closes"], "win": 0, "loss": 0}
             self.bot.websocket_manager.emit("hsbet_new_game", data=payload)
+            self.schedule_reminder()
 
             # stats about the game
             ratio = 0.0
@@ -347,6 +399,7 @@ class HSBetModule(BaseModule):
                 pass
 
         self.last_game_start = utils.now() + datetime.timedelta(seconds=time_limit)
+        self.schedule_reminder()
         win_bets = 0
         loss_bets = 0
         for username in self.bets:
@@ -370,6 +423,7 @@ class HSBetModule(BaseModule):
         bot = options["bot"]
 
         self.last_game_start = utils.now() - datetime.timedelta(seconds=10)
+        self.cancel_reminder()
 
         for username in self.bets:
             _, points = self.bets[username]
@@ -429,10 +483,12 @@ class HSBetModule(BaseModule):
 
     def enable(self, bot):
         if bot:
-            self.job.resume()
-            self.reminder_job.resume()
+            self.poll_job = ScheduleManager.execute_every(15, self.poll_trackobot)
+            self.schedule_reminder()
 
     def disable(self, bot):
         if bot:
-            self.job.pause()
-            self.reminder_job.pause()
+            if self.poll_job is not None:
+                self.poll_job.remove()
+                self.poll_job = None
+            self.cancel_reminder()
@@ -1,9 +1,6 @@
 import logging
 import threading
 
-from currency_converter import CurrencyConverter
-from socketIO_client_nexus import SocketIO
-
 from pajbot.managers.schedule import ScheduleManager
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
@@ -13,6 +10,9 @@ log = logging.getLogger(__name__)
 
 class asyncSocketIO:
     def __init__(self, bot, settings):
+        from currency_converter import CurrencyConverter
+        from socketIO_client_nexus import SocketIO
+
         self.bot = bot
         self.settings = settings
         self.currencyConverter = CurrencyConverter()
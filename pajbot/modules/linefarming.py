@@ -1,6 +1,7 @@
 import logging
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
 
@@ -25,7 +26,7 @@ class LineFarmingModule(BaseModule):
             source.incr_num_lines()
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_pubmsg", self.on_pubmsg)
+        HandlerManager.add_handler("on_pubmsg", self.on_pubmsg, criticality=HandlerCriticality.NORMAL)
 
     def disable(self, bot):
         HandlerManager.remove_handler("on_pubmsg", self.on_pubmsg)
@@ -3,7 +3,6 @@ import logging
 import urllib.parse
 
 import requests
-from bs4 import BeautifulSoup
 from sqlalchemy import Column, INT, TEXT
 
 import pajbot.managers
@@ -530,6 +529,8 @@ class LinkCheckerModule(BaseModule):
             log.exception("Unhandled exception")
             return
 
+        from bs4 import BeautifulSoup
+
         try:
             soup = BeautifulSoup(html, "html.parser")
         except:
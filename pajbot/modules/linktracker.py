@@ -10,6 +10,7 @@ from pajbot import utils
 from pajbot.managers.db import Base
 from pajbot.managers.db import DBManager
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.modules import BaseModule
 
 log = logging.getLogger(__name__)
@@ -92,7 +93,7 @@ class LinkTrackerModule(BaseModule):
             self.db_session.commit()
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_message", self.on_message, priority=200)
+        HandlerManager.add_handler("on_message", self.on_message, priority=200, criticality=HandlerCriticality.NORMAL)
         HandlerManager.add_handler("on_commit", self.on_commit)
 
         if self.db_session is not None:
@@ -1,4 +1,6 @@
+import heapq
 import logging
+import threading
 from datetime import datetime
 from datetime import timedelta
 
@@ -17,35 +19,95 @@ class LongTimeoutModule(BaseModule):
     DESCRIPTION = "Do an extra-long timeout"
     CATEGORY = "Feature"
 
+    # Twitch's maximum timeout length
+    MAX_TIMEOUT_DURATION = 1209600
+
     def __init__(self, bot):
         super().__init__(bot)
-        self.checkJob = ScheduleManager.execute_every(30, self.check_retimeout)
-        self.checkJob.pause()
         self.mysqlFormat = "%Y-%m-%d %H:%M:%S"
 
-    def check_retimeout(self):
+        # Min-heap of (due time, username) for every long timeout's next re-timeout or expiry, and each user's
+        # current due time. Outdated heap entries are skipped instead of removed, so changes are O(log n)
+        self.heap = []
+        self.due_times = {}
+        self.heap_lock = threading.Lock()
+
+        # Time of the earliest pending wake-up, if any
+        self.next_wake = None
+        self.running = False
+
+    @staticmethod
+    def next_action_time(timeout_recent_end, timeout_end):
+        if timeout_recent_end is None:
+            return utils.now()
+
+        return min(timeout_recent_end, timeout_end)
+
+    def load_timeouts(self):
         with DBManager.create_session_scope() as session:
-            timeoutList = session.query(LongTimeout).all()
-            timeNow = utils.now()
-            for timeoutItem in timeoutList:
-                timeoutEnd = timeoutItem.timeout_recent_end
-                overallStart = timeoutItem.timeout_start
-                overallEnd = timeoutItem.timeout_end
+            rows = session.query(LongTimeout.username, LongTimeout.timeout_recent_end, LongTimeout.timeout_end).all()
 
-                if timeNow > overallEnd:
-                    self.bot.whisper(
-                        timeoutItem.timeout_author,
-                        "{}'s timeout of {} hours has ended.".format(
-                            timeoutItem.username, round((overallEnd - overallStart).seconds / 3600, 2)
-                        ),
-                    )
-                    session.delete(timeoutItem)
-                    continue
+        for username, timeout_recent_end, timeout_end in rows:
+            self.schedule_timeout(username, self.next_action_time(timeout_recent_end, timeout_end))
 
-                if timeoutEnd < timeNow:
-                    timeoutDuration = 1209600
-                    if (overallEnd - timeNow).days < 14:
-                        timeoutDuration = (overallEnd - timeNow).seconds
+        log.info("Loaded {} long timeouts".format(len(rows)))
+
+    def schedule_timeout(self, username, due):
+        with self.heap_lock:
+            self.due_times[username] = due
+            heapq.heappush(self.heap, (due, username))
+            self._schedule_wake_locked()
+
+    def unschedule_timeout(self, username):
+        with self.heap_lock:
+            self.due_times.pop(username, None)
+
+    def _schedule_wake_locked(self):
+        while self.heap and self.due_times.get(self.heap[0][1], None) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+        if not self.heap or not self.running:
+            return
+
+        due = self.heap[0][0]
+        if self.next_wake is not None and self.next_wake <= due:
+            return
+
+        # An earlier wake-up that is no longer needed finds nothing due, and schedules the next one
+        self.next_wake = due
+        ScheduleManager.execute_delayed(max(0, (due - utils.now()).total_seconds()), self.check_retimeout)
+
+    def check_retimeout(self):
+        timeNow = utils.now()
+
+        with self.heap_lock:
+            self.next_wake = None
+            due_usernames = []
+            while self.heap and self.heap[0][0] <= timeNow:
+                due, username = heapq.heappop(self.heap)
+                if self.due_times.get(username, None) == due:
+                    del self.due_times[username]
+                    due_usernames.append(username)
+
+        rescheduled = []
+        if due_usernames and self.running:
+            with DBManager.create_session_scope() as session:
+                timeoutList = session.query(LongTimeout).filter(LongTimeout.username.in_(due_usernames)).all()
+                for timeoutItem in timeoutList:
+                    overallStart = timeoutItem.timeout_start
+                    overallEnd = timeoutItem.timeout_end
+
+                    if timeNow >= overallEnd:
+                        self.bot.whisper(
+                            timeoutItem.timeout_author,
+                            "{}'s timeout of {} hours has ended.".format(
+                                timeoutItem.username, round((overallEnd - overallStart).total_seconds() / 3600, 2)
+                            ),
+                        )
+                        session.delete(timeoutItem)
+                        continue
+
+                    timeoutDuration = min(self.MAX_TIMEOUT_DURATION, int((overallEnd - timeNow).total_seconds()))
 
                     timeoutHours = round(float(timeoutDuration / 3600), 2)
                     timeoutItem.timeout_recent_end = (timeNow + timedelta(seconds=timeoutDuration))
@@ -61,6 +123,15 @@ class LongTimeoutModule(BaseModule):
                         ),
                     )
                     session.add(timeoutItem)
+                    rescheduled.append(
+                        (timeoutItem.username, self.next_action_time(timeoutItem.timeout_recent_end, overallEnd))
+                    )
+
+        for username, due in rescheduled:
+            self.schedule_timeout(username, due)
+
+        with self.heap_lock:
+            self._schedule_wake_locked()
 
     def long_timeout(self, **options):
         bot = options["bot"]
@@ -78,13 +149,12 @@ class LongTimeoutModule(BaseModule):
         try:
             daysDuration = int(splitMsg[1])
             timeoutDuration = daysDuration * 86400
-            if timeoutDuration > 1209600:
-                timeoutDuration = 1209600
+            if timeoutDuration > self.MAX_TIMEOUT_DURATION:
+                timeoutDuration = self.MAX_TIMEOUT_DURATION
 
-            nowTime = datetime.now()
-            nowFormatted = nowTime.strftime(self.mysqlFormat)
+            nowTime = utils.now()
             endTime = nowTime + timedelta(days=daysDuration)
-            endFormatted = endTime.strftime(self.mysqlFormat)
+            recentEndTime = nowTime + timedelta(seconds=timeoutDuration)
             with bot.users.find_context(splitMsg[0]) as badPerson:
                 if not badPerson:
                     bot.whisper(source.username, 'User "{}" doesn\'t exist in the database'.format(splitMsg[0]))
@@ -101,18 +171,20 @@ class LongTimeoutModule(BaseModule):
                     return False
 
                 with DBManager.create_session_scope() as session:
-                    if session.query(LongTimeout).filter(LongTimeout.username == badPerson.username).count() != 0:
+                    if session.query(LongTimeout).get(badPerson.username) is not None:
                         bot.whisper(source.username, "{} already exists in the database".format(badPerson.username))
                         return False
 
                     longtimeout = LongTimeout(
                         username=badPerson.username,
-                        timeout_start=nowFormatted,
-                        timeout_end=endFormatted,
+                        timeout_start=nowTime,
+                        timeout_end=endTime,
                         timeout_author=source.username,
+                        timeout_recent_end=recentEndTime,
                     )
 
                     session.add(longtimeout)
+                    self.schedule_timeout(badPerson.username, self.next_action_time(recentEndTime, endTime))
 
                     bot._timeout(
                         badPerson.username,
@@ -134,7 +206,7 @@ class LongTimeoutModule(BaseModule):
         source = options["source"]
 
         with DBManager.create_session_scope() as session:
-            timeoutList = session.query(LongTimeout).all()
+            timeoutList = session.query(LongTimeout).order_by(LongTimeout.timeout_end).all()
 
             if not timeoutList:
                 bot.whisper(source.username, "There are currently no long timeouts.")
@@ -171,6 +243,7 @@ class LongTimeoutModule(BaseModule):
                 ),
             )
             session.delete(remTimeout)
+            self.unschedule_timeout(remTimeout.username)
 
     def load_commands(self, **options):
         from pajbot.models.command import Command
@@ -220,8 +293,13 @@ class LongTimeoutModule(BaseModule):
 
     def enable(self, bot):
         if bot:
-            self.checkJob.resume()
+            self.running = True
+            ScheduleManager.execute_now(self.load_timeouts)
 
     def disable(self, bot):
         if bot:
-            self.checkJob.pause()
+            self.running = False
+            with self.heap_lock:
+                self.heap = []
+                self.due_times = {}
+                self.next_wake = None
@@ -2,10 +2,9 @@ import logging
 import re
 
 from pajbot.managers.handler import HandlerManager
-from pajbot.managers.redis import RedisManager
+from pajbot.managers.knownusers import KnownUsers
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
-from pajbot.streamhelper import StreamHelper
 
 log = logging.getLogger(__name__)
 
@@ -67,38 +66,26 @@ class MassPingProtectionModule(BaseModule):
     def __init__(self, bot):
         super().__init__(bot)
 
-    @staticmethod
-    def is_known_user(username):
-        streamer = StreamHelper.get_streamer()
-        return RedisManager.get().hexists("{streamer}:users:last_seen".format(streamer=streamer), username)
-
     @staticmethod
     def count_pings(message, source, emote_instances):
-        pings = set()
+        emote_spans = {(e.start, e.end) for e in emote_instances}
+        candidates = set()
 
         for match in username_in_message_pattern.finditer(message):
-            matched_part = match.group()
-            start_idx = match.start()
-            end_idx = match.end()
-
-            potential_emote = next((e for e in emote_instances if e.start == start_idx and e.end == end_idx), None)
             # this "username" is an emote. skip
-            if potential_emote is not None:
+            if (match.start(), match.end()) in emote_spans:
                 continue
 
-            matched_part = matched_part.lower()
+            matched_part = match.group().lower()
 
             # this is the sending user. We allow people to "ping" themselves
             if matched_part == source.username or matched_part == source.username_raw.lower():
                 continue
 
-            # check that this word is a known user (we have seen this username before)
-            if not MassPingProtectionModule.is_known_user(matched_part):
-                continue
-
-            pings.add(matched_part)
+            candidates.add(matched_part)
 
-        return len(pings)
+        # check that the words are known users (we have seen these usernames before)
+        return len(KnownUsers.filter_known(candidates))
 
     def determine_timeout_length(self, message, source, emote_instances):
         ping_count = MassPingProtectionModule.count_pings(message, source, emote_instances)
@@ -1,7 +1,5 @@
 import logging
 
-from numpy import random
-
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
 from pajbot.modules.base import BaseModule
@@ -192,6 +190,8 @@ class PointLotteryModule(BaseModule):
 
     @staticmethod
     def weighted_choice(choices):
+        from numpy import random
+
         total = sum(w for c, w in choices)
         r = random.uniform(0, total)
         upto = 0
@@ -4,6 +4,7 @@ import re
 from unidecode import unidecode
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
 
@@ -137,7 +138,7 @@ class PyramidModule(BaseModule):
             log.exception("Unhandled exception in pyramid parser")
 
     def enable(self, bot):
-        HandlerManager.add_handler("on_pubmsg", self.on_pubmsg)
+        HandlerManager.add_handler("on_pubmsg", self.on_pubmsg, criticality=HandlerCriticality.NORMAL)
 
     def disable(self, bot):
         HandlerManager.remove_handler("on_pubmsg", self.on_pubmsg)
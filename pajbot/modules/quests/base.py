@@ -2,6 +2,7 @@ import json
 import logging
 
 from pajbot.managers.redis import RedisManager
+from pajbot.models.pointslog import PointsLog
 from pajbot.modules.base import BaseModule
 from pajbot.streamhelper import StreamHelper
 
@@ -55,7 +56,8 @@ class BaseQuest(BaseModule):
         if reward_type == "tokens":
             user.tokens += reward_amount
         else:
-            user.points += reward_amount
+            with PointsLog.context("quest", self.ID):
+                user.points += reward_amount
 
         # Notify the user that they've finished today's quest
         message = "You finished todays quest! You have been awarded with {} {}.".format(reward_amount, reward_type)
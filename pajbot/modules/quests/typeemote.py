@@ -3,6 +3,7 @@ import logging
 import json
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.managers.redis import RedisManager
 from pajbot.models.emote import Emote
 from pajbot.modules.base import ModuleSetting
@@ -59,7 +60,7 @@ class TypeEmoteQuestModule(BaseQuest):
         self.set_user_progress(source.username, user_progress, redis=redis)
 
     def start_quest(self):
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.CRITICAL)
 
         redis = RedisManager.get()
 
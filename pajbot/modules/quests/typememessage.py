@@ -1,6 +1,7 @@
 import logging
 
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.managers.redis import RedisManager
 from pajbot.modules.base import ModuleSetting
 from pajbot.modules.quest import QuestModule
@@ -61,7 +62,7 @@ class TypeMeMessageQuestModule(BaseQuest):
         self.set_user_progress(source.username, user_progress, redis=redis)
 
     def start_quest(self):
-        HandlerManager.add_handler("on_message", self.on_message)
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.CRITICAL)
 
         redis = RedisManager.get()
 
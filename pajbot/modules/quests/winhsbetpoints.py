@@ -1,7 +1,5 @@
 import logging
 
-from numpy import random
-
 from pajbot.managers.handler import HandlerManager
 from pajbot.managers.redis import RedisManager
 from pajbot.modules.base import ModuleSetting
@@ -76,6 +74,8 @@ class WinHsBetPointsQuestModule(BaseQuest):
         self.LIMIT = self.hsbet_points_required
 
     def load_data(self, redis=None):
+        from numpy import random
+
         if redis is None:
             redis = RedisManager.get()
 
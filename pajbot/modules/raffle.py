@@ -1,11 +1,11 @@
 import logging
 import math
 
-from numpy import random
-
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.points import PointsLedger
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
+from pajbot.models.pointslog import PointsLog
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
 from pajbot.streamhelper import StreamHelper
@@ -292,6 +292,8 @@ class RaffleModule(BaseModule):
         self.raffle_users.append(source)
 
     def end_raffle(self):
+        from numpy import random
+
         if not self.raffle_running:
             return False
 
@@ -314,7 +316,8 @@ class RaffleModule(BaseModule):
             "The raffle has finished! {0} won {1} points! PogChamp".format(winner.username_raw, self.raffle_points)
         )
 
-        winner.points += self.raffle_points
+        with PointsLog.context("raffle", self.ID):
+            winner.points += self.raffle_points
 
         winner.save()
 
@@ -386,6 +389,8 @@ class RaffleModule(BaseModule):
         self.multi_start_raffle(points, length)
 
     def multi_end_raffle(self):
+        from numpy import random
+
         if not self.raffle_running:
             return False
 
@@ -452,12 +457,14 @@ class RaffleModule(BaseModule):
                 )
             )
 
+        delta = -points_per_user if negative else points_per_user
+        balances = PointsLedger.bulk_apply(
+            {winner.username: delta for winner in winners}, reason="multiraffle", module=self.ID
+        )
+        PointsLedger.refresh_users(winners, balances)
+
         winners_arr = []
         for winner in winners:
-            if negative:
-                winner.points = winner.points - points_per_user
-            else:
-                winner.points = winner.points + points_per_user
             winners_arr.append(winner)
 
             winners_str = generate_winner_list(winners_arr)
@@ -465,8 +472,6 @@ class RaffleModule(BaseModule):
                 self.bot.me("{} {} {} points each!".format(winners_str, "lost" if negative else "won", points_per_user))
                 winners_arr = []
 
-            winner.save()
-
         if len(winners_arr) > 0:
             winners_str = generate_winner_list(winners_arr)
             self.bot.me("{} {} {} points each!".format(winners_str, "lost" if negative else "won", points_per_user))
@@ -1,8 +1,6 @@
 import datetime
 import logging
 
-from numpy import random
-
 import pajbot.exc
 import pajbot.models
 from pajbot import utils
@@ -152,6 +150,8 @@ class RouletteModule(BaseModule):
         )
 
     def rigged_random_result(self):
+        from numpy import random
+
         return random.randint(1, 100) > self.settings["rigged_percentage"]
 
     def roulette(self, **options):
@@ -1,8 +1,6 @@
 import logging
 from collections import Counter
 
-from numpy import random
-
 import pajbot.exc
 import pajbot.models
 import pajbot.utils
@@ -18,6 +16,8 @@ log = logging.getLogger(__name__)
 
 # pull_lol returns the: (bet_return, emotes)
 def pull_lol(low_tier_emotes, high_tier_emotes, bet, house_edge, ltsw, htsw, ltbw, htbw):
+    from numpy import random
+
     slot_options = []
     for e in low_tier_emotes:
         slot_options += [e] * 3
@@ -45,10 +45,14 @@ class SubscriberFetchModule(BaseModule):
         # remove broadcaster from sub count
         self.bot.kvi["active_subs"].set(len(subscribers) - 1)
 
-        self.bot.users.reset_subs()
-        self.bot.users.update_subs(subscribers)
+        added, removed = self.bot.users.sync_subs(subscribers)
 
-        log.info("Successfully updated %s subscribers", len(subscribers))
+        log.info(
+            "Successfully updated %s subscribers (%s new, %s no longer subscribed)",
+            len(subscribers),
+            len(added),
+            len(removed),
+        )
 
     def enable(self, bot):
         # Web interface, nothing to do
@@ -1,12 +1,9 @@
 import logging
 
-from pajbot.managers.db import DBManager
-from pajbot.managers.redis import RedisManager
+from pajbot.managers.leaderboard import LeaderboardManager
 from pajbot.models.command import Command
-from pajbot.models.user import User
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
-from pajbot.streamhelper import StreamHelper
 from pajbot.utils import time_since
 
 log = logging.getLogger(__name__)
@@ -59,22 +56,11 @@ class TopModule(BaseModule):
     ]
 
     def top_chatters(self, **options):
-        """ TODO: use username_raw somehow """
         bot = options["bot"]
 
         data = []
-        redis = RedisManager.get()
-
-        for user in redis.zrevrangebyscore(
-            "{streamer}:users:num_lines".format(streamer=StreamHelper.get_streamer()),
-            "+inf",
-            "-inf",
-            start=0,
-            num=self.settings["num_top"],
-            withscores=True,
-            score_cast_func=int,
-        ):
-            data.append("{} ({})".format(user[0], user[1]))
+        for entry in LeaderboardManager.get("num_lines", self.settings["num_top"]):
+            data.append("{} ({})".format(entry["user"]["username_raw"], entry["value"]))
 
         bot.say("Top {num_top} chatters: {data}".format(num_top=self.settings["num_top"], data=", ".join(data)))
 
@@ -82,13 +68,13 @@ class TopModule(BaseModule):
         bot = options["bot"]
 
         data = []
-        with DBManager.create_session_scope() as db_session:
-            for user in db_session.query(User).order_by(User.minutes_in_chat_online.desc())[: self.settings["num_top"]]:
-                data.append(
-                    "{user.username_raw} ({time_spent})".format(
-                        user=user, time_spent=time_since(user.minutes_in_chat_online * 60, 0, time_format="short")
-                    )
+        for entry in LeaderboardManager.get("minutes_in_chat_online", self.settings["num_top"]):
+            data.append(
+                "{username_raw} ({time_spent})".format(
+                    username_raw=entry["user"]["username_raw"],
+                    time_spent=time_since(entry["value"] * 60, 0, time_format="short"),
                 )
+            )
 
         bot.say("Top {num_top} watchers: {data}".format(num_top=self.settings["num_top"], data=", ".join(data)))
 
@@ -96,15 +82,13 @@ class TopModule(BaseModule):
         bot = options["bot"]
 
         data = []
-        with DBManager.create_session_scope() as db_session:
-            for user in db_session.query(User).order_by(User.minutes_in_chat_offline.desc())[
-                : self.settings["num_top"]
-            ]:
-                data.append(
-                    "{user.username_raw} ({time_spent})".format(
-                        user=user, time_spent=time_since(user.minutes_in_chat_offline * 60, 0, time_format="short")
-                    )
+        for entry in LeaderboardManager.get("minutes_in_chat_offline", self.settings["num_top"]):
+            data.append(
+                "{username_raw} ({time_spent})".format(
+                    username_raw=entry["user"]["username_raw"],
+                    time_spent=time_since(entry["value"] * 60, 0, time_format="short"),
                 )
+            )
 
         bot.say("Top {num_top} offliners: {data}".format(num_top=self.settings["num_top"], data=", ".join(data)))
 
@@ -112,9 +96,8 @@ class TopModule(BaseModule):
         bot = options["bot"]
 
         data = []
-        with DBManager.create_session_scope() as db_session:
-            for user in db_session.query(User).order_by(User.points.desc())[: self.settings["num_top"]]:
-                data.append("{user.username_raw} ({user.points})".format(user=user))
+        for entry in LeaderboardManager.get("points", self.settings["num_top"]):
+            data.append("{} ({})".format(entry["user"]["username_raw"], entry["value"]))
 
         bot.say("Top {num_top} banks: {data}".format(num_top=self.settings["num_top"], data=", ".join(data)))
 
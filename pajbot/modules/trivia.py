@@ -1,17 +1,15 @@
-import datetime
 import logging
 import math
 import random
+import threading
 from collections import Counter
 
-import Levenshtein
-import requests
-from word2number import w2n
-
-from pajbot import utils
+from pajbot.apiwrappers.trivia import TriviaAPI
 from pajbot.managers.db import DBManager
 from pajbot.managers.handler import HandlerManager
+from pajbot.managers.loadgovernor import HandlerCriticality
 from pajbot.managers.schedule import ScheduleManager
+from pajbot.managers.schedule import ScheduledJob
 from pajbot.models.command import Command
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
@@ -62,22 +60,29 @@ class TriviaModule(BaseModule):
         ),
     ]
 
+    # Minimum number of seconds between two questions
+    MIN_QUESTION_DELAY = 11
+
     def __init__(self, bot):
         super().__init__(bot)
 
-        self.job = ScheduleManager.execute_every(1, self.poll_trivia)
-        self.job.pause()
-        self.checkjob = ScheduleManager.execute_every(10, self.check_run)
-        self.checkjob.pause()
+        self.api = TriviaAPI()
+
+        # The trivia is a state machine driven by a single pending transition (asking a question, or giving the next
+        # hint). Replacing the transition bumps the generation, so a transition that was already running when it was
+        # replaced doesn't apply its result
+        self.lock = threading.Lock()
+        self.transition_job = ScheduledJob(None)
+        self.generation = 0
+
+        # Whether the trivia is started when the stream goes offline
         self.checkPaused = True
 
         self.jservice = False
         self.trivia_running = False
         self.manualStart = False
-        self.last_question = None
         self.question = None
         self.step = 0
-        self.last_step = None
         self.streptocuckus = 0
         self.correct_dict = {}
 
@@ -125,10 +130,11 @@ class TriviaModule(BaseModule):
         self.min_streak = 3  # minimum correct answers for a streak
         self.point_bounty = 0
 
-    def format_answer(self):
+    @staticmethod
+    def format_answer(question):
         # Fixme, Ug Th Fa Au Hy Ne
-        self.question["answer"] = (
-            self.question["answer"]
+        question["answer"] = (
+            question["answer"]
             .replace("<i>", "")
             .replace("</i>", "")
             .replace("\\", "")
@@ -139,113 +145,130 @@ class TriviaModule(BaseModule):
             .replace("&", "and")
         )
 
-        self.question["answer"] = self.question["answer"].strip('"').strip(".")
+        question["answer"] = question["answer"].strip('"').strip(".")
 
-        if self.question["answer"].lower().startswith("a "):
-            self.question["answer"] = self.question["answer"][2:]
+        if question["answer"].lower().startswith("a "):
+            question["answer"] = question["answer"][2:]
 
-        elif self.question["answer"].lower().startswith("an "):
-            self.question["answer"] = self.question["answer"][3:]
+        elif question["answer"].lower().startswith("an "):
+            question["answer"] = question["answer"][3:]
 
-        if self.question["answer"].lower().startswith("the "):
-            self.question["answer"] = self.question["answer"][4:]
+        if question["answer"].lower().startswith("the "):
+            question["answer"] = question["answer"][4:]
 
-        self.question["answer"] = self.question["answer"].strip()
+        question["answer"] = question["answer"].strip()
 
-        for qWord in self.question["answer"].split(" "):
+        from word2number import w2n
+
+        for qWord in question["answer"].split(" "):
             try:
                 qReplacement = w2n.word_to_num(qWord.lower())
                 if qReplacement >= 1000000:
                     continue
 
-                self.question["answer"] = self.question["answer"].replace(qWord, str(qReplacement))
+                question["answer"] = question["answer"].replace(qWord, str(qReplacement))
             except:
                 pass
 
-    def check_question(self):
+    def check_question(self, question):
+        """Returns whether the given question can be asked, and cleans it up if it can"""
         if (
-            self.question["question"] not in self.recent_questions
-            and self.question["answer"]
-            and self.question["question"]
-            and not self.bot.is_bad_message(self.question["question"])
-            and not self.bot.is_bad_message(self.question["answer"])
-            and not any(b in self.question["answer"] for b in self.bad_phrases)
+            question["question"] not in self.recent_questions
+            and question["answer"]
+            and question["question"]
+            and not self.bot.is_bad_message(question["question"])
+            and not self.bot.is_bad_message(question["answer"])
+            and not any(b in question["answer"] for b in self.bad_phrases)
         ):
-            self.format_answer()
+            self.format_answer(question)
             try:
-                self.question["category"] = self.question["category"].replace("_", " ")
-                self.question["category"] = self.question["category"][0].upper() + self.question["category"][1:]
+                question["category"] = question["category"].replace("_", " ")
+                question["category"] = question["category"][0].upper() + question["category"][1:]
 
             except KeyError:
-                self.question["category"] = self.question["categories"][0].replace("_", " ")
-            self.recent_questions.append(self.question["question"])
-
-            self.new_question = True
+                question["category"] = question["categories"][0].replace("_", " ")
+            self.recent_questions.append(question["question"])
 
-    def poll_trivia(self):
-        if not self.trivia_running:
-            return False
-        # Check if new question needed
-        if self.question is None and (
-            self.last_question is None or (utils.now() - self.last_question) >= datetime.timedelta(seconds=11)
-        ):
+            # Remove oldest question
+            if len(self.recent_questions) > self.q_memory:
+                del self.recent_questions[0]
 
-            # GET TRIVIA QUESTION
+            return True
 
-            self.new_question = False
-            while not self.new_question:
-                if self.jservice:
-                    # Load from jservice database
-                    r = requests.get("http://jservice.io/api/random")
-                    self.question = r.json()[0]
-                    self.check_question()
+        return False
 
+    def fetch_question(self):
+        while True:
+            if self.jservice:
+                # Load from jservice database
+                question = self.api.get_jservice_question()
+            else:
+                # Load from gazatu and RTD
+                chosenInt = random.randint(0, 10)
+                if chosenInt <= 5:
+                    question = self.api.get_rtd_question()
+                    question["category"] = question["categories"][0]
                 else:
-                    # Load from gazatu and RTD
-                    chosenInt = random.randint(0, 10)
-                    if chosenInt <= 5:
-                        r = requests.get("http://159.203.60.127/questions?limit=1")
-                        self.question = r.json()
-                        self.question["category"] = self.question["categories"][0]
-                        self.check_question()
-                    else:
-                        self.gazatuService = True
-                        r = requests.get(
-                            "https://api.gazatu.xyz/trivia/questions?count=1&include=[{}]".format(
-                                ",".join(self.gazCategories)
-                            )
-                        )
-                        resjson = r.json()[0]
-                        if resjson["disabled"]:
-                            self.question = None
-                            continue
-                        self.question = resjson
-                        self.check_question()
+                    question = self.api.get_gazatu_question(self.gazCategories)
+                    if question["disabled"]:
+                        continue
+
+            if self.check_question(question):
+                return question
+
+    def schedule_transition(self, delay, transition):
+        """Replaces the pending transition, must be called with self.lock held"""
+        self.transition_job.cancel()
+        self.generation += 1
+        self.transition_job = ScheduleManager.execute_delayed(
+            delay, self.run_transition, args=[self.generation, transition]
+        )
 
-            # Remove oldest question
-            if len(self.recent_questions) > self.q_memory:
-                del self.recent_questions[0]
+    def cancel_transition(self):
+        """Must be called with self.lock held"""
+        self.transition_job.cancel()
+        self.generation += 1
 
-            self.step = 0
-            self.last_step = None
+    def next_question_delay(self):
+        return max(self.MIN_QUESTION_DELAY, self.settings["question_delay"])
 
-        # Is it time for the next step?
-        condition = self.last_question is None or utils.now() - self.last_question >= datetime.timedelta(
-            seconds=self.settings["question_delay"]
-        )
-        if (self.last_step is None and condition) or (
-            self.last_step is not None
-            and utils.now() - self.last_step >= datetime.timedelta(seconds=self.settings["step_delay"])
-        ):
-            self.last_step = utils.now()
-            self.step += 1
+    def run_transition(self, generation, transition):
+        try:
+            transition(generation)
+        except:
+            log.exception("Unhandled exception in trivia transition, asking a new question")
+            with self.lock:
+                if generation == self.generation and self.trivia_running:
+                    self.question = None
+                    self.schedule_transition(self.next_question_delay(), self.ask_question)
+
+    def ask_question(self, generation):
+        # fetched without holding the lock, so answers in chat aren't held up by the request
+        question = self.fetch_question()
+
+        with self.lock:
+            if generation != self.generation or not self.trivia_running:
+                return
+
+            self.question = question
+            self.step = 1
+            if self.step_announce():
+                self.schedule_transition(self.settings["step_delay"], self.next_hint)
+            else:
+                self.schedule_transition(0, self.ask_question)
 
-            if self.step == 1:
-                self.step_announce()
-            elif self.step < self.settings["hint_count"] + 2:
+    def next_hint(self, generation):
+        with self.lock:
+            if generation != self.generation or not self.trivia_running:
+                return
+
+            self.step += 1
+            if self.step < self.settings["hint_count"] + 2:
                 self.step_hint()
+                self.schedule_transition(self.settings["step_delay"], self.next_hint)
             else:
                 self.step_end()
+                self.schedule_transition(self.next_question_delay(), self.ask_question)
 
     def step_announce(self):
         try:
@@ -261,10 +284,11 @@ class TriviaModule(BaseModule):
                         self.question
                     )
                 )
+            return True
         except:
             self.step = 0
             self.question = None
-            pass
+            return False
 
     def step_hint(self):
         # find out what % of the answer should be revealed
@@ -307,29 +331,25 @@ class TriviaModule(BaseModule):
             )
             self.question = None
             self.step = 0
-            self.last_question = utils.now()
             with DBManager.create_session_scope() as db_session:
                 user = self.bot.users.find("datguy1", db_session=db_session)
                 user.points += 1
 
-    def check_run(self):
-        if self.bot.is_online:
-            if self.trivia_running and not self.manualStart:
-                log.debug("Stopping trivia")
-                self.stop_trivia(True)
-        else:
-            if not self.trivia_running:
-                log.debug("Starting trivia")
-                self.start_trivia()
-                self.manualStart = False
+    def on_stream_start(self, **rest):
+        if self.trivia_running and not self.manualStart:
+            log.debug("Stopping trivia")
+            self.stop_trivia(True)
+
+    def on_stream_stop(self, **rest):
+        if not self.trivia_running:
+            log.debug("Starting trivia")
+            self.start_trivia()
+            self.manualStart = False
 
     def start_trivia(self, message=None):
         if self.checkPaused and not self.manualStart:
             return
 
-        self.trivia_running = True
-        self.job.resume()
-
         try:
             self.point_bounty = int(message)
             if self.point_bounty < 0:
@@ -342,24 +362,31 @@ class TriviaModule(BaseModule):
         else:
             self.bot.safe_me("The trivia has started!")
 
-        HandlerManager.add_handler("on_message", self.on_message)
+        with self.lock:
+            self.trivia_running = True
+            self.question = None
+            self.schedule_transition(self.settings["question_delay"], self.ask_question)
+
+        HandlerManager.add_handler("on_message", self.on_message, criticality=HandlerCriticality.CRITICAL)
 
     def stop_trivia(self, endStep=False):
-        self.job.pause()
+        with self.lock:
+            self.cancel_transition()
 
-        if self.trivia_running:
-            stopOutput = "The trivia has been stopped. The top five participants are: "
-            c = Counter(self.correct_dict)
-            for player, correct in c.most_common(5):
-                stopOutput += "{}, with {} correct guesses. ".format(player, correct)
+            if self.trivia_running:
+                stopOutput = "The trivia has been stopped. The top five participants are: "
+                c = Counter(self.correct_dict)
+                for player, correct in c.most_common(5):
+                    stopOutput += "{}, with {} correct guesses. ".format(player, correct)
 
-            self.bot.safe_me(stopOutput)
+                self.bot.safe_me(stopOutput)
 
-        if endStep:
-            self.step_end()
+            if endStep:
+                self.step_end()
 
-        self.trivia_running = False
-        self.correct_dict = {}
+            self.trivia_running = False
+            self.question = None
+            self.correct_dict = {}
 
         HandlerManager.remove_handler("on_message", self.on_message)
 
@@ -375,7 +402,6 @@ class TriviaModule(BaseModule):
         self.manualStart = True
         self.start_trivia(message)
         self.checkPaused = False
-        self.checkjob.resume()
 
     def command_stop(self, **options):
         bot = options["bot"]
@@ -387,27 +413,33 @@ class TriviaModule(BaseModule):
 
         self.stop_trivia(True)
         self.checkPaused = True
-        self.checkjob.pause()
 
     def command_skip(self, **options):
-        if self.question is None:
-            options["bot"].say("There is currently no question.")
-        else:
-            self.question = None
-            self.step = 0
-            self.last_question = None
+        with self.lock:
+            if self.question is None:
+                options["bot"].say("There is currently no question.")
+            else:
+                self.question = None
+                self.step = 0
+                self.schedule_transition(0, self.ask_question)
 
     def on_message(self, source, message, whisper, **rest):
-        sendMessage = ""
         if message is None or whisper or source.ignored:
             return
 
+        with self.lock:
+            self.check_answer(source, message)
+
+    def check_answer(self, source, message):
+        sendMessage = ""
         if self.question:
             right_answer = self.question["answer"].lower()
             user_answer = message.lower()
             if len(right_answer) <= 5:
                 correct = right_answer == user_answer
             else:
+                import Levenshtein
+
                 ratio = Levenshtein.ratio(right_answer, user_answer)
                 correct = ratio >= 0.86
 
@@ -424,7 +456,7 @@ class TriviaModule(BaseModule):
 
                 self.question = None
                 self.step = 0
-                self.last_question = utils.now()
+                self.schedule_transition(self.next_question_delay(), self.ask_question)
                 self.correct_dict[source.username_raw] = self.correct_dict.get(source.username_raw, 0) + 1
 
                 if "strep" in source.username_raw:
@@ -472,11 +504,29 @@ class TriviaModule(BaseModule):
         )
 
     def enable(self, bot):
-        self.checkjob.resume()
+        if not bot:
+            return
+
         self.checkPaused = False
         HandlerManager.add_handler("on_quit", self.stop_trivia)
+        HandlerManager.add_handler("on_stream_start", self.on_stream_start)
+        HandlerManager.add_handler("on_stream_stop", self.on_stream_stop)
+
+        # The bot can't send messages until it has finished starting up, so this waits for the reactor to run
+        bot.execute_now(self.start_if_offline)
+
+    def start_if_offline(self):
+        if not self.bot.is_online:
+            self.on_stream_stop()
 
     def disable(self, bot):
-        self.checkjob.pause()
+        if not bot:
+            return
+
         self.checkPaused = True
         HandlerManager.remove_handler("on_quit", self.stop_trivia)
+        HandlerManager.remove_handler("on_stream_start", self.on_stream_start)
+        HandlerManager.remove_handler("on_stream_stop", self.on_stream_stop)
+
+        if self.trivia_running:
+            self.stop_trivia()
@@ -1,12 +1,14 @@
 import logging
 
 from pajbot.managers.db import DBManager
+from pajbot.managers.points import PointsLedger
 from pajbot.managers.redis import RedisManager
-from pajbot.managers.user import UserManager
 from pajbot.models.command import Command
 from pajbot.models.command import CommandExample
+from pajbot.models.user import User
 from pajbot.modules import BaseModule
 from pajbot.modules import ModuleSetting
+from pajbot.streamhelper import StreamHelper
 
 log = logging.getLogger(__name__)
 
@@ -28,6 +30,9 @@ class MassPointsModule(BaseModule):
         )
     ]
 
+    # Number of chatters given points at once
+    BATCH_SIZE = 1000
+
     def __init__(self, bot):
         super().__init__(bot)
 
@@ -36,6 +41,7 @@ class MassPointsModule(BaseModule):
             self.command_masspoints,
             level=500,
             description="Give a specific number of points to everyone watching the stream",
+            run_in_thread=True,
             examples=[
                 CommandExample(
                     None,
@@ -46,6 +52,37 @@ class MassPointsModule(BaseModule):
             ],
         )
 
+    def give_points(self, chatters, givePoints):
+        """Gives points to the chatters who aren't bots/idlers, and returns how many of them got points"""
+        # Bot/idler check
+        num_lines_key = "{streamer}:users:num_lines".format(streamer=StreamHelper.get_streamer())
+        with RedisManager.get().pipeline() as pipeline:
+            for userName in chatters:
+                pipeline.zscore(num_lines_key, userName)
+            numLines = pipeline.execute()
+        chatters = [userName for userName, lines in zip(chatters, numLines) if lines is not None and lines >= 5]
+        if not chatters:
+            return 0
+
+        with DBManager.create_session_scope() as db_session:
+            subscribers = {
+                userName
+                for (userName,) in db_session.query(User.username).filter(
+                    User.username.in_(chatters), User.subscriber.is_(True)
+                )
+            }
+
+        PointsLedger.bulk_apply(
+            {
+                userName: givePoints * self.settings["sub_points"] if userName in subscribers else givePoints
+                for userName in chatters
+            },
+            reason="masspoints",
+            module=self.ID,
+        )
+
+        return len(chatters)
+
     def command_masspoints(self, **options):
         bot = options["bot"]
         source = options["source"]
@@ -63,31 +100,16 @@ class MassPointsModule(BaseModule):
             bot.whisper(source.username_raw, "Error: You must give an integer")
             return False
 
-        currentChatters = bot.twitch_tmi_api.get_chatters(bot.streamer)
-        numUsers = len(currentChatters)
-        if not currentChatters:
-            bot.say("Error fetching chatters")
+        numUsers = 0
+        try:
+            # The chatters are processed in batches while they're being downloaded
+            for _, chatters in bot.twitch_tmi_api.iter_chatters(bot.streamer, batch_size=self.BATCH_SIZE):
+                numUsers += self.give_points(chatters, givePoints)
+        except:
+            log.exception("Error fetching chatters")
+            bot.say("Error fetching chatters ({} viewers were given points)".format(numUsers))
             return False
 
-        with RedisManager.pipeline_context() as pipeline:
-            with DBManager.create_session_scope() as db_session:
-                userModels = UserManager.get().bulk_load_user_models(currentChatters, db_session)
-                for userName in currentChatters:
-                    userModel = userModels.get(userName, None)
-                    userInstance = UserManager.get().get_user(
-                        userName, db_session=db_session, user_model=userModel, redis=pipeline
-                    )
-
-                    # Bot/idler check. Quicker than removing from list?
-                    if userInstance.num_lines < 5:
-                        numUsers -= 1
-                        continue
-
-                    if userInstance.subscriber:
-                        userInstance.points += givePoints * self.settings["sub_points"]
-                    else:
-                        userInstance.points += givePoints
-
         bot.say(
             "{} just gave {} viewers {} points each! Enjoy FeelsGoodMan".format(
                 source.username_raw, numUsers, givePoints
@@ -0,0 +1,117 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+
+class StartupStep:
+    def __init__(self, name, function, depends_on):
+        self.name = name
+        self.function = function
+        self.depends_on = depends_on
+
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+
+    def run(self):
+        self.started_at = time.perf_counter()
+        try:
+            self.result = self.function()
+        finally:
+            self.finished_at = time.perf_counter()
+
+        return self.result
+
+
+class StartupOrchestrator:
+    """
+    Runs independent startup steps concurrently, while respecting their declared dependencies,
+    and keeps track of when each step started and finished so a startup timeline can be printed.
+
+    Steps run in worker threads, so they should only touch state that isn't shared with other steps
+    running at the same time.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.started_at = time.perf_counter()
+        self.pending_steps = []
+        self.finished_steps = []
+
+    def add_step(self, name, function, depends_on=[]):
+        known_steps = {step.name for step in self.pending_steps + self.finished_steps}
+        for dependency in depends_on:
+            if dependency not in known_steps:
+                raise ValueError("Startup step {} depends on unknown step {}".format(name, dependency))
+
+        self.pending_steps.append(StartupStep(name, function, depends_on))
+
+    def run(self):
+        """Runs all steps added since the last call to run, and blocks until they are finished.
+        Returns a dictionary mapping step name to the value returned by the step.
+        If a step raises an exception, no more steps are started and the exception is re-raised."""
+        steps = self.pending_steps
+        self.pending_steps = []
+
+        done = {step.name for step in self.finished_steps}
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="StartupThread") as executor:
+            while steps or running:
+                if error is None:
+                    for step in [step for step in steps if all(dep in done for dep in step.depends_on)]:
+                        steps.remove(step)
+                        running[executor.submit(step.run)] = step
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    self.finished_steps.append(step)
+                    if future.exception() is not None:
+                        log.error("Startup step %s failed", step.name)
+                        error = error or future.exception()
+                    else:
+                        done.add(step.name)
+
+        if error is not None:
+            raise error
+
+        return {step.name: step.result for step in self.finished_steps}
+
+    @contextmanager
+    def measure(self, name):
+        """Measures a step that runs synchronously on the calling thread, so it shows up in the timeline"""
+        step = StartupStep(name, None, [])
+        step.started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            step.finished_at = time.perf_counter()
+            self.finished_steps.append(step)
+
+    def timeline(self):
+        lines = []
+        for step in sorted(self.finished_steps, key=lambda step: step.started_at):
+            lines.append(
+                "{:<24} {:>8.0f} ms -> {:>8.0f} ms ({:.0f} ms)".format(
+                    step.name,
+                    (step.started_at - self.started_at) * 1000.0,
+                    (step.finished_at - self.started_at) * 1000.0,
+                    (step.finished_at - step.started_at) * 1000.0,
+                )
+            )
+
+        return lines
+
+    def log_timeline(self):
+        total = (time.perf_counter() - self.started_at) * 1000.0
+        log.info("Startup finished in %.0f ms:\n%s", total, "\n".join(self.timeline()))
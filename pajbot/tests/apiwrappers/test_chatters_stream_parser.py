@@ -0,0 +1,35 @@
+import pytest
+
+from pajbot.apiwrappers.twitch.tmi import ChattersStreamParser
+
+DOCUMENT = (
+    '{"_links": {}, "chatter_count": 4, "chatters": {"broadcaster": ["pajlada"], "vips": [], '
+    '"moderators": ["pajbot", "mod_\\u0061"], "viewers": ["viewer1"]}}'
+)
+
+EXPECTED = [("broadcaster", "pajlada"), ("moderators", "pajbot"), ("moderators", "mod_a"), ("viewers", "viewer1")]
+
+
+def parse_in_chunks(chunk_size):
+    parser = ChattersStreamParser()
+    chatters = []
+    for i in range(0, len(DOCUMENT), chunk_size):
+        chatters.extend(parser.feed(DOCUMENT[i : i + chunk_size]))
+    chatters.extend(parser.feed("", final=True))
+    return chatters
+
+
+def test_parses_whole_document():
+    assert parse_in_chunks(len(DOCUMENT)) == EXPECTED
+
+
+def test_parses_any_chunk_size():
+    for chunk_size in range(1, 20):
+        assert parse_in_chunks(chunk_size) == EXPECTED
+
+
+def test_rejects_incomplete_document():
+    parser = ChattersStreamParser()
+    parser.feed(DOCUMENT[:-1])
+    with pytest.raises(ValueError):
+        parser.feed("", final=True)
@@ -0,0 +1,55 @@
+from pajbot.apiwrappers.base import BaseAPI
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, data=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def request(self, method, url, params=None, headers=None, **rest):
+        self.requests.append((url, params, headers))
+        return self.responses.pop(0)
+
+
+def test_sends_validators_of_previous_response():
+    api = BaseAPI(base_url="https://example.com/")
+    api.session = FakeSession(
+        [
+            FakeResponse(200, {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, {"games": [1]}),
+            FakeResponse(304),
+            FakeResponse(200, {"ETag": '"v2"'}, {"games": [2, 1]}),
+        ]
+    )
+
+    assert api.get_if_modified("history", params={"user": "a"}) == {"games": [1]}
+    assert api.session.requests[0][2] == {}
+
+    assert api.get_if_modified("history", params={"user": "a"}) is None
+    assert api.session.requests[1][2] == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+
+    # a 304 response keeps the previous validators
+    assert api.get_if_modified("history", params={"user": "a"}) == {"games": [2, 1]}
+    assert api.session.requests[2][2]["If-None-Match"] == '"v1"'
+
+
+def test_validators_are_per_url_and_params():
+    api = BaseAPI(base_url="https://example.com/")
+    api.session = FakeSession([FakeResponse(200, {"ETag": '"v1"'}, {}), FakeResponse(200, {}, {})])
+
+    api.get_if_modified("history", params={"user": "a"})
+    api.get_if_modified("history", params={"user": "b"})
+
+    assert api.session.requests[1][2] == {}
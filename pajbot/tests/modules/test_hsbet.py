@@ -0,0 +1,102 @@
+import datetime
+
+import pytest
+
+from pajbot.managers.redis import RedisManager
+from pajbot.managers.schedule import ScheduleManager
+from pajbot.managers.schedule import ScheduledJob
+from pajbot.modules.hsbet import HSBetModule
+from pajbot.streamhelper import StreamHelper
+
+NOW = datetime.datetime(2019, 10, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+class MockRedis:
+    def get(self, key):
+        return None
+
+
+class MockBot:
+    def __init__(self):
+        self.messages = []
+
+    def me(self, message):
+        self.messages.append(message)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    scheduled = []
+
+    def execute_delayed(delay, method, args=[], kwargs={}, scheduler=None):
+        scheduled.append((delay, args))
+        return ScheduledJob(None)
+
+    monkeypatch.setattr(ScheduleManager, "execute_delayed", execute_delayed)
+    return scheduled
+
+
+@pytest.fixture
+def module(monkeypatch, scheduled):
+    monkeypatch.setattr(RedisManager, "get", lambda: MockRedis())
+    monkeypatch.setattr(StreamHelper, "get_streamer", lambda: "pajlada")
+    monkeypatch.setattr("pajbot.modules.hsbet.utils.now", lambda: NOW)
+
+    module = HSBetModule(MockBot())
+    module.last_game_start = NOW + datetime.timedelta(seconds=25)
+    return module
+
+
+def test_next_reminder():
+    assert HSBetModule.next_reminder(60) == 50
+    assert HSBetModule.next_reminder(25) == 20
+    assert HSBetModule.next_reminder(20) == 10
+    assert HSBetModule.next_reminder(10.5) == 10
+    assert HSBetModule.next_reminder(10) == 5
+    assert HSBetModule.next_reminder(5) == 0
+    assert HSBetModule.next_reminder(0.5) == 0
+    assert HSBetModule.next_reminder(0) is None
+    assert HSBetModule.next_reminder(-3) is None
+
+
+def test_schedule_reminder(module, scheduled):
+    module.schedule_reminder()
+
+    assert scheduled == [(5, [module.reminder_generation, 20])]
+
+
+def test_schedule_reminder_betting_closed(module, scheduled):
+    module.last_game_start = NOW - datetime.timedelta(seconds=1)
+    module.schedule_reminder()
+
+    assert scheduled == []
+
+
+def test_reminder_bet_schedules_next_reminder(module, scheduled):
+    module.schedule_reminder()
+    module.reminder_bet(module.reminder_generation, 20)
+
+    assert len(module.bot.messages) == 1
+    assert scheduled[-1] == (15, [module.reminder_generation, 10])
+
+
+def test_reminder_bet_skips_replaced_reminders(module, scheduled):
+    module.schedule_reminder()
+    generation = module.reminder_generation
+    module.schedule_reminder()
+
+    module.reminder_bet(generation, 20)
+
+    assert module.bot.messages == []
+    assert len(scheduled) == 2
+
+
+def test_reminder_bet_skips_cancelled_reminders(module, scheduled):
+    module.schedule_reminder()
+    generation = module.reminder_generation
+    module.cancel_reminder()
+
+    module.reminder_bet(generation, 20)
+
+    assert module.bot.messages == []
+    assert len(scheduled) == 1
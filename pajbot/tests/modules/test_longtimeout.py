@@ -0,0 +1,132 @@
+import datetime
+from contextlib import contextmanager
+
+import pytest
+
+from pajbot.managers.db import DBManager
+from pajbot.managers.schedule import ScheduleManager
+from pajbot.managers.schedule import ScheduledJob
+from pajbot.models.longtimeout import LongTimeout
+from pajbot.modules.longtimeout import LongTimeoutModule
+
+NOW = datetime.datetime(2019, 10, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def after(seconds):
+    return NOW + datetime.timedelta(seconds=seconds)
+
+
+class MockBot:
+    def __init__(self):
+        self.whispers = []
+        self.timeouts = []
+
+    def whisper(self, username, message):
+        self.whispers.append((username, message))
+
+    def _timeout(self, username, duration, reason=""):
+        self.timeouts.append((username, duration))
+
+
+class MockQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criterion):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+class MockSession:
+    """Only holds the long timeouts that are due, since the module only queries those"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.deleted = []
+
+    def query(self, *entities):
+        return MockQuery(self.rows)
+
+    def delete(self, row):
+        self.deleted.append(row)
+
+    def add(self, row):
+        pass
+
+
+@pytest.fixture
+def wakes(monkeypatch):
+    wakes = []
+
+    def execute_delayed(delay, method, args=[], kwargs={}, scheduler=None):
+        wakes.append(delay)
+        return ScheduledJob(None)
+
+    monkeypatch.setattr(ScheduleManager, "execute_delayed", execute_delayed)
+    monkeypatch.setattr("pajbot.modules.longtimeout.utils.now", lambda: NOW)
+    return wakes
+
+
+@pytest.fixture
+def module(wakes):
+    module = LongTimeoutModule(MockBot())
+    module.running = True
+    return module
+
+
+def use_session(monkeypatch, session):
+    @contextmanager
+    def create_session_scope(**options):
+        yield session
+
+    monkeypatch.setattr(DBManager, "create_session_scope", create_session_scope)
+
+
+def test_wakes_up_for_the_earliest_timeout(module, wakes):
+    module.schedule_timeout("a", after(60))
+    module.schedule_timeout("b", after(120))
+    module.schedule_timeout("c", after(30))
+
+    assert wakes == [60, 30]
+    assert module.next_wake == after(30)
+
+
+def test_skips_outdated_heap_entries(module, wakes):
+    module.schedule_timeout("a", after(30))
+    module.schedule_timeout("b", after(60))
+    module.unschedule_timeout("a")
+    module.schedule_timeout("b", after(90))
+
+    module.next_wake = None
+    with module.heap_lock:
+        module._schedule_wake_locked()
+
+    assert module.heap == [(after(90), "b")]
+    assert wakes[-1] == 90
+
+
+def test_does_not_wake_up_while_disabled(module, wakes):
+    module.running = False
+    module.schedule_timeout("a", after(30))
+
+    assert wakes == []
+
+
+def test_check_retimeout(module, wakes, monkeypatch):
+    ongoing = LongTimeout("ongoing", after(-86400 * 14), after(86400 * 20), "mod", timeout_recent_end=NOW)
+    ended = LongTimeout("ended", after(-86400 * 7), NOW, "mod", timeout_recent_end=NOW)
+    session = MockSession([ongoing, ended])
+    use_session(monkeypatch, session)
+
+    module.schedule_timeout("ongoing", NOW)
+    module.schedule_timeout("ended", NOW)
+    module.schedule_timeout("later", after(3600))
+    module.check_retimeout()
+
+    assert module.bot.timeouts == [("ongoing", LongTimeoutModule.MAX_TIMEOUT_DURATION)]
+    assert session.deleted == [ended]
+    assert ongoing.timeout_recent_end == after(LongTimeoutModule.MAX_TIMEOUT_DURATION)
+    assert module.due_times == {"ongoing": after(LongTimeoutModule.MAX_TIMEOUT_DURATION), "later": after(3600)}
+    assert module.next_wake == after(3600)
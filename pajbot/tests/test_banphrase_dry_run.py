@@ -0,0 +1,78 @@
+import pytest
+
+from pajbot.managers.chathistory import ChatHistoryEntry
+from pajbot.models.banphrase import Banphrase, BanphraseManager
+
+# BanphraseData's relationships refer to User, so its mapper has to be registered
+from pajbot.models.user import User  # noqa: F401
+
+
+def make_entries(messages):
+    return [ChatHistoryEntry(i, "user{}".format(i % 3), None, message) for i, message in enumerate(messages)]
+
+
+def test_dry_run():
+    entries = make_entries(["hello", "Forsen LUL", "nothing", "forsen", "forsenE"])
+    result = BanphraseManager.dry_run("forsen", entries, max_samples=2)
+
+    assert result["num_messages"] == 5
+    assert result["num_matches"] == 3
+    assert result["num_users"] == 2
+    assert [sample["message"] for sample in result["samples"]] == ["forsen", "forsenE"]
+
+
+def test_dry_run_options():
+    entries = make_entries(["hello", "Forsen LUL", "forsen"])
+
+    assert BanphraseManager.dry_run("forsen", entries, case_sensitive=True)["num_matches"] == 1
+    assert BanphraseManager.dry_run("forsen", entries, operator="exact")["num_matches"] == 1
+    assert BanphraseManager.dry_run(r"^for\w+ lul$", entries, operator="regex")["num_matches"] == 1
+
+
+def test_dry_run_invalid():
+    with pytest.raises(ValueError):
+        BanphraseManager.dry_run("forsen", [], operator="nonexistent")
+
+    with pytest.raises(ValueError):
+        BanphraseManager.dry_run("(", [], operator="regex")
+
+
+def test_dry_run_parallel(monkeypatch):
+    monkeypatch.setattr(BanphraseManager, "DRY_RUN_REGEX_PARALLEL_THRESHOLD", 10)
+    entries = make_entries(["message {}".format(i) for i in range(100)])
+
+    result = BanphraseManager.dry_run(r"message \d*7$", entries, operator="regex", max_samples=3)
+
+    assert result["num_matches"] == 10
+    assert [sample["message"] for sample in result["samples"]] == ["message 77", "message 87", "message 97"]
+
+
+def test_dry_run_lints_regex():
+    with pytest.raises(ValueError):
+        BanphraseManager.dry_run(r"(a+)+$", [], operator="regex")
+
+
+def test_dry_run_no_samples():
+    entries = make_entries(["forsen", "forsen"])
+    result = BanphraseManager.dry_run("forsen", entries, max_samples=0)
+
+    assert result["num_matches"] == 2
+    assert result["samples"] == []
+
+
+def test_dry_run_not_parallel(monkeypatch):
+    monkeypatch.setattr(BanphraseManager, "DRY_RUN_REGEX_PARALLEL_THRESHOLD", 10)
+    monkeypatch.setattr(BanphraseManager, "_dry_run_parallel", None)
+    entries = make_entries(["message {}".format(i) for i in range(100)])
+
+    result = BanphraseManager.dry_run(r"message \d*7$", entries, operator="regex", parallel=False)
+
+    assert result["num_matches"] == 10
+
+
+def test_dry_run_slow_regex(monkeypatch):
+    monkeypatch.setattr(Banphrase, "REGEX_TIMEOUT", 0)
+    entries = make_entries(["message {}".format(i) for i in range(100)])
+
+    with pytest.raises(ValueError):
+        BanphraseManager.dry_run(r"message \d+", entries, operator="regex", parallel=False)
@@ -0,0 +1,53 @@
+from pajbot.models.banphrase import Banphrase
+from pajbot.models.banphrase import BanphraseManager
+
+# BanphraseData's relationships refer to User, so its mapper has to be registered
+from pajbot.models.user import User  # noqa: F401
+
+
+class FakeBanphraseManager(BanphraseManager):
+    def __init__(self, banphrases):
+        self.bot = None
+        self.banphrases = banphrases
+        self.enabled_banphrases = list(banphrases)
+
+
+def test_lint_regex():
+    assert Banphrase.lint_regex(r"^forsen\w*$") is None
+    assert Banphrase.lint_regex(r"(") is not None
+    assert Banphrase.lint_regex(r"(\w+\s?)+$") is not None
+
+
+def test_slow_regex_is_disabled(monkeypatch):
+    monkeypatch.setattr(Banphrase, "REGEX_TIMEOUT", 0.01)
+
+    # overlapping alternatives aren't caught by the lint, but still backtrack exponentially
+    slow = Banphrase(phrase=r"(a|aa)+$", operator="regex")
+    fast = Banphrase(phrase="forsen", operator="contains")
+    manager = FakeBanphraseManager([slow, fast])
+
+    message = "a" * 40 + "!"
+    for _ in range(Banphrase.MAX_REGEX_TIMEOUTS - 1):
+        assert manager.check_message(message, None) is False
+        assert slow in manager.enabled_banphrases
+
+    assert manager.check_message(message + " forsen", None) is fast
+    assert manager.enabled_banphrases == [fast]
+    assert slow.enabled is False
+
+
+def test_readonly_check_keeps_slow_regex(monkeypatch):
+    monkeypatch.setattr(Banphrase, "REGEX_TIMEOUT", 0.01)
+
+    slow = Banphrase(phrase=r"(a|aa)+$", operator="regex")
+    fast = Banphrase(phrase="forsen", operator="contains")
+    manager = FakeBanphraseManager([slow, fast])
+
+    message = "a" * 40 + "!"
+    for _ in range(Banphrase.MAX_REGEX_TIMEOUTS + 1):
+        assert manager.check_message_readonly(message) == (False, True)
+
+    assert manager.check_message_readonly(message + " forsen") == (fast, True)
+    assert manager.check_message_readonly("forsen") == (fast, False)
+    assert manager.enabled_banphrases == [slow, fast]
+    assert slow.num_regex_timeouts == 0
@@ -0,0 +1,25 @@
+from pajbot.utils import BloomFilter
+
+
+def test_no_false_negatives():
+    bloom_filter = BloomFilter(1000)
+    for i in range(1000):
+        bloom_filter.add("user{}".format(i))
+
+    assert all("user{}".format(i) in bloom_filter for i in range(1000))
+
+
+def test_false_positive_rate():
+    bloom_filter = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom_filter.add("user{}".format(i))
+
+    false_positives = sum("other{}".format(i) in bloom_filter for i in range(10000))
+    assert false_positives < 300
+
+
+def test_add_returns_whether_new():
+    bloom_filter = BloomFilter(100)
+    assert bloom_filter.add("pajlada") is True
+    assert bloom_filter.add("pajlada") is False
+    assert bloom_filter.count == 1
@@ -0,0 +1,45 @@
+from pajbot import utils
+from pajbot.managers.chathistory import ChatHistory
+
+
+def test_last_count():
+    history = ChatHistory(max_messages=3)
+    for i in range(5):
+        history.add("user{}".format(i), None, "message {}".format(i))
+
+    assert [entry.username for entry in history.last()] == ["user2", "user3", "user4"]
+    assert [entry.username for entry in history.last(count=2)] == ["user3", "user4"]
+
+
+def test_last_seconds():
+    history = ChatHistory()
+    now = utils.now().timestamp()
+    history.add("old", None, "hello", timestamp=now - 120)
+    history.add("recent", None, "hello", timestamp=now - 30)
+    history.add("new", None, "hello", timestamp=now)
+
+    assert [entry.username for entry in history.last(seconds=60)] == ["recent", "new"]
+    assert [entry.username for entry in history.last(count=1, seconds=60)] == ["new"]
+
+
+def test_user_last():
+    history = ChatHistory(max_messages_per_user=2)
+    for i in range(3):
+        history.add("forsen", "id{}".format(i), "message {}".format(i))
+    history.add("pajlada", "other", "hello")
+
+    assert [entry.msg_id for entry in history.user_last("forsen")] == ["id1", "id2"]
+    assert [entry.msg_id for entry in history.user_last("forsen", count=1)] == ["id2"]
+    assert history.user_last("nobody") == []
+
+
+def test_evicts_idle_users():
+    history = ChatHistory(max_users=2, max_user_age=60)
+    now = utils.now().timestamp()
+    history.add("idle", None, "hello", timestamp=now - 120)
+    history.add("user1", None, "hello", timestamp=now)
+    assert list(history.user_entries) == ["user1"]
+
+    history.add("user2", None, "hello", timestamp=now)
+    history.add("user3", None, "hello", timestamp=now)
+    assert list(history.user_entries) == ["user2", "user3"]
@@ -0,0 +1,23 @@
+from pajbot.managers.loadgovernor import LoadTier
+from pajbot.managers.loadgovernor import compute_load_tier
+
+
+def test_stays_normal_under_low_load():
+    assert compute_load_tier(LoadTier.NORMAL, 0.0) == LoadTier.NORMAL
+    assert compute_load_tier(LoadTier.NORMAL, 0.3) == LoadTier.NORMAL
+
+
+def test_enters_tiers_immediately():
+    assert compute_load_tier(LoadTier.NORMAL, 0.5) == LoadTier.ELEVATED
+    assert compute_load_tier(LoadTier.NORMAL, 0.95) == LoadTier.OVERLOADED
+    assert compute_load_tier(LoadTier.ELEVATED, 0.8) == LoadTier.OVERLOADED
+
+
+def test_leaves_tiers_with_hysteresis():
+    # just below the threshold is not enough to leave the tier
+    assert compute_load_tier(LoadTier.ELEVATED, 0.45) == LoadTier.ELEVATED
+    assert compute_load_tier(LoadTier.ELEVATED, 0.1) == LoadTier.NORMAL
+
+
+def test_leaves_tiers_one_step_at_a_time():
+    assert compute_load_tier(LoadTier.OVERLOADED, 0.0) == LoadTier.ELEVATED
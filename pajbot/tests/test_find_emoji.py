@@ -0,0 +1,16 @@
+from pajbot.emoji import ALL_EMOJI
+from pajbot.emoji import contains_emoji
+from pajbot.emoji import find_emoji
+
+
+def test_matches_every_emoji():
+    assert all(find_emoji(emoji) == [(0, len(emoji), emoji)] for emoji in ALL_EMOJI)
+
+
+def test_matches_longest_emoji():
+    assert find_emoji("hi 👋🏽 there 👨‍👩‍👧") == [(3, 5, "👋🏽"), (12, 17, "👨‍👩‍👧")]
+
+
+def test_no_emoji():
+    assert not contains_emoji("forsenE 123 # * no emoji here")
+    assert find_emoji("") == []
@@ -0,0 +1,27 @@
+import pytest
+
+from pajbot.utils import has_nested_quantifiers
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"(a+)+", r"(a*)*b", r"(\w+\s?)+$", r"(?:x+x+)+y", r"((ab)*c)+", r"(a|b+)+", r"(?=(a+)+)", r"(a{2,5})+"]
+)
+def test_nested(pattern):
+    assert has_nested_quantifiers(pattern) is True
+
+
+@pytest.mark.parametrize("pattern", [r"(\p{L}+)+", r"(?:\p{Lu}\w*\s?)*$", r"((\p{N}{2,5})x)+", r"([\p{L}]+)*"])
+def test_nested_regex_syntax(pattern):
+    assert has_nested_quantifiers(pattern) is True
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"a+b+", r"(ab)+", r"(a+){3}", r"(a?)+", r"^forsen\w*$", r"(foo|bar)+baz", r"\p{L}+", r"("]
+)
+def test_not_nested(pattern):
+    assert has_nested_quantifiers(pattern) is False
+
+
+@pytest.mark.parametrize("pattern", [r"(\p{L}){3}", r"(\p{L}+){3}", r"[\p{L})]+", r"(\p{L}?)+", r"(\p{L}|x)+\p{N}+"])
+def test_not_nested_regex_syntax(pattern):
+    assert has_nested_quantifiers(pattern) is False
@@ -0,0 +1,25 @@
+from pajbot.web.utils import decode_cursor
+from pajbot.web.utils import encode_cursor
+
+
+def test_cursor_roundtrip():
+    values = [15, "dQw4w9WgXcQ"]
+    assert decode_cursor(encode_cursor(values), [int, str]) == values
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["??>>", 1234])
+    assert "+" not in cursor and "/" not in cursor
+
+
+def test_invalid_cursors():
+    assert decode_cursor("not a cursor", [int]) is None
+    assert decode_cursor(encode_cursor({"id": 5}), [int]) is None
+    assert decode_cursor(encode_cursor([1, 2]), [int]) is None
+
+
+def test_cursor_value_types():
+    assert decode_cursor(encode_cursor(["15"]), [int]) == [15]
+    assert decode_cursor(encode_cursor(["x"]), [int]) is None
+    assert decode_cursor(encode_cursor([None]), [int]) is None
+    assert decode_cursor(encode_cursor([[1]]), [int]) is None
@@ -0,0 +1,62 @@
+import datetime
+from contextlib import contextmanager
+
+from pajbot.models.command import Command
+from pajbot.models.pointslog import PointsLog
+
+# CommandData's relationships refer to User, so its mapper has to be registered
+from pajbot.models.user import User  # noqa: F401
+
+
+def test_summarize():
+    day1 = datetime.datetime(2019, 10, 1, 23, 59, tzinfo=datetime.timezone.utc)
+    day2 = datetime.datetime(2019, 10, 2, 0, 1, tzinfo=datetime.timezone.utc)
+    rows = [
+        {"user_id": 1, "delta": 100, "created_at": day1},
+        {"user_id": 1, "delta": -30, "created_at": day1},
+        {"user_id": 2, "delta": -5, "created_at": day1},
+        {"user_id": 1, "delta": 10, "created_at": day2},
+    ]
+
+    assert PointsLog.summarize(rows) == [
+        {"user_id": 1, "day": day1.date(), "points_gained": 100, "points_lost": 30, "num_transactions": 2},
+        {"user_id": 2, "day": day1.date(), "points_gained": 0, "points_lost": 5, "num_transactions": 1},
+        {"user_id": 1, "day": day2.date(), "points_gained": 10, "points_lost": 0, "num_transactions": 1},
+    ]
+
+
+def test_context():
+    assert PointsLog.current_context() == ("other", None)
+    with PointsLog.context("command:!duel", "duel"):
+        with PointsLog.context("raffle"):
+            assert PointsLog.current_context() == ("raffle", None)
+        assert PointsLog.current_context() == ("command:!duel", "duel")
+    assert PointsLog.current_context() == ("other", None)
+
+
+class MockSource:
+    username = "pajlada"
+
+    @contextmanager
+    def spend_currency_context(self, points, tokens):
+        yield
+
+
+class MockModule:
+    ID = "duel"
+
+    def __init__(self):
+        self.contexts = []
+
+    def duel(self, bot, source, message, event, args):
+        self.contexts.append(PointsLog.current_context())
+
+
+def test_module_command_context():
+    module = MockModule()
+    command = Command.raw_command(module.duel)
+
+    command.run_action(None, MockSource(), None, {}, {"trigger": "duel"})
+    command.run_action(None, MockSource(), None, {}, {})
+
+    assert module.contexts == [("command:!duel", "duel"), ("command", "duel")]
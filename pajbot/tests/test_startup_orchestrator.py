@@ -0,0 +1,39 @@
+import pytest
+
+from pajbot.startup import StartupOrchestrator
+
+
+def test_runs_steps_after_their_dependencies():
+    order = []
+
+    startup = StartupOrchestrator()
+    startup.add_step("migrations", lambda: order.append("migrations"))
+    startup.add_step("load", lambda: order.append("load"), depends_on=["migrations"])
+    startup.add_step("user_id", lambda: 1234)
+    results = startup.run()
+
+    assert order == ["migrations", "load"]
+    assert results["user_id"] == 1234
+    assert len(startup.timeline()) == 3
+
+
+def test_unknown_dependency():
+    startup = StartupOrchestrator()
+    with pytest.raises(ValueError):
+        startup.add_step("load", lambda: None, depends_on=["migrations"])
+
+
+def test_failing_step_skips_dependents():
+    ran = []
+
+    def fail():
+        raise RuntimeError("database is down")
+
+    startup = StartupOrchestrator()
+    startup.add_step("migrations", fail)
+    startup.add_step("load", lambda: ran.append("load"), depends_on=["migrations"])
+
+    with pytest.raises(RuntimeError):
+        startup.run()
+
+    assert ran == []
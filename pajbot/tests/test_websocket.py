@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from twisted.internet.task import Clock
+
+from pajbot.managers.websocket import QueuedSendMixin
+from pajbot.managers.websocket import WebSocketManager
+from pajbot.managers.websocket import WebSocketServer
+
+
+class MockReactor(Clock):
+    """A twisted Clock that runs the calls made from other threads once run_from_thread_calls is called"""
+
+    def __init__(self):
+        super().__init__()
+        self.from_thread_calls = []
+
+    def callFromThread(self, f, *args, **kwargs):
+        self.from_thread_calls.append((f, args, kwargs))
+
+    def run_from_thread_calls(self):
+        calls, self.from_thread_calls = self.from_thread_calls, []
+        for f, args, kwargs in calls:
+            f(*args, **kwargs)
+
+
+class MockServer:
+    def __init__(self):
+        self.reactor = MockReactor()
+        self.broadcasts = []
+
+    def broadcast(self, payload):
+        self.broadcasts.append(json.loads(payload.decode("utf8")))
+
+
+class MockBot:
+    config = {}
+
+
+class MockClient(QueuedSendMixin):
+    peer = "tcp:127.0.0.1:1234"
+
+    def __init__(self):
+        self.init_queue()
+        self.sent = []
+        self.dropped = False
+
+    def sendMessage(self, payload, isBinary):
+        self.sent.append(payload)
+
+    def dropConnection(self, abort=False):
+        self.dropped = True
+
+
+@pytest.fixture
+def manager():
+    manager = WebSocketManager(MockBot())
+    manager.server = MockServer()
+    return manager
+
+
+def test_flush_in_order(manager):
+    for i in range(3):
+        manager.emit("event", {"i": i})
+
+    assert len(manager.server.reactor.from_thread_calls) == 1
+    assert manager.server.broadcasts == []
+
+    manager.server.reactor.run_from_thread_calls()
+    assert manager.server.broadcasts == [{"event": "event", "data": {"i": i}} for i in range(3)]
+
+    manager.emit("event", {"i": 3})
+    manager.server.reactor.run_from_thread_calls()
+    assert manager.server.broadcasts[-1] == {"event": "event", "data": {"i": 3}}
+
+
+def test_coalesce_latest(manager):
+    reactor = manager.server.reactor
+    for i in range(3):
+        manager.emit("emote_combo", {"count": i})
+    manager.emit("event")
+
+    reactor.run_from_thread_calls()
+    assert manager.server.broadcasts == [{"event": "event", "data": {}}]
+
+    reactor.advance(WebSocketManager.COALESCE_INTERVAL)
+    assert manager.server.broadcasts[1:] == [{"event": "emote_combo", "data": {"count": 2}}]
+
+    manager.emit("emote_combo", {"count": 3})
+    reactor.run_from_thread_calls()
+    reactor.advance(WebSocketManager.COALESCE_INTERVAL)
+    assert manager.server.broadcasts[2:] == [{"event": "emote_combo", "data": {"count": 3}}]
+
+
+def test_queue_while_paused():
+    client = MockClient()
+    client.pauseProducing()
+    client.send(b"1")
+    client.send(b"2")
+    assert client.sent == []
+
+    client.resumeProducing()
+    assert client.sent == [b"1", b"2"]
+
+    client.send(b"3")
+    assert client.sent == [b"1", b"2", b"3"]
+
+
+def test_disconnect_slow_client(monkeypatch):
+    monkeypatch.setattr(WebSocketServer, "clients", [])
+    client = MockClient()
+    WebSocketServer.clients.append(client)
+
+    client.pauseProducing()
+    for i in range(WebSocketServer.MAX_QUEUED_MESSAGES):
+        client.send(b"x")
+    assert not client.dropped
+
+    client.send(b"x")
+    assert client.dropped
+    assert WebSocketServer.clients == []
+    assert len(client.queue) == 0
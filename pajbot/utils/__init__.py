@@ -1,9 +1,11 @@
+from .bloom_filter import BloomFilter
 from .clean_up_message import clean_up_message
 from .datetime_from_utc_milliseconds import datetime_from_utc_milliseconds
 from .dump_threads import dump_threads
 from .extend_version_with_git_data import extend_version_with_git_data, extend_version_if_possible
 from .find import find
 from .get_class_that_defined_method import get_class_that_defined_method
+from .has_nested_quantifiers import has_nested_quantifiers
 from .init_logging import init_logging
 from .iterate_split_with_index import iterate_split_with_index
 from .load_config import load_config
@@ -0,0 +1,38 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Compact set of strings that can have false positives (at about error_rate while it holds at most
+    capacity items), but never false negatives"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+        # Number of distinct items added (approximately, since false positives are not counted)
+        self.count = 0
+
+    def _indexes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        """Adds the item, and returns True if it was not in the filter yet"""
+        new = False
+        for index in self._indexes(item):
+            mask = 1 << (index & 7)
+            if not self.bits[index >> 3] & mask:
+                self.bits[index >> 3] |= mask
+                new = True
+
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item):
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
@@ -0,0 +1,136 @@
+import re
+import sys
+
+if sys.version_info >= (3, 11):
+    # sre_parse and sre_constants are deprecated aliases of these since python 3.11
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+else:
+    import sre_constants
+    import sre_parse
+
+REPEAT_OPCODES = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+QUANTIFIER_PATTERN = re.compile(r"\*|\+|\?|\{(\d*)(,?)(\d*)\}")
+
+
+def _subpatterns(value):
+    if isinstance(value, sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _subpatterns(item)
+
+
+def _contains_repeat(subpattern):
+    for opcode, value in subpattern:
+        if opcode in REPEAT_OPCODES and value[1] > 1:
+            return True
+        if any(_contains_repeat(child) for child in _subpatterns(value)):
+            return True
+    return False
+
+
+def _has_nested_repeat(subpattern):
+    for opcode, value in subpattern:
+        if opcode in REPEAT_OPCODES and value[1] == sre_constants.MAXREPEAT and _contains_repeat(value[2]):
+            return True
+        if any(_has_nested_repeat(child) for child in _subpatterns(value)):
+            return True
+    return False
+
+
+def _parse_quantifier(pattern, pos):
+    """Returns a tuple of (is unbounded, repeats more than once, length) for the quantifier at pos,
+    or None if there is no quantifier there"""
+    match = QUANTIFIER_PATTERN.match(pattern, pos)
+    if match is None or match.group() == "{,}":
+        return None
+
+    if match.group() in ("*", "+"):
+        unbounded, repeats = True, True
+    elif match.group() == "?":
+        unbounded, repeats = False, False
+    else:
+        minimum, comma, maximum = match.groups()
+        unbounded = bool(comma) and not maximum
+        repeats = unbounded or int(maximum or minimum or 0) > 1
+
+    return unbounded, repeats, match.end() - pos
+
+
+def _skip_escape(pattern, pos):
+    """Returns the position after the escape sequence at pos, e.g. \\w or \\p{L}"""
+    if pattern[pos + 1 : pos + 2] in ("p", "P", "N") and pattern[pos + 2 : pos + 3] == "{":
+        end = pattern.find("}", pos)
+        return len(pattern) if end < 0 else end + 1
+    return pos + 2
+
+
+def _skip_class(pattern, pos):
+    """Returns the position after the (possibly nested, as allowed by the regex package) character class at pos"""
+    depth = 0
+    pos += 1
+    if pattern[pos : pos + 1] == "^":
+        pos += 1
+    if pattern[pos : pos + 1] == "]":
+        pos += 1
+    depth += 1
+    while pos < len(pattern) and depth > 0:
+        if pattern[pos] == "\\":
+            pos = _skip_escape(pattern, pos)
+            continue
+        if pattern[pos] == "[":
+            depth += 1
+        elif pattern[pos] == "]":
+            depth -= 1
+        pos += 1
+    return pos
+
+
+def _has_nested_repeat_text(pattern):
+    """A rougher check for patterns the re parser can't read, e.g. because they use \\p{...}.
+    Only looks for groups that repeat unboundedly and contain a quantifier"""
+    # whether each currently open group contains a quantifier that repeats more than once
+    groups = [False]
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "\\":
+            pos = _skip_escape(pattern, pos)
+        elif char == "[":
+            pos = _skip_class(pattern, pos)
+        elif char == "(":
+            groups.append(False)
+            pos += 1
+        elif char == ")":
+            inner = groups.pop() if len(groups) > 1 else False
+            pos += 1
+            quantifier = _parse_quantifier(pattern, pos)
+            if quantifier is not None:
+                unbounded, repeats, length = quantifier
+                if unbounded and inner:
+                    return True
+                inner = inner or repeats
+                pos += length
+            groups[-1] = groups[-1] or inner
+        else:
+            quantifier = _parse_quantifier(pattern, pos)
+            if quantifier is not None:
+                groups[-1] = groups[-1] or quantifier[1]
+                pos += quantifier[2]
+            else:
+                pos += 1
+    return False
+
+
+def has_nested_quantifiers(pattern):
+    """Returns True if the given regex repeats something unboundedly that is itself repeated, e.g. (a+)+ or (\\w*\\s?)*.
+    Such patterns can take exponential time to fail on a crafted message.
+    Patterns using syntax that only the regex package understands are checked more roughly, see _has_nested_repeat_text"""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except sre_constants.error:
+        return _has_nested_repeat_text(pattern)
+
+    return _has_nested_repeat(parsed)
@@ -76,6 +76,9 @@ def init(page):
             if operator not in valid_operators:
                 abort(403)
 
+            if operator == "regex" and Banphrase.lint_regex(phrase) is not None:
+                abort(403)
+
             user = options.get("user", None)
 
             if user is None:
@@ -1,12 +1,14 @@
 import logging
 
 from flask_restful import Resource
+from flask_restful import inputs
 from flask_restful import reqparse
 
 import pajbot.modules
 import pajbot.utils
 import pajbot.web.utils
 from pajbot.managers.adminlog import AdminLogManager
+from pajbot.managers.chathistory import ChatHistory
 from pajbot.managers.db import DBManager
 from pajbot.models.banphrase import Banphrase
 from pajbot.models.banphrase import BanphraseManager
@@ -71,8 +73,6 @@ class APIBanphraseTest(Resource):
     def post(self, **options):
         args = self.post_parser.parse_args()
 
-        banphrase_manager = BanphraseManager(None).load()
-
         try:
             message = str(args["message"])
         except (ValueError, KeyError):
@@ -81,15 +81,88 @@ class APIBanphraseTest(Resource):
         if not message:
             return {"error": "Parameter `message` cannot be empty."}, 400
 
-        ret = {"banned": False, "input_message": message}
+        _, banphrase_manager, _ = pajbot.web.utils.CachedBanphraseSet.get()
+
+        return test_message(banphrase_manager, message)
+
+
+class APIBanphraseTestBatch(Resource):
+    MAX_MESSAGES = 100
+
+    def __init__(self):
+        super().__init__()
+
+        self.post_parser = reqparse.RequestParser()
+        self.post_parser.add_argument("messages", type=str, action="append", location="json", required=True)
+
+    def post(self, **options):
+        args = self.post_parser.parse_args()
+
+        messages = args["messages"]
+        if not messages:
+            return {"error": "Parameter `messages` cannot be empty."}, 400
+
+        if len(messages) > self.MAX_MESSAGES:
+            return {"error": "At most {} messages can be tested at once.".format(self.MAX_MESSAGES)}, 400
+
+        _, banphrase_manager, _ = pajbot.web.utils.CachedBanphraseSet.get()
+
+        return {"results": [test_message(banphrase_manager, message) for message in messages]}
+
+
+def test_message(banphrase_manager, message):
+    # A regex that times out only affects the result for this message, so the API can't be used to disable banphrases
+    res, timed_out = banphrase_manager.check_message_readonly(message)
+
+    ret = {"banned": False, "input_message": message, "timed_out": timed_out}
 
-        res = banphrase_manager.check_message(message, None)
+    if res is not False:
+        ret["banned"] = True
+        ret["banphrase_data"] = res
 
-        if res is not False:
-            ret["banned"] = True
-            ret["banphrase_data"] = res
+    return ret
 
-        return ret
+
+class APIBanphraseDryRun(Resource):
+    """Tests a banphrase that hasn't been added yet against the recent chat messages.
+    Requires the bot to mirror its chat history to redis (chat_history_stream_length)"""
+
+    MAX_MESSAGES = 100000
+
+    def __init__(self):
+        super().__init__()
+
+        self.post_parser = reqparse.RequestParser()
+        self.post_parser.add_argument("phrase", required=True)
+        self.post_parser.add_argument("operator", default="contains")
+        self.post_parser.add_argument("case_sensitive", type=inputs.boolean, default=False)
+        self.post_parser.add_argument("remove_accents", type=inputs.boolean, default=False)
+        self.post_parser.add_argument("num_messages", type=int, default=10000)
+        self.post_parser.add_argument("max_samples", type=int, default=10)
+
+    @pajbot.web.utils.requires_level(500)
+    def post(self, **options):
+        args = self.post_parser.parse_args()
+
+        if not args["phrase"]:
+            return {"error": "Parameter `phrase` cannot be empty."}, 400
+
+        num_messages = min(max(args["num_messages"], 1), self.MAX_MESSAGES)
+        entries = ChatHistory.read_stream(num_messages)
+        if not entries:
+            return {"error": "No chat history available"}, 404
+
+        try:
+            return BanphraseManager.dry_run(
+                args["phrase"],
+                entries,
+                max_samples=max(args["max_samples"], 0),
+                operator=args["operator"],
+                case_sensitive=args["case_sensitive"],
+                remove_accents=args["remove_accents"],
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
 
 class APIBanphraseDump(Resource):
@@ -98,9 +171,9 @@ class APIBanphraseDump(Resource):
 
     @staticmethod
     def get(**options):
-        banphrase_manager = BanphraseManager(None).load()
+        version, _, banphrases = pajbot.web.utils.CachedBanphraseSet.get()
 
-        return banphrase_manager.enabled_banphrases
+        return pajbot.web.utils.conditional_response(banphrases, etag="banphrases-{}".format(version))
 
 
 def init(api):
@@ -108,7 +181,13 @@ def init(api):
     api.add_resource(APIBanphraseToggle, "/banphrases/toggle/<int:row_id>")
 
     # Test a message against banphrases
-    # api.add_resource(APIBanphraseTest, "/banphrases/test")
+    api.add_resource(APIBanphraseTest, "/banphrases/test")
+
+    # Test up to 100 messages against banphrases
+    api.add_resource(APIBanphraseTestBatch, "/banphrases/test_batch")
+
+    # Test a new banphrase against the recent chat messages
+    api.add_resource(APIBanphraseDryRun, "/banphrases/dry_run")
 
     # Dump
-    # api.add_resource(APIBanphraseDump, '/banphrases/dump')
+    api.add_resource(APIBanphraseDump, "/banphrases/dump")
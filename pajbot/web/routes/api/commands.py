@@ -22,11 +22,11 @@ log = logging.getLogger(__name__)
 class APICommands(Resource):
     @staticmethod
     def get():
-        commands = pajbot.web.utils.get_cached_commands()
+        version, commands = pajbot.web.utils.CachedCommandCatalog.get()
 
         commands = list(filter(lambda c: c["id"] is not None, commands))
 
-        return {"commands": commands}, 200
+        return pajbot.web.utils.conditional_response({"commands": commands}, etag="commands-{}".format(version))
 
 
 class APICommand(Resource):
@@ -40,15 +40,19 @@ class APICommand(Resource):
         except (ValueError, TypeError):
             pass
 
+        version, commands = pajbot.web.utils.CachedCommandCatalog.get()
+
         if command_id:
-            command = find(lambda c: c["id"] == command_id, pajbot.web.utils.get_cached_commands())
+            command = find(lambda c: c["id"] == command_id, commands)
         else:
-            command = find(lambda c: c["resolve_string"] == command_string, pajbot.web.utils.get_cached_commands())
+            command = find(lambda c: c["resolve_string"] == command_string, commands)
 
         if not command:
             return {"message": "A command with the given ID was not found."}, 404
 
-        return {"command": command}, 200
+        return pajbot.web.utils.conditional_response(
+            {"command": command}, etag="command-{}-{}".format(version, command["resolve_string"])
+        )
 
 
 class APICommandRemove(Resource):
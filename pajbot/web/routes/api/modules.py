@@ -9,6 +9,7 @@ import pajbot.web.utils
 from pajbot.managers.adminlog import AdminLogManager
 from pajbot.managers.db import DBManager
 from pajbot.models.module import Module
+from pajbot.models.module import ModuleManager
 from pajbot.models.sock import SocketClientManager
 from pajbot.modules.base import ModuleType
 from pajbot.utils import find
@@ -52,6 +53,7 @@ class APIModuleToggle(Resource):
 
             row.enabled = True if new_state == 1 else False
             db_session.commit()
+            ModuleManager.bump_version()
             payload = {"id": row.id, "new_state": row.enabled}
             AdminLogManager.post("Module toggled", options["user"], "Enabled" if row.enabled else "Disabled", row.id)
             SocketClientManager.send("module.update", payload)
@@ -16,6 +16,7 @@ from pajbot.models.pleblist import PleblistSong
 from pajbot.models.pleblist import PleblistSongInfo
 from pajbot.models.stream import Stream
 from pajbot.web import app
+from pajbot.web.utils import SortKey
 
 log = logging.getLogger(__name__)
 
@@ -66,7 +67,11 @@ class APIPleblistListStream(Resource):
             songs = session.query(PleblistSong).filter_by(stream_id=stream_id)
 
             return pajbot.web.utils.jsonify_list(
-                "songs", songs, base_url=url_for(self.endpoint, stream_id=stream_id, _external=True)
+                "songs",
+                songs,
+                base_url=url_for(self.endpoint, stream_id=stream_id, _external=True),
+                sort_keys=[SortKey(PleblistSong.id, lambda song: song.id)],
+                total_cache_time=60,
             )
 
 
@@ -238,14 +243,8 @@ class APIPleblistTop(Resource):
     def get(self):
         with DBManager.create_session_scope() as session:
             # songs = session.query(PleblistSong, func.count(PleblistSong.song_info).label('total')).group_by(PleblistSong.youtube_id).order_by('total DESC')
-            songs = (
-                session.query(PleblistSong, func.count(PleblistSong.youtube_id).label("total"))
-                .group_by(PleblistSong.youtube_id)
-                .order_by("total DESC")
-            )
-
-            log.info(songs)
-            log.info(songs.all())
+            total = func.count(PleblistSong.youtube_id).label("total")
+            songs = session.query(PleblistSong, total).group_by(PleblistSong.youtube_id)
 
             return pajbot.web.utils.jsonify_list(
                 "songs",
@@ -254,6 +253,11 @@ class APIPleblistTop(Resource):
                 max_limit=500,
                 base_url=url_for(self.endpoint, _external=True),
                 jsonify_method=jsonify_query,
+                sort_keys=[
+                    SortKey(total, lambda row: row[1], descending=True, aggregate=True),
+                    SortKey(PleblistSong.youtube_id, lambda row: row[0].youtube_id),
+                ],
+                total_cache_time=60,
             )
 
 
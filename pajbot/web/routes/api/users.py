@@ -1,16 +1,22 @@
 from flask_restful import Resource
 
-from pajbot.managers.user import UserManager
+from pajbot.models.user import UserSnapshot
+from pajbot.web.utils import conditional_response
 
 
 class APIUser(Resource):
     @staticmethod
     def get(username):
-        user = UserManager.find_static(username)
-        if not user:
+        # Same normalization as UserManager.find_static
+        username = username.replace("@", "").lower()
+        if username == "":
             return {"error": "Not found"}, 404
 
-        return user.jsonify()
+        user = UserSnapshot.load(username)
+        if user is None:
+            return {"error": "Not found"}, 404
+
+        return conditional_response(user, max_age=10)
 
 
 def init(api):
@@ -1,11 +1,7 @@
 from flask import render_template
 
 import pajbot.web.utils
-from pajbot.managers.db import DBManager
-from pajbot.managers.redis import RedisManager
-from pajbot.managers.user import UserManager
-from pajbot.models.duel import UserDuelStats
-from pajbot.streamhelper import StreamHelper
+from pajbot.managers.leaderboard import LeaderboardManager
 
 
 def init(app):
@@ -16,37 +12,20 @@ def init(app):
             bot_commands_list, key=lambda c: c["data"]["num_uses"] if c["data"] is not None else -1, reverse=True
         )[:5]
 
-        redis = RedisManager.get()
-
         # TODO: Make this hideable through some magic setting (NOT config.ini @_@)
-        with DBManager.create_session_scope() as db_session:
-            top_5_line_farmers = []
-            for redis_user in redis.zrevrangebyscore(
-                "{streamer}:users:num_lines".format(streamer=StreamHelper.get_streamer()),
-                "+inf",
-                "-inf",
-                start=0,
-                num=5,
-                withscores=True,
-                score_cast_func=int,
-            ):
-                user = UserManager.get_static(redis_user[0], db_session=db_session)
-                user.save_to_redis = False
-                top_5_line_farmers.append(user)
+        leaderboards = LeaderboardManager.get_many(
+            ["duels_won", "duel_profit", "duel_loss", "duels_lost", "duel_winrate", "duel_loserate", "num_lines"], 5
+        )
 
-            data = {
-                "top_5_duel_winners": db_session.query(UserDuelStats).order_by(UserDuelStats.duels_won.desc())[:5],
-                "top_5_duel_points_won": db_session.query(UserDuelStats).order_by(UserDuelStats.profit.desc())[:5],
-                "top_5_duel_points_lost": db_session.query(UserDuelStats).order_by(UserDuelStats.profit.asc())[:5],
-                "top_5_duel_losers": db_session.query(UserDuelStats).order_by(UserDuelStats.duels_lost.desc())[:5],
-                "top_5_duel_winrate": db_session.query(UserDuelStats)
-                .filter(UserDuelStats.duels_won >= 5)
-                .order_by(UserDuelStats.winrate.desc())[:5],
-                "bottom_5_winrate": db_session.query(UserDuelStats)
-                .filter(UserDuelStats.duels_lost >= 5)
-                .order_by(UserDuelStats.winrate.asc())[:5],
-                "top_5_commands": top_5_commands,
-                "top_5_line_farmers": top_5_line_farmers,
-            }
+        data = {
+            "top_5_duel_winners": leaderboards["duels_won"],
+            "top_5_duel_points_won": leaderboards["duel_profit"],
+            "top_5_duel_points_lost": leaderboards["duel_loss"],
+            "top_5_duel_losers": leaderboards["duels_lost"],
+            "top_5_duel_winrate": leaderboards["duel_winrate"],
+            "bottom_5_winrate": leaderboards["duel_loserate"],
+            "top_5_commands": top_5_commands,
+            "top_5_line_farmers": leaderboards["num_lines"],
+        }
 
-            return render_template("stats.html", **data)
+        return render_template("stats.html", **data)
@@ -2,6 +2,7 @@ from flask import render_template
 
 from pajbot.managers.db import DBManager
 from pajbot.managers.user import UserManager
+from pajbot.models.pointslog import PointsLog
 from pajbot.models.roulette import Roulette
 
 
@@ -89,4 +90,12 @@ def init(app):
                     "roulette_base_winrate": roulette_base_winrate,
                 }
 
-            return render_template("user.html", user=user, roulette_stats=roulette_stats, roulettes=roulettes)
+            points_history = PointsLog.get_daily_summary(db_session, user.id)
+
+            return render_template(
+                "user.html",
+                user=user,
+                roulette_stats=roulette_stats,
+                roulettes=roulettes,
+                points_history=points_history,
+            )
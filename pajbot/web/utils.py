@@ -1,31 +1,39 @@
 import base64
 import binascii
 import datetime
+import hashlib
 import json
 import logging
+import threading
+import time
 import urllib.parse
 from functools import update_wrapper
 from functools import wraps
 from io import BytesIO
-from PIL import Image
 
+from flask import Response
 from flask import abort
 from flask import make_response
 from flask import request
 from flask import session
 from flask_restful import reqparse
 from flask_scrypt import generate_password_hash
+from sqlalchemy import and_
+from sqlalchemy import or_
 
 import pajbot.exc
-import pajbot.managers
 from pajbot import utils
 from pajbot.apiwrappers.base import BaseAPI
+from pajbot.managers.command import CommandCatalog
+from pajbot.managers.command import CommandManager
 from pajbot.managers.db import DBManager
 from pajbot.managers.redis import RedisManager
+from pajbot.models.banphrase import BanphraseManager
 from pajbot.models.module import ModuleManager
+from pajbot.models.sock import SocketManager
 from pajbot.models.user import User
+from pajbot.models.user import UserLevelCache
 from pajbot.streamhelper import StreamHelper
-from pajbot.utils import time_method
 
 log = logging.getLogger(__name__)
 
@@ -36,16 +44,28 @@ def requires_level(level):
         def decorated_function(*args, **kwargs):
             if "user" not in session:
                 abort(403)
-            with DBManager.create_session_scope() as db_session:
-                user = db_session.query(User).filter_by(username=session["user"]["username"]).one_or_none()
-                if user is None:
-                    abort(403)
 
-                if user.level < level:
-                    abort(403)
+            username = session["user"]["username"]
+            cached_user = UserLevelCache.get(username)
+            if cached_user is None:
+                with DBManager.create_session_scope() as db_session:
+                    user = db_session.query(User).filter_by(username=username).one_or_none()
+                    if user is None:
+                        abort(403)
+
+                    db_session.expunge(user)
+                    UserLevelCache.set(user)
+            else:
+                # Detached user object with the cached values, so routes can use it like one loaded from the database
+                user = User(username)
+                user.id = cached_user["id"]
+                user.username_raw = cached_user["username_raw"]
+                user.level = cached_user["level"]
+
+            if user.level < level:
+                abort(403)
 
-                db_session.expunge(user)
-                kwargs["user"] = user
+            kwargs["user"] = user
 
             return f(*args, **kwargs)
 
@@ -68,6 +88,8 @@ def nocache(view):
 
 
 def download_logo(twitch_helix_api, streamer):
+    from PIL import Image
+
     streamer_id = twitch_helix_api.require_user_id(streamer)
     logo_url = twitch_helix_api.fetch_profile_image_url(streamer_id)
 
@@ -90,27 +112,179 @@ def download_logo(twitch_helix_api, streamer):
     pil_image.save(logo_tn_path, "png")
 
 
-@time_method
-def get_cached_commands():
-    CACHE_TIME = 30  # seconds
+class CachedModuleRegistry:
+    """
+    Keeps a ModuleManager with every available module instantiated for the lifetime of the web process.
+    The database row of each module is available as module.db_module, and is only re-fetched
+    once the modules have been updated (see ModuleManager.bump_version)
+
+    The cached modules are shared by all requests, so they must not be modified. Use get_module_copy
+    to get an instance whose settings can be loaded or parsed.
+    """
+
+    module_manager = None
+    version = None
+
+    @staticmethod
+    def get():
+        version = ModuleManager.get_version()
+
+        if CachedModuleRegistry.module_manager is None:
+            module_manager = CachedModuleRegistry.module_manager = ModuleManager(None).load(do_reload=False)
+            db_modules = module_manager.db_modules
+        elif version == CachedModuleRegistry.version:
+            return CachedModuleRegistry.module_manager
+        else:
+            module_manager = CachedModuleRegistry.module_manager
+            db_modules = module_manager.db_modules = module_manager.load_db_modules()
+
+        for module in module_manager.all_modules:
+            module.db_module = db_modules.get(module.ID, None)
+
+        CachedModuleRegistry.version = version
+        return module_manager
+
+    @staticmethod
+    def get_module_copy(module_id):
+        """Returns a new instance of the given module for the current request, or None if it doesn't exist"""
+        cached_module = CachedModuleRegistry.get().get_module(module_id)
+        if cached_module is None:
+            return None
+
+        module = cached_module.__class__(None)
+        module.db_module = cached_module.db_module
+        return module
+
+
+class CachedCommandCatalog:
+    """
+    Keeps the command catalog published by the bot (see CommandCatalog) in memory,
+    and only re-reads it from redis once a new version has been published.
+    """
+
+    # How long a catalog built by the web process itself is kept, in seconds
+    FALLBACK_CACHE_TIME = 30
+
+    version = None
+    commands = None
+
+    @staticmethod
+    def get():
+        """Returns a tuple of (version, list of jsonified commands)"""
+        redis = RedisManager.get()
+
+        # The version key never expires, but a catalog built by a web process does,
+        # so the cached copy is only up to date while the catalog it was read from still exists
+        with redis.pipeline() as pipeline:
+            pipeline.get(CommandCatalog.version_key())
+            pipeline.exists(CommandCatalog.key())
+            version, catalog_exists = pipeline.execute()
+
+        if catalog_exists and version is not None and int(version) == CachedCommandCatalog.version:
+            return CachedCommandCatalog.version, CachedCommandCatalog.commands
+
+        catalog = redis.get(CommandCatalog.key())
+        if catalog is None:
+            catalog = CachedCommandCatalog._build()
+        else:
+            catalog = json.loads(catalog)
+
+        CachedCommandCatalog.version = catalog["version"]
+        CachedCommandCatalog.commands = catalog["commands"]
+        return CachedCommandCatalog.version, CachedCommandCatalog.commands
+
+    @staticmethod
+    def _build():
+        """Builds and publishes the catalog when the bot hasn't published one (i.e. it is not running).
+        Only one web process builds it at a time, the others wait for its result"""
+        redis = RedisManager.get()
+        lock_key = CommandCatalog.key() + ":lock"
+
+        if not redis.set(lock_key, 1, nx=True, ex=CachedCommandCatalog.FALLBACK_CACHE_TIME):
+            for _ in range(50):
+                time.sleep(0.2)
+                catalog = redis.get(CommandCatalog.key())
+                if catalog is not None:
+                    return json.loads(catalog)
+
+            log.warning("Timed out waiting for the command catalog to be built, building it anyway")
+
+        try:
+            log.debug("Building command catalog...")
+            command_manager = CommandManager(
+                socket_manager=None, module_manager=ModuleManager(None).load(), bot=None
+            ).load()
+            commands = CommandCatalog.build(command_manager)
+            version = CommandCatalog.publish(commands, expire=CachedCommandCatalog.FALLBACK_CACHE_TIME)
+        finally:
+            redis.delete(lock_key)
+
+        return {"version": version, "commands": commands}
+
+
+class CachedBanphraseSet:
+    """
+    Keeps the enabled banphrases in memory, compiled, for the banphrase test and dump APIs.
+
+    The set is reloaded from the database after a change is announced over redis pubsub
+    (banphrase.update/banphrase.remove), or after MAX_AGE seconds in case an announcement was missed.
+    Its version is a hash of its contents, so every web process agrees on it.
+    """
+
+    MAX_AGE = 60
+
+    lock = threading.Lock()
+    socket_manager = None
+
+    # (version, BanphraseManager, list of jsonified banphrases, time loaded), replaced as a whole
+    current = None
+    changed = True
+
+    @staticmethod
+    def get():
+        """Returns a tuple of (version, BanphraseManager, list of jsonified enabled banphrases)"""
+        current = CachedBanphraseSet.current
+        if not CachedBanphraseSet.is_stale(current):
+            return current[:3]
+
+        with CachedBanphraseSet.lock:
+            if CachedBanphraseSet.socket_manager is None:
+                # Subscribed on first use rather than at startup, since the web server may fork after startup
+                CachedBanphraseSet.socket_manager = SocketManager(
+                    StreamHelper.get_streamer(), lambda handler, args: handler(*args)
+                )
+                CachedBanphraseSet.socket_manager.add_handler("banphrase.update", CachedBanphraseSet.on_change)
+                CachedBanphraseSet.socket_manager.add_handler("banphrase.remove", CachedBanphraseSet.on_change)
 
-    redis = RedisManager.get()
-    commands_key = "{streamer}:cache:commands".format(streamer=StreamHelper.get_streamer())
-    commands = redis.get(commands_key)
-    if commands is None:
-        log.debug("Updating commands...")
-        bot_commands = pajbot.managers.command.CommandManager(
-            socket_manager=None, module_manager=ModuleManager(None).load(), bot=None
-        ).load(load_examples=True)
-        bot_commands_list = bot_commands.parse_for_web()
-
-        bot_commands_list.sort(key=lambda x: (x.id or -1, x.main_alias))
-        bot_commands_list = [c.jsonify() for c in bot_commands_list]
-        redis.setex(commands_key, value=json.dumps(bot_commands_list, separators=(",", ":")), time=CACHE_TIME)
-    else:
-        bot_commands_list = json.loads(commands)
+            current = CachedBanphraseSet.current
+            if CachedBanphraseSet.is_stale(current):
+                # a change announced while loading is picked up by the next call
+                CachedBanphraseSet.changed = False
+                current = CachedBanphraseSet.current = CachedBanphraseSet._load()
+
+        return current[:3]
+
+    @staticmethod
+    def is_stale(current):
+        return current is None or CachedBanphraseSet.changed or time.time() - current[3] >= CachedBanphraseSet.MAX_AGE
+
+    @staticmethod
+    def on_change(_data):
+        CachedBanphraseSet.changed = True
+
+    @staticmethod
+    def _load():
+        banphrase_manager = BanphraseManager(None).load()
+        banphrase_manager.db_session.close()
+
+        banphrases = [banphrase.jsonify() for banphrase in banphrase_manager.enabled_banphrases]
+        version = hashlib.sha1(json.dumps(banphrases, sort_keys=True).encode("utf-8")).hexdigest()
+
+        return version, banphrase_manager, banphrases, time.time()
 
-    return bot_commands_list
+
+def get_cached_commands():
+    return CachedCommandCatalog.get()[1]
 
 
 def json_serial(obj):
@@ -125,6 +299,21 @@ def json_serial(obj):
     raise TypeError("Type {} is not serializable".format(type(obj)))
 
 
+def conditional_response(data, max_age=0, etag=None):
+    """Returns data as a flask_restful response with an ETag, or an empty 304 response if the client
+    already has the current version. The ETag is derived from the data unless one is given.
+    Must be called in the context of a request"""
+    if etag is None:
+        etag = hashlib.sha1(json.dumps(data, default=json_serial, sort_keys=True).encode("utf-8")).hexdigest()
+
+    headers = {"ETag": '"{}"'.format(etag), "Cache-Control": "public, max-age={}".format(max_age)}
+
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    return data, 200, headers
+
+
 def init_json_serializer(api):
     @api.representation("application/json")
     def output_json(data, code, headers=None):
@@ -137,9 +326,103 @@ def jsonify_query(query):
     return [v.jsonify() for v in query]
 
 
-def jsonify_list(key, query, base_url=None, default_limit=None, max_limit=None, jsonify_method=jsonify_query):
-    """ Must be called in the context of a request """
-    _total = query.count()
+class SortKey:
+    """
+    A column that a list is sorted by, used by jsonify_list for keyset pagination.
+
+    column is the column (or labeled expression) to sort by, and value is a function that returns
+    the value of that column for a row returned by the query. The values end up in the `after` cursor,
+    so they must be JSON serializable. Set aggregate if the column is an aggregate (e.g. a count),
+    so the cursor condition is applied in a HAVING clause.
+    Values read back from a cursor are converted to python_type, which defaults to the python type of the column.
+    """
+
+    def __init__(self, column, value, descending=False, aggregate=False, python_type=None):
+        self.column = column
+        self.value = value
+        self.descending = descending
+        self.aggregate = aggregate
+        self.python_type = python_type if python_type is not None else column.type.python_type
+
+    def order_by(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+    def comes_after(self, value):
+        return self.column < value if self.descending else self.column > value
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, python_types):
+    """Returns the list of values in the given cursor, converted to the given list of types,
+    or None if it is not a valid cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, binascii.Error):
+        return None
+
+    if not isinstance(values, list) or len(values) != len(python_types):
+        return None
+
+    try:
+        return [python_type(value) for python_type, value in zip(python_types, values)]
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_condition(sort_keys, values):
+    """Returns a condition that matches the rows sorted after the row with the given values"""
+    condition = None
+    for i in reversed(range(len(sort_keys))):
+        term = sort_keys[i].comes_after(values[i])
+        if condition is not None:
+            term = or_(term, and_(sort_keys[i].column == values[i], condition))
+        condition = term
+
+    return condition
+
+
+def count_cached(query, cache_time):
+    """Returns query.count(), cached in redis for cache_time seconds"""
+    statement = query.statement.compile()
+    query_hash = hashlib.sha1(
+        (str(statement) + json.dumps(statement.params, default=str, sort_keys=True)).encode("utf-8")
+    ).hexdigest()
+    key = "{streamer}:cache:count:{hash}".format(streamer=StreamHelper.get_streamer(), hash=query_hash)
+
+    redis = RedisManager.get()
+    total = redis.get(key)
+    if total is not None:
+        return int(total)
+
+    total = query.count()
+    redis.setex(key, cache_time, total)
+    return total
+
+
+def jsonify_list(
+    key,
+    query,
+    base_url=None,
+    default_limit=None,
+    max_limit=None,
+    jsonify_method=jsonify_query,
+    sort_keys=None,
+    total_cache_time=None,
+):
+    """ Must be called in the context of a request
+
+    If sort_keys (a list of SortKey) is given, the query is sorted by them and the list can be paginated
+    with the `after` cursor returned in `_cursor`. Unlike offsets, the cost of fetching a page with a cursor
+    does not grow with how deep into the list the page is.
+    If total_cache_time is given, `_total` is cached for that many seconds instead of being counted on every request.
+    """
+    if total_cache_time:
+        _total = count_cached(query, total_cache_time)
+    else:
+        _total = query.count()
 
     paginate_args = paginate_parser.parse_args()
 
@@ -160,13 +443,41 @@ def jsonify_list(key, query, base_url=None, default_limit=None, max_limit=None,
         # If an offset has been specified in the query arguments, use it
         offset = paginate_args["offset"]
 
+    after = None
+
+    if sort_keys:
+        query = query.order_by(*[sort_key.order_by() for sort_key in sort_keys])
+
+        if paginate_args["after"]:
+            after = decode_cursor(paginate_args["after"], [sort_key.python_type for sort_key in sort_keys])
+            if after is None:
+                abort(400)
+
+            condition = keyset_condition(sort_keys, after)
+            if any(sort_key.aggregate for sort_key in sort_keys):
+                query = query.having(condition)
+            else:
+                query = query.filter(condition)
+
+            offset = None
+
     if limit:
-        query = query.limit(limit)
+        # Fetch one extra row so we know whether there is a next page
+        query = query.limit(limit + 1 if sort_keys else limit)
 
     if offset:
         query = query.offset(offset)
 
-    payload = {"_total": _total, key: jsonify_method(query)}
+    rows = query.all()
+    next_cursor = None
+    if sort_keys and limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([sort_key.value(rows[-1]) for sort_key in sort_keys])
+
+    payload = {"_total": _total, key: jsonify_method(rows)}
+
+    if sort_keys:
+        payload["_cursor"] = {"next": next_cursor}
 
     if base_url:
         payload["_links"] = {}
@@ -177,9 +488,15 @@ def jsonify_list(key, query, base_url=None, default_limit=None, max_limit=None,
             payload["_links"]["self"] += "?" + urllib.parse.urlencode(request.args)
 
         if limit:
-            payload["_links"]["next"] = (
-                base_url + "?" + urllib.parse.urlencode([("limit", limit), ("offset", (offset or 0) + limit)])
-            )
+            if sort_keys:
+                if next_cursor:
+                    payload["_links"]["next"] = (
+                        base_url + "?" + urllib.parse.urlencode([("limit", limit), ("after", next_cursor)])
+                    )
+            else:
+                payload["_links"]["next"] = (
+                    base_url + "?" + urllib.parse.urlencode([("limit", limit), ("offset", (offset or 0) + limit)])
+                )
 
             if offset:
                 payload["_links"]["prev"] = (
@@ -192,6 +509,7 @@ def jsonify_list(key, query, base_url=None, default_limit=None, max_limit=None,
 paginate_parser = reqparse.RequestParser()
 paginate_parser.add_argument("limit", type=int, required=False)
 paginate_parser.add_argument("offset", type=int, required=False)
+paginate_parser.add_argument("after", type=str, required=False)
 
 
 def pleblist_login(in_password, bot_config):
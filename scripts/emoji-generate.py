@@ -41,9 +41,118 @@ def parse_emoji_data(text):
     return all_emoji
 
 
+def build_trie(all_emoji):
+    root = {}
+    for the_emoji in all_emoji:
+        node = root
+        for char in the_emoji:
+            node = node.setdefault(char, {})
+
+        # marks the end of an emoji
+        node[""] = {}
+
+    return root
+
+
+def trie_branches(node):
+    """Returns a list of regex alternatives matching the sequences below this trie node.
+    Every alternative starts with a different character, and the sequences are matched greedily (longest first)"""
+    branches = []
+    single_chars = []
+    for char in sorted(key for key in node if key != ""):
+        child = node[char]
+        if list(child) == [""]:
+            single_chars.append(char)
+        else:
+            branches.append(re.escape(char) + trie_to_regex(child))
+
+    if len(single_chars) == 1:
+        branches.append(re.escape(single_chars[0]))
+    elif len(single_chars) > 1:
+        branches.append(char_class(single_chars))
+
+    return branches
+
+
+def char_class(chars):
+    """Returns a regex character class matching the given characters.
+    Consecutive codepoints are collapsed into ranges, since the re module checks classes of non-BMP characters
+    one item at a time"""
+    ranges = []
+    for codepoint in sorted({ord(char) for char in chars}):
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+
+    items = []
+    for first, last in ranges:
+        if first == last:
+            items.append(re.escape(chr(first)))
+        else:
+            items.append(re.escape(chr(first)) + "-" + re.escape(chr(last)))
+
+    return "[" + "".join(items) + "]"
+
+
+def trie_to_regex(node):
+    branches = trie_branches(node)
+    optional = "" in node
+
+    if len(branches) == 0:
+        return ""
+
+    if len(branches) == 1 and not optional:
+        return branches[0]
+
+    return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+
+def generate_module(all_emoji):
+    # since the alternatives are built from a trie, the regex never has to try more than one alternative per
+    # character, and always matches the longest emoji (e.g. an emoji with its skin tone modifier).
+    # the lookahead on the first character lets it skip over all other characters without trying any alternative
+    branches = trie_branches(build_trie(all_emoji))
+    emoji_start = char_class([the_emoji[0] for the_emoji in all_emoji])
+    branches_str = "".join("            {},\n".format(json.dumps(branch, ensure_ascii=False)) for branch in branches)
+
+    return (
+        "import re\n"
+        "\n"
+        "ALL_EMOJI = {all_emoji}\n"
+        "\n"
+        "# Matches the first character of any of the emoji above\n"
+        "EMOJI_START = {emoji_start}\n"
+        "\n"
+        "# Matches any of the emoji above, longest first\n"
+        "ALL_EMOJI_REGEX = re.compile(\n"
+        '    "(?=" + EMOJI_START + ")(?:"\n'
+        '    + "|".join(\n'
+        "        [\n"
+        "{branches}"
+        "        ]\n"
+        "    )\n"
+        '    + ")"\n'
+        ")\n"
+        "\n"
+        "\n"
+        "def find_emoji(message):\n"
+        '    """Returns a list of (start, end, emoji) tuples for all emoji in the message"""\n'
+        "    return [(match.start(), match.end(), match.group()) for match in ALL_EMOJI_REGEX.finditer(message)]\n"
+        "\n"
+        "\n"
+        "def contains_emoji(message):\n"
+        "    return ALL_EMOJI_REGEX.search(message) is not None\n"
+    ).format(
+        all_emoji=json.dumps(all_emoji, ensure_ascii=False, indent=4),
+        emoji_start=json.dumps(emoji_start, ensure_ascii=False),
+        branches=branches_str,
+    )
+
+
 if __name__ == "__main__":
     emoji_data_text = download_emoji_data()
     all_emoji = parse_emoji_data(emoji_data_text)
 
-    list_str = json.dumps(all_emoji, ensure_ascii=False, indent=4)
-    print("ALL_EMOJI = " + list_str)
+    # run black on the output to get the final pajbot/emoji.py
+    print(generate_module(all_emoji), end="")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import argparse
+import functools
+import os
+import sys
+
+# add /opt/pajbot (parent directory) to the PYTHONPATH
+# so we can import from pajbot.models, etc..
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pajbot.managers.db import DBManager  # noqa E402 module level import not at top of file
+from pajbot.managers.redis import RedisManager  # noqa E402 module level import not at top of file
+from pajbot.models.user import PointsRank  # noqa E402 module level import not at top of file
+from pajbot.models.user import User  # noqa E402 module level import not at top of file
+from pajbot.streamhelper import StreamHelper  # noqa E402 module level import not at top of file
+from pajbot.utils import load_config  # noqa E402 module level import not at top of file
+
+# python buffers full lines by default
+# to make sure we see the progress as-it-is-created
+# we make each call to print() use the flush=True parameter by default like this
+print = functools.partial(print, flush=True)
+
+
+def iterate_user_points(db_session, chunk_size):
+    """Yields lists of (username, points) tuples for all users with a non-zero amount of points"""
+    chunk = []
+    query = db_session.query(User.username, User.points).filter(User.points != 0).yield_per(chunk_size)
+    for username, points in query:
+        chunk.append((username, points))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def rebuild(chunk_size):
+    redis = RedisManager.get()
+    key = PointsRank.key()
+    rebuild_key = key + ":rebuild"
+
+    redis.delete(rebuild_key)
+
+    num_users = 0
+    with DBManager.create_session_scope() as db_session:
+        for chunk in iterate_user_points(db_session, chunk_size):
+            redis.zadd(rebuild_key, dict(chunk))
+            num_users += len(chunk)
+            print("Copied {} users...".format(num_users))
+
+    if num_users > 0:
+        redis.rename(rebuild_key, key)
+    else:
+        redis.delete(key)
+
+    redis.set(PointsRank.ready_key(), 1)
+    print("Rebuilt {} with {} users".format(key, num_users))
+
+
+def verify(chunk_size, fix):
+    redis = RedisManager.get()
+    key = PointsRank.key()
+
+    num_checked = 0
+    num_wrong = 0
+
+    with DBManager.create_session_scope() as db_session:
+        # Users whose points are missing or wrong in redis
+        for chunk in iterate_user_points(db_session, chunk_size):
+            with redis.pipeline() as pipeline:
+                for username, _ in chunk:
+                    pipeline.zscore(key, username)
+                scores = pipeline.execute()
+
+            wrong = {}
+            for (username, points), score in zip(chunk, scores):
+                if score != points:
+                    print("{}: {} points in the database, {} in redis".format(username, points, score))
+                    wrong[username] = points
+
+            num_checked += len(chunk)
+            num_wrong += len(wrong)
+            if fix:
+                PointsRank.set_many(wrong)
+
+        # Users that are in redis, but have no points (or no longer exist) in the database
+        batch = []
+        for username, _ in redis.zscan_iter(key, count=chunk_size):
+            batch.append(username)
+            if len(batch) >= chunk_size:
+                num_wrong += remove_stale(db_session, batch, fix)
+                batch = []
+
+        if batch:
+            num_wrong += remove_stale(db_session, batch, fix)
+
+    if fix:
+        redis.set(PointsRank.ready_key(), 1)
+
+    print(
+        "Checked {} users, {} were out of sync{}".format(num_checked, num_wrong, " and have been fixed" if fix else "")
+    )
+    return num_wrong
+
+
+def remove_stale(db_session, usernames, fix):
+    found = {
+        username
+        for (username,) in db_session.query(User.username).filter(User.username.in_(usernames), User.points != 0)
+    }
+    stale = {username: None for username in usernames if username not in found}
+    for username in stale:
+        print("{}: no points in the database, but present in redis".format(username))
+
+    if fix:
+        PointsRank.set_many(stale)
+
+    return len(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the redis mirror of user points used for ranks")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--config", "-c", default="config.ini", help="Path to the bot config file")
+    parser.add_argument("--fix", action="store_true", help="Correct any differences found by verify")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Number of users to process at once")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    DBManager.init(config["main"]["db"])
+
+    redis_options = {}
+    if "redis" in config:
+        redis_options = dict(config.items("redis"))
+    RedisManager.init(**redis_options)
+
+    StreamHelper.init_streamer(config["main"]["streamer"])
+
+    if args.command == "rebuild":
+        rebuild(args.chunk_size)
+    elif verify(args.chunk_size, args.fix) > 0 and not args.fix:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()